@@ -66,8 +66,8 @@ cte4 AS (
     SELECT 
         source,
         DATE_TRUNC('month', data_date::DATE) AS date_trunc,
-        SUM(a.realised_pl) AS total_pl,
-        SUM(a.market_value) AS fund_mv_end,
+        SUM(a.realised_pl_base) AS total_pl,
+        SUM(a.market_value_base) AS fund_mv_end,
         SUM(
             CASE 
                 WHEN a.financial_type = 'Government Bond' THEN a.quantity * b.price
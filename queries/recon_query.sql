@@ -42,7 +42,7 @@ SELECT
         WHEN fin_type = 'Equities' THEN COALESCE(c.price, lep.price)
         WHEN fin_type = 'Government Bond' THEN COALESCE(b.price, lbp.price)
     END AS ref_price,
-    a.price AS fund_price,
+    a.price_base AS fund_price,
     fund_price - ref_price AS diff
 FROM 
     applebead a
@@ -1,13 +1,30 @@
+import sys
+
+from src.cube import Cube
+from src.fx import FX
+from src.runtime import Runtime
 from src.setup import Setup
 from src.load import Load
+from src.recon import Recon
 from src.transform import Transform
+from src.validate import Validate
+from src.watch import Watch
 
 
 def run_etl():
-    Setup.setup_step()
-    Transform.transform_step()
-    Load.load_step()
+    # Every stage shares one configured DuckDB connection
+    with Runtime() as runtime:
+        Setup.setup_step(runtime)
+        Transform.transform_step()
+        FX.fx_step()
+        Validate.validate_step()
+        Load.load_step(runtime)
+        Recon.recon_step(runtime)
+        Cube.cube_step(runtime)
 
 
 if __name__ == "__main__":
-    run_etl()
+    if "--watch" in sys.argv[1:]:
+        Watch.watch_step()
+    else:
+        run_etl()
@@ -0,0 +1,170 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+
+from src.load import VERSIONING_COLUMNS
+
+MANIFEST_FILE = "manifest.json"
+
+
+class Catalog:
+    """
+    Presents fund data sharded across several DuckDB files or Parquet snapshots as
+    one logical schema. The manifest in the shard directory records which funds each
+    shard holds, so a query only attaches the shards it needs.
+    """
+
+    @staticmethod
+    def read_manifest(shard_directory: Path) -> Dict[str, Dict]:
+        """
+        Reads the shard manifest.
+
+        Args:
+            shard_directory (Path): Directory holding the shards and their manifest.
+
+        Returns:
+            Dict[str, Dict]: Shard name mapped to its path, format and funds, empty if
+                there is no manifest.
+        """
+        manifest_path = Path(shard_directory) / MANIFEST_FILE
+        if not manifest_path.exists():
+            return {}
+        return json.loads(manifest_path.read_text(encoding="UTF-8"))["shards"]
+
+    @staticmethod
+    def register_shard(
+        shard_directory: Path,
+        name: str,
+        path: str,
+        shard_format: str,
+        funds: List[str],
+    ) -> None:
+        """
+        Records a shard and its funds in the manifest, merging with funds it already
+        holds.
+
+        Args:
+            shard_directory (Path): Directory holding the shards and their manifest.
+            name (str): The shard name, used as its ATTACH alias.
+            path (str): The DuckDB file or snapshot directory, relative to
+                shard_directory unless absolute.
+            shard_format (str): "duckdb" or "parquet".
+            funds (List[str]): The funds the shard holds.
+        """
+        shards = Catalog.read_manifest(shard_directory)
+        known = shards.get(name, {}).get("funds", [])
+        shards[name] = {
+            "path": path,
+            "format": shard_format,
+            "funds": sorted(set(known) | set(funds)),
+        }
+        Path(shard_directory).mkdir(parents=True, exist_ok=True)
+        (Path(shard_directory) / MANIFEST_FILE).write_text(
+            json.dumps({"shards": shards}, indent=2), encoding="UTF-8"
+        )
+
+    @staticmethod
+    def register_parquet(shard_directory: Path, name: str, snapshot_dir: Path) -> None:
+        """
+        Registers a Parquet snapshot written by Performance.export_snapshot as a
+        read-only shard holding the current rows of its funds.
+
+        Args:
+            shard_directory (Path): Directory holding the shards and their manifest.
+            name (str): The shard name.
+            snapshot_dir (Path): The snapshot directory.
+        """
+        funds = [
+            path.stem for path in (Path(snapshot_dir) / "holdings").glob("*.parquet")
+        ]
+        Catalog.register_shard(
+            shard_directory, name, str(Path(snapshot_dir).resolve()), "parquet", funds
+        )
+        print(f"Registered Parquet shard '{name}' with {len(funds)} funds")
+
+    @staticmethod
+    def funds_in_query(shards: Dict[str, Dict], sql_query: str) -> List[str]:
+        """
+        Finds the sharded funds a query refers to, as a table or a history table.
+
+        Args:
+            shards (Dict[str, Dict]): The shard manifest.
+            sql_query (str): The query text.
+
+        Returns:
+            List[str]: The referenced funds, sorted.
+        """
+        funds = {fund for shard in shards.values() for fund in shard["funds"]}
+        return sorted(
+            fund
+            for fund in funds
+            if re.search(rf"\b{re.escape(fund)}(_history)?\b", sql_query, re.IGNORECASE)
+        )
+
+    @staticmethod
+    def attach(
+        conn: duckdb.DuckDBPyConnection,
+        shard_directory: Path,
+        sql_query: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Attaches, read-only, the shards holding the funds a query needs and creates
+        temp views named after each fund (and its history for DuckDB shards) over the
+        union of its shards. Without a query every shard is attached.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            shard_directory (Path): Directory holding the shards and their manifest.
+            sql_query (Optional[str]): The query about to run.
+
+        Returns:
+            List[str]: The names of the attached shards.
+        """
+        shards = Catalog.read_manifest(shard_directory)
+        funds = (
+            Catalog.funds_in_query(shards, sql_query)
+            if sql_query is not None
+            else sorted({fund for shard in shards.values() for fund in shard["funds"]})
+        )
+
+        attached = []
+        for fund in funds:
+            current, history = [], []
+            for name, shard in shards.items():
+                if fund not in shard["funds"]:
+                    continue
+                path = Path(shard_directory) / shard["path"]
+                if shard["format"] == "parquet":
+                    current.append(
+                        f"SELECT * FROM read_parquet('{path / 'holdings' / f'{fund}.parquet'}')"
+                    )
+                else:
+                    conn.execute(
+                        f"ATTACH IF NOT EXISTS '{path}' AS \"{name}\" (READ_ONLY)"
+                    )
+                    # The shard's own views would resolve against this catalog, so
+                    # read its history table directly
+                    history.append(f'SELECT * FROM "{name}".{fund}_history')
+                    current.append(
+                        f"SELECT * EXCLUDE ({VERSIONING_COLUMNS}) "
+                        f'FROM "{name}".{fund}_history WHERE IS_CURRENT'
+                    )
+                if name not in attached:
+                    attached.append(name)
+
+            conn.execute(
+                f"CREATE OR REPLACE TEMP VIEW {fund} AS "
+                + " UNION ALL BY NAME ".join(current)
+            )
+            if history:
+                conn.execute(
+                    f"CREATE OR REPLACE TEMP VIEW {fund}_history AS "
+                    + " UNION ALL BY NAME ".join(history)
+                )
+
+        if attached:
+            print(f"Attached shards: {', '.join(sorted(attached))}")
+        return sorted(attached)
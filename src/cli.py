@@ -0,0 +1,642 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+from src.config.constants import DatabaseContants, FileDirectoryPath
+
+# Pipeline stages in execution order, as (module, class, step method)
+STAGES = {
+    "setup": ("src.setup", "Setup", "setup_step"),
+    "transform": ("src.transform", "Transform", "transform_step"),
+    "fx": ("src.fx", "FX", "fx_step"),
+    "validate": ("src.validate", "Validate", "validate_step"),
+    "load": ("src.load", "Load", "load_step"),
+    "recon": ("src.recon", "Recon", "recon_step"),
+    "cube": ("src.cube", "Cube", "cube_step"),
+}
+
+# Stages that run on the pipeline's shared DuckDB connection
+CONNECTED_STAGES = {"setup", "load", "recon", "cube"}
+
+# Stages that can be limited to some funds and report months
+SELECTABLE_STAGES = {"transform", "load"}
+
+
+# Heavy dependencies (duckdb, polars, pandas, pydantic) are only imported once a
+# subcommand that needs them runs, so `--help` and argument errors stay fast.
+class CLI:
+
+    @staticmethod
+    def run_stage(stage: str, runtime=None, **selection) -> bool:
+        """
+        Imports the module owning a stage and runs its step. Steps that catch their
+        errors report them by returning False; the others raise.
+
+        Args:
+            stage (str): The stage name, a key of STAGES.
+            runtime (Optional[Runtime]): The shared connection owner passed to the
+                stages that use the database.
+            **selection: funds, start_month and end_month limits for the stages in
+                SELECTABLE_STAGES.
+
+        Returns:
+            bool: True if the stage succeeded.
+        """
+        module_name, class_name, step_name = STAGES[stage]
+        module = importlib.import_module(module_name)
+        step = getattr(getattr(module, class_name), step_name)
+        if runtime is not None and stage in CONNECTED_STAGES:
+            return step(runtime, **selection) is not False
+        return step(**selection) is not False
+
+    @staticmethod
+    def read_completed_stages(state_file: Path) -> List[str]:
+        """
+        Reads the stages completed by the last pipeline run.
+
+        Args:
+            state_file (Path): Path to the pipeline state file.
+
+        Returns:
+            List[str]: The completed stage names, empty if there is no state.
+        """
+        if not state_file.exists():
+            return []
+        try:
+            return json.loads(state_file.read_text(encoding="UTF-8"))["completed"]
+        except (ValueError, KeyError) as e:
+            print(f"Ignoring unreadable state file '{state_file}': {e}")
+            return []
+
+    @staticmethod
+    def run_pipeline(
+        stages: List[str], state_file: Path, resume: bool = False, runtime=None
+    ) -> List[str]:
+        """
+        Runs the selected stages in pipeline order on one shared DuckDB connection,
+        recording each completed stage so an interrupted run can be resumed. A failed
+        stage stops the run without being recorded, so --resume runs it again.
+
+        Args:
+            stages (List[str]): The stages to run.
+            state_file (Path): Path to the pipeline state file.
+            resume (bool): Skip stages completed by the previous run.
+            runtime (Optional[Runtime]): The shared connection owner, a default
+                one is used and closed if not given.
+
+        Returns:
+            List[str]: The stages that were run.
+        """
+        from src.runtime import Runtime
+
+        completed = CLI.read_completed_stages(state_file) if resume else []
+        ran = []
+        with Runtime.use(runtime) as runtime:
+            for stage in [stage for stage in STAGES if stage in stages]:
+                if stage in completed:
+                    print(f"Skipping stage '{stage}', completed by the previous run.")
+                    continue
+
+                print(f"Running stage '{stage}'...")
+                if not CLI.run_stage(stage, runtime):
+                    print(f"Stage '{stage}' failed, stopping the pipeline.")
+                    break
+                ran.append(stage)
+                completed.append(stage)
+                state_file.write_text(
+                    json.dumps({"completed": completed}), encoding="UTF-8"
+                )
+
+        # A finished pipeline starts from scratch next time
+        if set(stages) <= set(completed):
+            state_file.unlink(missing_ok=True)
+        return ran
+
+    @staticmethod
+    def report(
+        sql_file: Path,
+        db_file: Path,
+        output_dir: Path,
+        args: Optional[argparse.Namespace] = None,
+    ) -> None:
+        """
+        Runs a report query and writes its result to the output directory.
+
+        Args:
+            sql_file (Path): Path to the SQL file.
+            db_file (Path): Path to the DuckDB database file.
+            output_dir (Path): Directory for the query result.
+            args (Optional[argparse.Namespace]): The parsed sampling and shard
+                arguments; the full query runs on the main database unless --sample
+                or --shards is given.
+        """
+        from src.report import Report
+
+        sample = None
+        if args is not None and args.sample is not None:
+            from src.models.models import SampleConfig
+
+            sample = SampleConfig(
+                percent=args.sample,
+                groups=args.groups,
+                scaled_columns=args.scale,
+                key_columns=args.key or None,
+            )
+        Report.run_query_to_csv(
+            sql_file,
+            db_file,
+            output_dir,
+            shard_directory=getattr(args, "shards", None),
+            sample=sample,
+        )
+
+    @staticmethod
+    def add_shard_argument(parser: argparse.ArgumentParser) -> None:
+        """Adds the opt-in to read fund data from the shards to a report parser."""
+        parser.add_argument(
+            "--shards",
+            nargs="?",
+            type=Path,
+            const=Path(FileDirectoryPath.SHARDS.value),
+            metavar="DIRECTORY",
+            help="Read the funds from the shards written by `shards load` instead "
+            "of the main database (default directory: ./shards).",
+        )
+
+    @staticmethod
+    def add_sample_arguments(parser: argparse.ArgumentParser) -> None:
+        """Adds the approximate, sampled run options to a report parser."""
+        parser.add_argument(
+            "--sample",
+            type=float,
+            metavar="PERCENT",
+            help="Run on this percent of every fund report's holdings, with "
+            "standard errors.",
+        )
+        parser.add_argument(
+            "--groups",
+            type=int,
+            default=4,
+            help="Random groups used to estimate the standard errors.",
+        )
+        parser.add_argument(
+            "--scale",
+            action="append",
+            default=[],
+            metavar="COLUMN",
+            help="Sum or count column to scale up to the full data, may be repeated.",
+        )
+        parser.add_argument(
+            "--key",
+            action="append",
+            default=[],
+            metavar="COLUMN",
+            help="Column matching result rows across groups, may be repeated "
+            "(default: the non-numeric columns).",
+        )
+
+    @staticmethod
+    def add_selection_arguments(parser: argparse.ArgumentParser) -> None:
+        """Adds the fund and report month filters to a parser."""
+        parser.add_argument(
+            "--fund",
+            action="append",
+            default=[],
+            help="Fund to select, may be repeated.",
+        )
+        parser.add_argument(
+            "--from",
+            dest="start_month",
+            type=lambda value: date.fromisoformat(f"{value}-01"),
+            help="First report month, YYYY-MM.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="end_month",
+            type=lambda value: date.fromisoformat(f"{value}-01"),
+            help="Last report month, YYYY-MM.",
+        )
+
+    @staticmethod
+    def breaks(args: argparse.Namespace) -> None:
+        """
+        Builds the reconciliation break index or answers a lookup from it.
+
+        Args:
+            args (argparse.Namespace): The parsed breaks subcommand arguments.
+        """
+        import duckdb
+
+        from src.recon import Recon
+
+        if args.breaks_command == "build":
+            from src.models.models import RuntimeConfig
+            from src.runtime import Runtime
+
+            with Runtime(RuntimeConfig(db_file=args.db_file)) as runtime:
+                Recon.build_breaks(runtime.conn, args.tolerance)
+            return
+
+        # Lookups only read the index, so they never wait on a writer's lock
+        with duckdb.connect(database=str(args.db_file), read_only=True) as conn:
+            if args.breaks_command == "instrument":
+                result_df = Recon.instrument_breaks(
+                    conn, args.instrument, args.months, args.as_of
+                )
+            else:
+                result_df = Recon.funds_by_breaks(conn, args.month, args.limit)
+        print(result_df.to_string(index=False))
+
+    @staticmethod
+    def shards(args: argparse.Namespace) -> None:
+        """
+        Loads into, lists or registers fund data shards.
+
+        Args:
+            args (argparse.Namespace): The parsed shards subcommand arguments.
+        """
+        from src.catalog import Catalog
+
+        if args.shards_command == "load":
+            from src.shard import Shard
+
+            Shard.shard_step(
+                args.shard_by, args.workers, args.fund_groups, args.shard_directory
+            )
+        elif args.shards_command == "register-parquet":
+            Catalog.register_parquet(args.shard_directory, args.name, args.snapshot_dir)
+        else:
+            for name, shard in Catalog.read_manifest(args.shard_directory).items():
+                print(f"{name} ({shard['format']}): {', '.join(shard['funds'])}")
+
+    @staticmethod
+    def slice(args: argparse.Namespace) -> int:
+        """
+        Answers a slice-and-dice question from the cube rollups.
+
+        Args:
+            args (argparse.Namespace): The parsed slice subcommand arguments.
+
+        Returns:
+            int: The exit code, 2 for an invalid dimension, measure or filter.
+        """
+        import duckdb
+
+        from src.cube import Cube
+
+        filters = {}
+        for item in args.filter:
+            dimension, separator, value = item.partition("=")
+            if not separator:
+                print(f"Invalid filter '{item}', expected DIMENSION=VALUE")
+                return 2
+            filters[dimension] = (
+                date.fromisoformat(value) if dimension == "MONTH" else value
+            )
+
+        with duckdb.connect(database=str(args.db_file), read_only=True) as conn:
+            try:
+                result_df = Cube.query(conn, args.by, args.measures, filters)
+            except ValueError as e:
+                print(e)
+                return 2
+        print(result_df.to_string(index=False))
+        return 0
+
+    @staticmethod
+    def landing(args: argparse.Namespace) -> None:
+        """
+        Refreshes a landing directory's index and lists the files it selects.
+
+        Args:
+            args (argparse.Namespace): The parsed landing subcommand arguments.
+        """
+        import polars as pl
+
+        from src.landing import Landing
+        from src.models.models import Config
+
+        index = Landing.refresh(
+            args.directory,
+            Config.model_fields["date_patterns"].get_default(call_default_factory=True),
+        )
+        selected = Landing.select(
+            index, args.fund or None, args.start_month, args.end_month, args.status
+        )
+        with pl.Config(tbl_rows=-1, tbl_hide_dataframe_shape=True, fmt_str_lengths=80):
+            print(
+                selected.select("FUND", "DATA_DATE", "NAME", "FORMAT", "SIZE", "STATUS")
+            )
+
+    @staticmethod
+    def regress(args: argparse.Namespace) -> int:
+        """
+        Runs the report query regression suite.
+
+        Args:
+            args (argparse.Namespace): The parsed regress subcommand arguments.
+
+        Returns:
+            int: The exit code, 1 if a query changed its result or got too slow.
+        """
+        from src.models.models import RegressionConfig
+        from src.regression import Regression
+
+        config = RegressionConfig(
+            repeats=args.repeats, max_slowdown=args.max_slowdown / 100
+        )
+        return 0 if Regression.run(config, args.update) else 1
+
+    @staticmethod
+    def build_parser() -> argparse.ArgumentParser:
+        """Builds the argument parser with one subcommand per pipeline action."""
+        parser = argparse.ArgumentParser(
+            prog="fund-etl", description="Fund reports ETL pipeline and reports."
+        )
+        subparsers = parser.add_subparsers(dest="command", required=True)
+
+        for stage in STAGES:
+            stage_parser = subparsers.add_parser(
+                stage, help=f"Run the {stage} stage only."
+            )
+            if stage in SELECTABLE_STAGES:
+                CLI.add_selection_arguments(stage_parser)
+
+        etl = subparsers.add_parser("etl", help="Run the pipeline stages in order.")
+        etl.add_argument(
+            "--stages",
+            type=lambda value: value.split(","),
+            default=list(STAGES),
+            help=f"Comma-separated stages to run (default: {','.join(STAGES)}).",
+        )
+        etl.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip stages completed by the previous, interrupted run.",
+        )
+        etl.add_argument(
+            "--state-file",
+            type=Path,
+            default=Path(FileDirectoryPath.ETL_STATE.value),
+            help="Where completed stages are recorded.",
+        )
+        etl.add_argument(
+            "--memory-limit-mb",
+            type=int,
+            help="DuckDB memory limit for the shared connection (default: DuckDB's).",
+        )
+        etl.add_argument(
+            "--threads", type=int, help="DuckDB threads for the shared connection."
+        )
+        etl.add_argument(
+            "--temp-directory",
+            type=Path,
+            help="Where DuckDB spills when the memory limit is reached.",
+        )
+
+        subparsers.add_parser(
+            "watch", help="Continuously ingest new files in the landing zone."
+        )
+
+        performance = subparsers.add_parser(
+            "performance",
+            help="Compute the fund performance report in parallel partitions.",
+        )
+        performance.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        performance.add_argument(
+            "--partition-by", choices=["fund", "month"], default="fund"
+        )
+        performance.add_argument(
+            "--snapshot-dir",
+            type=Path,
+            help="Read a Parquet snapshot written by the snapshot subcommand.",
+        )
+
+        snapshot = subparsers.add_parser(
+            "snapshot",
+            help="Export current holdings and reference prices to Parquet.",
+        )
+        snapshot.add_argument("snapshot_dir", type=Path)
+
+        shards = subparsers.add_parser(
+            "shards", help="Load into and manage sharded fund databases."
+        )
+        shards.add_argument(
+            "--shard-directory", type=Path, default=Path(FileDirectoryPath.SHARDS.value)
+        )
+        shards_commands = shards.add_subparsers(dest="shards_command", required=True)
+        shard_load = shards_commands.add_parser(
+            "load", help="Load transformed files into shards, in parallel."
+        )
+        shard_load.add_argument(
+            "--shard-by", choices=["fund_group", "year"], default="fund_group"
+        )
+        shard_load.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        shard_load.add_argument(
+            "--fund-groups",
+            type=Path,
+            help="JSON file mapping group names to fund lists.",
+        )
+        shards_commands.add_parser("list", help="Show the shards and their funds.")
+        register = shards_commands.add_parser(
+            "register-parquet", help="Register a Parquet snapshot as a shard."
+        )
+        register.add_argument("name")
+        register.add_argument("snapshot_dir", type=Path)
+
+        cube_slice = subparsers.add_parser(
+            "slice", help="Aggregate holdings from the cube rollups."
+        )
+        cube_slice.add_argument(
+            "--by",
+            type=lambda value: value.split(","),
+            default=[],
+            help="Comma-separated dimensions: FUND, MONTH, FINANCIAL_TYPE, INSTRUMENT.",
+        )
+        cube_slice.add_argument(
+            "--measures",
+            type=lambda value: value.split(","),
+            help="Comma-separated measures: MARKET_VALUE, REALISED_PL, QUANTITY, HOLDINGS.",
+        )
+        cube_slice.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            help="DIMENSION=VALUE, may be repeated (MONTH as YYYY-MM-DD).",
+        )
+        cube_slice.add_argument(
+            "--db-file", type=Path, default=Path(DatabaseContants.DATABASE_FILE.value)
+        )
+
+        landing = subparsers.add_parser(
+            "landing", help="Index the landing zone and list files by fund and month."
+        )
+        landing.add_argument(
+            "--directory",
+            type=Path,
+            default=Path(FileDirectoryPath.EXTERNAL_FUNDS_CSV.value),
+        )
+        CLI.add_selection_arguments(landing)
+        landing.add_argument(
+            "--status",
+            action="append",
+            choices=["new", "transformed", "loaded"],
+            help="Status to list, may be repeated.",
+        )
+
+        regress = subparsers.add_parser(
+            "regress",
+            help="Check report queries against golden results and latency baseline.",
+        )
+        regress.add_argument(
+            "--update",
+            action="store_true",
+            help="Record the current results and latencies as the new reference.",
+        )
+        regress.add_argument(
+            "--max-slowdown",
+            type=float,
+            default=50.0,
+            help="Largest allowed latency increase over the baseline, in percent.",
+        )
+        regress.add_argument(
+            "--repeats", type=int, default=5, help="Timed runs per query."
+        )
+
+        breaks = subparsers.add_parser(
+            "breaks", help="Build and query the reconciliation break index."
+        )
+        breaks.add_argument(
+            "--db-file", type=Path, default=Path(DatabaseContants.DATABASE_FILE.value)
+        )
+        breaks_commands = breaks.add_subparsers(dest="breaks_command", required=True)
+        build = breaks_commands.add_parser(
+            "build", help="Reconcile all funds into the recon_breaks table."
+        )
+        build.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.01,
+            help="Largest price difference that is not a break.",
+        )
+        instrument = breaks_commands.add_parser(
+            "instrument", help="Breaks of one ISIN or symbol across funds."
+        )
+        instrument.add_argument("instrument")
+        instrument.add_argument("--months", type=int, default=12)
+        instrument.add_argument(
+            "--as-of",
+            type=date.fromisoformat,
+            help="End of the window, YYYY-MM-DD (default: latest reconciled date).",
+        )
+        funds = breaks_commands.add_parser(
+            "funds", help="Funds with the most breaks in a month."
+        )
+        funds.add_argument(
+            "--month",
+            type=lambda value: date.fromisoformat(f"{value}-01"),
+            help="YYYY-MM (default: latest reconciled month).",
+        )
+        funds.add_argument("--limit", type=int, default=10)
+
+        for name, default_sql, help_text in [
+            (
+                "report",
+                FileDirectoryPath.FUND_PERFORMANCE_QUERY_SQL.value,
+                "Run a report query (default: fund performance).",
+            ),
+            (
+                "reconcile",
+                FileDirectoryPath.RECON_QUERY_SQL.value,
+                "Run the price reconciliation query.",
+            ),
+        ]:
+            report = subparsers.add_parser(name, help=help_text)
+            report.add_argument(
+                "sql_file", nargs="?", type=Path, default=Path(default_sql)
+            )
+            report.add_argument(
+                "--db-file",
+                type=Path,
+                default=Path(DatabaseContants.DATABASE_FILE.value),
+            )
+            report.add_argument(
+                "--output-dir",
+                type=Path,
+                default=Path(FileDirectoryPath.QUERY_OUTPUT.value),
+            )
+            CLI.add_shard_argument(report)
+            CLI.add_sample_arguments(report)
+        return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = CLI.build_parser().parse_args(argv)
+
+    if args.command in SELECTABLE_STAGES:
+        return (
+            0
+            if CLI.run_stage(
+                args.command,
+                funds=args.fund or None,
+                start_month=args.start_month,
+                end_month=args.end_month,
+            )
+            else 1
+        )
+    elif args.command in STAGES:
+        return 0 if CLI.run_stage(args.command) else 1
+    elif args.command == "etl":
+        unknown = set(args.stages) - set(STAGES)
+        if unknown:
+            print(f"Unknown stages: {', '.join(sorted(unknown))}")
+            return 2
+        from src.models.models import RuntimeConfig
+        from src.runtime import Runtime
+
+        config = RuntimeConfig(
+            memory_limit_mb=args.memory_limit_mb,
+            threads=args.threads,
+            temp_directory=args.temp_directory,
+        )
+        with Runtime(config) as runtime:
+            CLI.run_pipeline(args.stages, args.state_file, args.resume, runtime)
+        # The state file is only removed once every selected stage completed
+        if args.state_file.exists():
+            return 1
+    elif args.command == "watch":
+        from src.watch import Watch
+
+        Watch.watch_step()
+    elif args.command == "performance":
+        from src.performance import Performance
+
+        Performance.performance_step(args.workers, args.partition_by, args.snapshot_dir)
+    elif args.command == "snapshot":
+        from src.performance import Performance
+        from src.runtime import Runtime
+
+        with Runtime() as runtime:
+            Performance.export_snapshot(runtime.conn, args.snapshot_dir)
+    elif args.command == "shards":
+        CLI.shards(args)
+    elif args.command == "slice":
+        return CLI.slice(args)
+    elif args.command == "breaks":
+        CLI.breaks(args)
+    elif args.command == "landing":
+        CLI.landing(args)
+    elif args.command == "regress":
+        return CLI.regress(args)
+    else:
+        CLI.report(args.sql_file, args.db_file, args.output_dir, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,41 @@ from enum import Enum
 
 class DatabaseContants(Enum):
     DATABASE_FILE = "financial_data.duckdb"
+    FINANCIAL_TYPE_ENUM = "financial_type_enum"
 
 
 class FileDirectoryPath(Enum):
     MASTER_REFERENCE_SQL = "./master-reference-sql.sql"
+    REFERENCE_DATA = "./reference_data"
+    FX_RATES = "./reference_data/fx_rates.csv"
+    FUND_CURRENCIES = "./fund_currencies.json"
     EXTERNAL_FUNDS_CSV = "./external_funds"
     EXTERNAL_FUNDS_CSV_TRANSFORMED = "./external_funds_transformed"
+    EXTERNAL_FUNDS_CSV_QUARANTINE = "./external_funds_quarantine"
+    RECON_QUERY_SQL = "./queries/recon_query.sql"
+    FUND_PERFORMANCE_QUERY_SQL = "./queries/fund_performance_query.sql"
+    QUERY_OUTPUT = "./query_output"
+    ETL_STATE = "./.etl_state.json"
+    SHARDS = "./shards"
+    QUERIES = "./queries"
+    REGRESSION = "./tests/regression"
+    REGRESSION_FUNDS = "./tests/regression/funds"
+
+
+class PipelineDefaults(Enum):
+    MEMORY_BUDGET_MB = 1024
+    IN_MEMORY_EXPANSION = 4
+    BASE_CURRENCY = "USD"
+    MAX_FX_RATE_AGE_DAYS = 7
+
+
+class FinancialType(Enum):
+    EQUITIES = "Equities"
+    GOVERNMENT_BOND = "Government Bond"
+    CASH = "CASH"
+
+
+class LandingStatus(Enum):
+    NEW = "new"
+    TRANSFORMED = "transformed"
+    LOADED = "loaded"
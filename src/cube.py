@@ -0,0 +1,200 @@
+from typing import Any, Dict, List, Optional
+
+import duckdb
+import pandas as pd
+
+from src.recon import Recon
+from src.runtime import Runtime
+
+DIMENSIONS = ("FUND", "MONTH", "FINANCIAL_TYPE", "INSTRUMENT")
+
+# Additive measures only, so any rollup can be re-aggregated into a coarser one
+MEASURES = {
+    "MARKET_VALUE": "SUM(MARKET_VALUE)",
+    "REALISED_PL": "SUM(REALISED_PL)",
+    "QUANTITY": "SUM(QUANTITY)",
+    "HOLDINGS": "COUNT(*)",
+}
+
+# Materialized rollups, from the finest to the coarsest
+ROLLUPS = [
+    ("FUND", "MONTH", "FINANCIAL_TYPE", "INSTRUMENT"),
+    ("MONTH", "FINANCIAL_TYPE", "INSTRUMENT"),
+    ("FUND", "MONTH", "FINANCIAL_TYPE"),
+    ("FUND", "MONTH"),
+    ("MONTH", "FINANCIAL_TYPE"),
+]
+
+
+class Cube:
+
+    @staticmethod
+    def rollup_table(dimensions: tuple) -> str:
+        """Returns the table name of the rollup over the given dimensions."""
+        return "cube_" + "_".join(dimension.lower() for dimension in dimensions)
+
+    @staticmethod
+    def build(conn: duckdb.DuckDBPyConnection) -> Dict[str, int]:
+        """
+        Materializes every rollup of the fund holdings in a single scan with GROUPING
+        SETS, and records each rollup's dimensions and size in cube_rollups.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+
+        Returns:
+            Dict[str, int]: Rollup table name mapped to its number of rows.
+        """
+        funds = Recon.list_funds(conn)
+        if not funds:
+            print("No fund holdings to aggregate.")
+            return {}
+
+        holdings = " UNION ALL ".join(
+            f"""
+            SELECT
+                '{fund}' AS FUND,
+                DATE_TRUNC('month', DATA_DATE::DATE)::DATE AS MONTH,
+                FINANCIAL_TYPE::VARCHAR AS FINANCIAL_TYPE,
+                SYMBOL AS INSTRUMENT,
+                MARKET_VALUE_BASE AS MARKET_VALUE,
+                REALISED_PL_BASE AS REALISED_PL,
+                QUANTITY
+            FROM {fund}
+            """
+            for fund in funds
+        )
+        dimensions = ", ".join(DIMENSIONS)
+        measures = ", ".join(f"{expr} AS {name}" for name, expr in MEASURES.items())
+        grouping_sets = ", ".join(f"({', '.join(rollup)})" for rollup in ROLLUPS)
+        conn.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE cube_grouping_sets AS
+            SELECT {dimensions}, GROUPING({dimensions}) AS GROUPING_ID, {measures}
+            FROM ({holdings})
+            GROUP BY GROUPING SETS ({grouping_sets})
+        """
+        )
+
+        sizes = {}
+        for rollup in ROLLUPS:
+            table = Cube.rollup_table(rollup)
+            # GROUPING sets a bit, first dimension highest, for every dimension left out
+            grouping_id = sum(
+                1 << (len(DIMENSIONS) - 1 - i)
+                for i, dimension in enumerate(DIMENSIONS)
+                if dimension not in rollup
+            )
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TABLE {table} AS
+                SELECT {', '.join(rollup)}, {', '.join(MEASURES)}
+                FROM cube_grouping_sets
+                WHERE GROUPING_ID = {grouping_id}
+                ORDER BY {', '.join(rollup)}
+            """
+            )
+            sizes[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        conn.execute("DROP TABLE cube_grouping_sets")
+
+        conn.execute(
+            """
+            CREATE OR REPLACE TABLE cube_rollups (
+                TABLE_NAME VARCHAR, DIMENSIONS VARCHAR[], ROW_COUNT BIGINT
+            )
+        """
+        )
+        conn.executemany(
+            "INSERT INTO cube_rollups VALUES (?, ?, ?)",
+            [
+                [Cube.rollup_table(r), list(r), sizes[Cube.rollup_table(r)]]
+                for r in ROLLUPS
+            ],
+        )
+        print(f"Built {len(sizes)} cube rollups over {len(funds)} funds")
+        return sizes
+
+    @staticmethod
+    def choose_rollup(conn: duckdb.DuckDBPyConnection, dimensions: List[str]) -> str:
+        """
+        Picks the smallest rollup that holds every requested dimension.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            dimensions (List[str]): Dimensions grouped by or filtered on.
+
+        Returns:
+            str: The rollup table name.
+        """
+        return conn.execute(
+            """
+            SELECT TABLE_NAME
+            FROM cube_rollups
+            WHERE list_has_all(DIMENSIONS, ?::VARCHAR[])
+            ORDER BY ROW_COUNT, len(DIMENSIONS)
+            LIMIT 1
+        """,
+            [dimensions],
+        ).fetchone()[0]
+
+    @staticmethod
+    def query(
+        conn: duckdb.DuckDBPyConnection,
+        dimensions: List[str],
+        measures: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        Aggregates measures by dimensions from the coarsest matching rollup, so the
+        row-level holdings are never scanned.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            dimensions (List[str]): Dimensions to group by, from DIMENSIONS.
+            measures (Optional[List[str]]): Measures to return, all if not given.
+            filters (Optional[Dict[str, Any]]): Dimension mapped to the value to keep.
+
+        Returns:
+            pd.DataFrame: One row per combination of the dimensions.
+
+        Raises:
+            ValueError: If a dimension or measure is unknown.
+        """
+        measures = measures or list(MEASURES)
+        filters = filters or {}
+        unknown = [d for d in [*dimensions, *filters] if d not in DIMENSIONS] + [
+            m for m in measures if m not in MEASURES
+        ]
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions or measures: {unknown}")
+
+        table = Cube.choose_rollup(conn, list(dict.fromkeys([*dimensions, *filters])))
+        select = [
+            *dimensions,
+            *(
+                f"SUM({m})::{'BIGINT' if m == 'HOLDINGS' else 'DOUBLE'} AS {m}"
+                for m in measures
+            ),
+        ]
+        where = " AND ".join(f"{d} = ?" for d in filters) or "TRUE"
+        group_by = f"GROUP BY {', '.join(dimensions)} ORDER BY {', '.join(dimensions)}"
+        return conn.execute(
+            f"""
+            SELECT {', '.join(select)}
+            FROM {table}
+            WHERE {where}
+            {group_by if dimensions else ''}
+        """,
+            list(filters.values()),
+        ).df()
+
+    @staticmethod
+    def cube_step(runtime: Optional[Runtime] = None) -> None:
+        """
+        Main function to rebuild the cube rollups after Load.
+
+        Args:
+            runtime (Optional[Runtime]): The pipeline run's shared connection owner.
+        """
+        with Runtime.use(runtime) as runtime:
+            Cube.build(runtime.conn)
@@ -0,0 +1,243 @@
+import json
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+import polars as pl
+
+from src.models.models import FxConfig
+from src.utils.utils import ETLUtils, FrameT
+from src.config.constants import FileDirectoryPath
+
+# Local currency amounts converted to the base currency into <column>_BASE
+AMOUNT_COLUMNS = ("PRICE", "REALISED_PL", "MARKET_VALUE")
+
+# Columns added by the stage, replaced when a file is normalized again
+FX_COLUMNS = ("FX_RATE", *(f"{column}_BASE" for column in AMOUNT_COLUMNS))
+
+
+class FX:
+
+    @staticmethod
+    def read_rates(fx_rates_file: Path) -> pl.DataFrame:
+        """
+        Reads the daily FX rates, sorted by date for as-of lookups.
+
+        Args:
+            fx_rates_file (Path): CSV with DATE, CURRENCY and RATE columns.
+
+        Returns:
+            pl.DataFrame: The rates, empty if the file does not exist.
+        """
+        schema = {"DATE": pl.Date, "CURRENCY": pl.String, "RATE": pl.Float64}
+        if not Path(fx_rates_file).exists():
+            return pl.DataFrame(schema=schema)
+        return (
+            pl.read_csv(fx_rates_file, schema_overrides={"DATE": pl.Date})
+            .select(
+                pl.col("DATE"),
+                pl.col("CURRENCY").str.strip_chars().str.to_uppercase(),
+                pl.col("RATE").cast(pl.Float64),
+            )
+            .sort("DATE")
+        )
+
+    @staticmethod
+    def rates_as_of(
+        rates: pl.DataFrame, data_date: Optional[date], config: FxConfig
+    ) -> pl.DataFrame:
+        """
+        Picks the latest rate of every currency on or before a report date, no older
+        than config.max_rate_age_days.
+
+        Args:
+            rates (pl.DataFrame): Output of read_rates.
+            data_date (Optional[date]): The report date, no rates if None.
+            config (FxConfig): FX settings.
+
+        Returns:
+            pl.DataFrame: One CURRENCY and RATE row per currency with a fresh rate.
+        """
+        if data_date is None:
+            return rates.select("CURRENCY", "RATE").clear()
+        window = pl.col("DATE") <= data_date
+        if config.max_rate_age_days is not None:
+            window &= pl.col("DATE") >= data_date - timedelta(
+                days=config.max_rate_age_days
+            )
+        return (
+            rates.filter(window)
+            .group_by("CURRENCY", maintain_order=True)
+            .agg(pl.col("RATE").last())
+        )
+
+    @staticmethod
+    def normalize_frame(
+        frame: FrameT, rates: pl.DataFrame, currency: str, config: FxConfig
+    ) -> FrameT:
+        """
+        Converts the amounts of a fund report to the base currency: every holding
+        takes the latest rate of its currency on or before the report's DATA_DATE,
+        no older than config.max_rate_age_days. A report has a single DATA_DATE, so
+        the rates are looked up once, from its first row, and joined on CURRENCY,
+        which streams without sorting the report. The local amounts are kept and
+        CURRENCY, FX_RATE and <amount>_BASE columns added; holdings without a rate
+        get null FX_RATE and base amounts. Works on eager and lazy frames.
+
+        Args:
+            frame (FrameT): Transformed fund data with a Date DATA_DATE.
+            rates (pl.DataFrame): Output of read_rates.
+            currency (str): The report's currency, for rows without a CURRENCY.
+            config (FxConfig): FX settings.
+
+        Returns:
+            FrameT: The frame with the currency columns, in its original row order.
+        """
+        schema = frame.collect_schema()
+        frame = frame.drop([column for column in FX_COLUMNS if column in schema])
+        local_currency = pl.lit(currency.upper())
+        if "CURRENCY" in schema:
+            local_currency = (
+                pl.col("CURRENCY")
+                .cast(pl.String)
+                .str.to_uppercase()
+                .fill_null(local_currency)
+            )
+        frame = frame.with_columns(local_currency.alias("CURRENCY"))
+        columns = frame.collect_schema().names()
+
+        first_row = frame.select("DATA_DATE").head(1)
+        if isinstance(first_row, pl.LazyFrame):
+            first_row = first_row.collect()
+        rates = FX.rates_as_of(
+            rates, first_row["DATA_DATE"][0] if first_row.height else None, config
+        )
+        rates = rates.lazy() if isinstance(frame, pl.LazyFrame) else rates
+        fx_rate = (
+            pl.when(pl.col("CURRENCY") == config.base_currency.upper())
+            .then(pl.lit(1.0))
+            .otherwise(pl.col("RATE"))
+        )
+        return (
+            frame.join(rates, on="CURRENCY", how="left", maintain_order="left")
+            .with_columns(fx_rate.alias("FX_RATE"))
+            .with_columns(
+                (pl.col(column) * pl.col("FX_RATE")).alias(f"{column}_BASE")
+                for column in AMOUNT_COLUMNS
+                if column in columns
+            )
+            .select(
+                *columns,
+                "FX_RATE",
+                *(f"{column}_BASE" for column in AMOUNT_COLUMNS if column in columns),
+            )
+        )
+
+    @staticmethod
+    def normalize_file(
+        filename: str, config: FxConfig, rates: pl.DataFrame
+    ) -> Optional[int]:
+        """
+        Adds the base currency columns to a transformed fund file, in place. A file
+        over config.memory_budget_mb is streamed to the output in row batches and its
+        missing rates counted from the written file, so it is never held in memory.
+
+        Args:
+            filename (str): The name of the transformed CSV file.
+            config (FxConfig): FX settings.
+            rates (pl.DataFrame): Output of read_rates.
+
+        Returns:
+            Optional[int]: The number of holdings left without a rate, None if the
+                file could not be normalized and was left unchanged.
+        """
+        file_path = Path(config.input_directory) / filename
+        currency = config.fund_currencies.get(
+            ETLUtils.extract_table_name(filename), config.base_currency
+        )
+        temp_path = file_path.with_suffix(".fx.tmp")
+        try:
+            normalized = FX.normalize_frame(
+                ETLUtils.encode_columns(pl.scan_csv(file_path)), rates, currency, config
+            )
+            chunk_rows = ETLUtils.rows_per_chunk(file_path, config.memory_budget_mb)
+            if chunk_rows:
+                with pl.Config(streaming_chunk_size=chunk_rows):
+                    normalized.sink_csv(
+                        temp_path, batch_size=chunk_rows, engine="streaming"
+                    )
+                missing = (
+                    pl.scan_csv(temp_path)
+                    .filter(pl.col("FX_RATE").is_null())
+                    .select(pl.len())
+                    .collect(engine="streaming")
+                    .item()
+                )
+            else:
+                normalized = normalized.collect()
+                normalized.write_csv(temp_path)
+                missing = normalized["FX_RATE"].null_count()
+            os.replace(temp_path, file_path)
+        except Exception as e:
+            print(f"Error normalizing '{filename}' to {config.base_currency}: {e}")
+            return None
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        if missing:
+            print(f"No FX rate for {missing} holdings of '{filename}' in {currency}")
+        return missing
+
+    @staticmethod
+    def process_files(config: FxConfig) -> None:
+        """
+        Normalizes every transformed fund file in the input directory.
+
+        Args:
+            config (FxConfig): FX settings.
+        """
+        rates = FX.read_rates(config.fx_rates_file)
+        for filename in os.listdir(config.input_directory):
+            if filename.lower().endswith(".csv"):
+                FX.normalize_file(filename, config, rates)
+
+    @staticmethod
+    def default_config(input_directory: Path) -> FxConfig:
+        """
+        Builds the FX settings, reading the fund currencies if the file exists.
+
+        Args:
+            input_directory (Path): Path to the directory of transformed CSV files.
+
+        Returns:
+            FxConfig: The FX settings.
+        """
+        currencies_file = Path(FileDirectoryPath.FUND_CURRENCIES.value)
+        return FxConfig(
+            input_directory=input_directory,
+            fund_currencies=(
+                json.loads(currencies_file.read_text(encoding="UTF-8"))
+                if currencies_file.exists()
+                else {}
+            ),
+        )
+
+    @staticmethod
+    def fx_step() -> bool:
+        """
+        Main function to execute the FX normalization stage.
+
+        Returns:
+            bool: True if the stage finished, False if it failed.
+        """
+        try:
+            FX.process_files(
+                FX.default_config(
+                    Path(FileDirectoryPath.EXTERNAL_FUNDS_CSV_TRANSFORMED.value)
+                )
+            )
+            return True
+        except Exception as e:
+            print(f"Error encountered in fx_step : {e}")
+            return False
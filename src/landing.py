@@ -0,0 +1,328 @@
+import os
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import polars as pl
+
+from src.models.models import RawFile
+from src.utils.utils import ETLUtils
+from src.config.constants import LandingStatus
+
+INDEX_FILE = ".landing_index.parquet"
+
+FileSignature = Tuple[int, int]
+
+INDEX_SCHEMA = {
+    "FILENAME": pl.String,
+    "MEMBER": pl.String,
+    "NAME": pl.String,
+    "FUND": pl.String,
+    "DATA_DATE": pl.Date,
+    "FORMAT": pl.String,
+    "SIZE": pl.Int64,
+    "MTIME_NS": pl.Int64,
+    "STATUS": pl.String,
+}
+
+
+class Landing:
+    """
+    Keeps a Parquet index next to the files of a landing directory, one row per CSV
+    input with its fund, report date, format, size and processing status. Refreshing
+    the index only stats the directory and parses the names of new or modified
+    files, so stages select the funds and months they need without re-deriving them
+    from every filename.
+    """
+
+    @staticmethod
+    def index_path(directory: os.PathLike) -> Path:
+        """Returns the path of the index kept in a landing directory."""
+        return Path(directory) / INDEX_FILE
+
+    @staticmethod
+    def scan(directory: os.PathLike) -> Dict[str, FileSignature]:
+        """
+        Takes a snapshot of the plain and compressed CSV files in a directory.
+
+        Args:
+            directory (os.PathLike): The directory to scan.
+
+        Returns:
+            Dict[str, FileSignature]: Filename mapped to its (mtime_ns, size).
+        """
+        snapshot = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and ETLUtils.is_raw_file(entry.name):
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    @staticmethod
+    def parse_names(names: pl.Expr, patterns: List[str]) -> Tuple[pl.Expr, pl.Expr]:
+        """
+        Vectorized ETLUtils.extract_table_name and ETLUtils.extract_date: derives the
+        fund and report date of a whole column of filenames at once.
+
+        Args:
+            names (pl.Expr): The CSV input names.
+            patterns (List[str]): Regex patterns extracting the date, tried in order.
+
+        Returns:
+            Tuple[pl.Expr, pl.Expr]: The snake_case fund and the report date, null
+                where they cannot be derived.
+        """
+        fund = (
+            names.str.extract(r"^([^\.]+)\.", 1)
+            .str.replace_all(r"[^\w\s\-]", "")
+            .str.replace_all(r"[\s\-]+", "_")
+            .str.replace_all(r"([a-z0-9])([A-Z])", "${1}_${2}")
+            .str.to_lowercase()
+        )
+
+        candidates = []
+        for pattern in patterns:
+            value = names.str.extract(pattern, 1)
+            first_part = value.str.slice(0, 2).cast(pl.Int32, strict=False)
+            candidates.append(
+                pl.when(value.str.contains(r"^\d{4}-\d{2}-\d{2}$"))
+                .then(value.str.to_date("%Y-%m-%d", strict=False))
+                .when(value.str.contains(r"^\d{2}-\d{2}-\d{4}$") & (first_part <= 12))
+                .then(value.str.to_date("%m-%d-%Y", strict=False))
+                .when(value.str.contains(r"^\d{2}-\d{2}-\d{4}$"))
+                .then(value.str.to_date("%d-%m-%Y", strict=False))
+                .when(value.str.contains(r"^\d{2}_\d{2}_\d{4}$"))
+                .then(
+                    pl.coalesce(
+                        value.str.to_date("%m_%d_%Y", strict=False),
+                        value.str.to_date("%d_%m_%Y", strict=False),
+                    )
+                )
+                .when(value.str.contains(r"^\d{8}$"))
+                .then(value.str.to_date("%Y%m%d", strict=False))
+                .otherwise(value.str.to_date("%Y-%m-%d", strict=False))
+            )
+        # Like extract_date, a match that is not a valid date falls through to the
+        # next pattern
+        return fund, pl.coalesce(candidates)
+
+    @staticmethod
+    def index_files(
+        directory: os.PathLike,
+        snapshot: Dict[str, FileSignature],
+        patterns: List[str],
+    ) -> pl.DataFrame:
+        """
+        Builds index rows for landing files, one per CSV input they hold.
+
+        Args:
+            directory (os.PathLike): The landing directory.
+            snapshot (Dict[str, FileSignature]): The files to index, with their
+                (mtime_ns, size).
+            patterns (List[str]): Regex patterns extracting the report date.
+
+        Returns:
+            pl.DataFrame: New index rows, all with status NEW.
+        """
+        rows = []
+        for filename, (mtime_ns, size) in snapshot.items():
+            for raw_file in ETLUtils.expand_raw_file(Path(directory) / filename):
+                rows.append(
+                    (
+                        filename,
+                        raw_file.member,
+                        raw_file.name,
+                        raw_file.compression or "csv",
+                        size,
+                        mtime_ns,
+                    )
+                )
+
+        fund, data_date = Landing.parse_names(pl.col("NAME"), patterns)
+        return (
+            pl.DataFrame(
+                rows,
+                schema=["FILENAME", "MEMBER", "NAME", "FORMAT", "SIZE", "MTIME_NS"],
+                schema_overrides={
+                    name: INDEX_SCHEMA[name]
+                    for name in ["FILENAME", "MEMBER", "NAME", "FORMAT"]
+                },
+                orient="row",
+            )
+            .with_columns(
+                pl.col("SIZE", "MTIME_NS").cast(pl.Int64),
+                fund.alias("FUND"),
+                data_date.alias("DATA_DATE"),
+                pl.lit(LandingStatus.NEW.value).alias("STATUS"),
+            )
+            .select(list(INDEX_SCHEMA))
+        )
+
+    @staticmethod
+    def read_index(directory: os.PathLike) -> pl.DataFrame:
+        """
+        Reads a landing directory's index.
+
+        Args:
+            directory (os.PathLike): The landing directory.
+
+        Returns:
+            pl.DataFrame: The index, empty if the directory has none.
+        """
+        index_path = Landing.index_path(directory)
+        if not index_path.exists():
+            return pl.DataFrame(schema=INDEX_SCHEMA)
+        return pl.read_parquet(index_path)
+
+    @staticmethod
+    def write_index(directory: os.PathLike, index: pl.DataFrame) -> None:
+        """
+        Replaces a landing directory's index, atomically so a reader never sees a
+        partial file.
+
+        Args:
+            directory (os.PathLike): The landing directory.
+            index (pl.DataFrame): The index rows.
+        """
+        index_path = Landing.index_path(directory)
+        temp_path = index_path.with_suffix(".tmp")
+        try:
+            index.sort("FUND", "DATA_DATE", "NAME", nulls_last=True).write_parquet(
+                temp_path
+            )
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            # A read-only landing zone is still processed, just re-indexed each run
+            print(f"Could not write the landing index '{index_path}': {e}")
+
+    @staticmethod
+    def refresh(directory: os.PathLike, patterns: List[str]) -> pl.DataFrame:
+        """
+        Brings a landing directory's index up to date. Files whose size and mtime are
+        unchanged keep their rows and status; new and modified files are indexed as
+        NEW and removed files are dropped.
+
+        Args:
+            directory (os.PathLike): The landing directory.
+            patterns (List[str]): Regex patterns extracting the report date.
+
+        Returns:
+            pl.DataFrame: The refreshed index.
+        """
+        index = Landing.read_index(directory)
+        snapshot = Landing.scan(directory)
+        stats = pl.DataFrame(
+            {
+                "FILENAME": list(snapshot),
+                "MTIME_NS": [signature[0] for signature in snapshot.values()],
+                "SIZE": [signature[1] for signature in snapshot.values()],
+            },
+            schema={
+                name: INDEX_SCHEMA[name] for name in ["FILENAME", "MTIME_NS", "SIZE"]
+            },
+        )
+
+        signature = ["FILENAME", "SIZE", "MTIME_NS"]
+        unchanged = index.join(stats, on=signature, how="semi")
+        changed = stats.join(index, on=signature, how="anti")
+        indexed = Landing.index_files(
+            directory,
+            {
+                filename: (mtime_ns, size)
+                for filename, mtime_ns, size in changed.select(
+                    "FILENAME", "MTIME_NS", "SIZE"
+                ).iter_rows()
+            },
+            patterns,
+        )
+
+        if changed.height or unchanged.height != index.height:
+            print(
+                f"Indexed {changed.height} new or modified files in '{directory}', "
+                f"dropped {index.height - unchanged.height} index rows"
+            )
+            index = pl.concat([unchanged, indexed])
+            Landing.write_index(directory, index)
+        return index
+
+    @staticmethod
+    def select(
+        index: pl.DataFrame,
+        funds: Optional[List[str]] = None,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+        statuses: Optional[List[str]] = None,
+    ) -> pl.DataFrame:
+        """
+        Selects index rows by fund, report month range and status.
+
+        Args:
+            index (pl.DataFrame): The landing index.
+            funds (Optional[List[str]]): Funds to keep, all if not given.
+            start_month (Optional[date]): First report month kept, any day of it.
+            end_month (Optional[date]): Last report month kept, any day of it.
+            statuses (Optional[List[str]]): Statuses to keep, all if not given.
+
+        Returns:
+            pl.DataFrame: The matching rows, in fund, date and name order.
+        """
+        month = pl.col("DATA_DATE").dt.truncate("1mo")
+        predicates = []
+        if funds:
+            predicates.append(pl.col("FUND").is_in(funds))
+        if start_month:
+            predicates.append(month >= start_month.replace(day=1))
+        if end_month:
+            predicates.append(month <= end_month.replace(day=1))
+        if statuses:
+            predicates.append(pl.col("STATUS").is_in(statuses))
+        selected = index.filter(predicates) if predicates else index
+        return selected.sort("FUND", "DATA_DATE", "NAME", nulls_last=True)
+
+    @staticmethod
+    def raw_files(directory: os.PathLike, rows: pl.DataFrame) -> List[RawFile]:
+        """
+        Turns index rows back into the CSV inputs they describe.
+
+        Args:
+            directory (os.PathLike): The landing directory.
+            rows (pl.DataFrame): Index rows.
+
+        Returns:
+            List[RawFile]: The CSV inputs, in row order.
+        """
+        return [
+            RawFile(
+                name=name,
+                path=Path(directory) / filename,
+                compression=None if file_format == "csv" else file_format,
+                member=member,
+            )
+            for filename, member, name, file_format in rows.select(
+                "FILENAME", "MEMBER", "NAME", "FORMAT"
+            ).iter_rows()
+        ]
+
+    @staticmethod
+    def mark(directory: os.PathLike, names: List[str], status: LandingStatus) -> None:
+        """
+        Records the status of CSV inputs in a landing directory's index.
+
+        Args:
+            directory (os.PathLike): The landing directory.
+            names (List[str]): Names of the CSV inputs.
+            status (LandingStatus): Their new status.
+        """
+        if not names:
+            return
+        index = Landing.read_index(directory)
+        Landing.write_index(
+            directory,
+            index.with_columns(
+                pl.when(pl.col("NAME").is_in(names))
+                .then(pl.lit(status.value))
+                .otherwise(pl.col("STATUS"))
+                .alias("STATUS")
+            ),
+        )
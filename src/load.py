@@ -1,113 +1,352 @@
 import os
+from datetime import date, datetime
 from pathlib import Path
+from typing import List, Optional
 
 import duckdb
 
+from src.landing import Landing
+from src.models.models import Config
+from src.runtime import Runtime
 from src.utils.utils import ETLUtils
-from src.config.constants import DatabaseContants, FileDirectoryPath
+from src.config.constants import (
+    DatabaseContants,
+    FileDirectoryPath,
+    FinancialType,
+    LandingStatus,
+)
+
+# Bookkeeping columns of the <fund>_history tables, hidden by the current-version views
+VERSIONING_COLUMNS = "LOADED_AT, SOURCE_FILE, FILE_HASH, IS_CURRENT"
 
 
 class Load:
 
     @staticmethod
-    def create_or_replace_table(
+    def encode_columns(conn: duckdb.DuckDBPyConnection, table_name: str) -> None:
+        """
+        Stores FINANCIAL_TYPE as an ENUM and DATA_DATE as a DATE, so every row holds
+        a one-byte code and a date instead of repeated text and filters such as
+        financial_type = 'Equities' compare integers. Tables already encoded are left
+        unchanged.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            table_name (str): The table to encode.
+        """
+        enum_type = DatabaseContants.FINANCIAL_TYPE_ENUM.value
+        if not conn.execute(
+            "SELECT COUNT(*) FROM duckdb_types() WHERE type_name = ?", [enum_type]
+        ).fetchone()[0]:
+            values = ", ".join(f"'{t.value}'" for t in FinancialType)
+            conn.execute(f"CREATE TYPE {enum_type} AS ENUM ({values})")
+
+        column_types = dict(
+            conn.execute(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_name = ?",
+                [table_name],
+            ).fetchall()
+        )
+        if column_types.get("FINANCIAL_TYPE") == "VARCHAR":
+            conn.execute(
+                f"ALTER TABLE {table_name} ALTER FINANCIAL_TYPE TYPE {enum_type}"
+            )
+        if column_types.get("DATA_DATE") not in (None, "DATE"):
+            conn.execute(f"ALTER TABLE {table_name} ALTER DATA_DATE TYPE DATE")
+
+    @staticmethod
+    def ensure_history(
         conn: duckdb.DuckDBPyConnection, table_name: str, csv_file: Path
     ) -> None:
         """
-        Creates or replaces a table in DuckDB based on the CSV schema.
+        Creates the versioned history table for a fund, its current-version view and
+        its as-known-at table macro. A plain table left by earlier loads is migrated
+        into the history as the current version, and columns new in the CSV file are
+        added to the history.
 
         Args:
             conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
-            table_name (str): The name of the table to create or replace.
-            csv_file (Path): Path to the CSV file.
+            table_name (str): The fund table name; history goes to <table_name>_history.
+            csv_file (Path): Path to a CSV file with the fund's schema.
         """
-        print(f"Creating or replacing table '{table_name}' based on '{csv_file.name}'")
-        create_table_query = f"""
-            CREATE OR REPLACE TABLE {table_name} AS 
-            SELECT * 
+        history_table = f"{table_name}_history"
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {history_table} AS
+            SELECT
+                *,
+                NULL::TIMESTAMP AS LOADED_AT,
+                NULL::VARCHAR AS SOURCE_FILE,
+                NULL::VARCHAR AS FILE_HASH,
+                NULL::BOOLEAN AS IS_CURRENT
             FROM read_csv_auto('{csv_file}')
             LIMIT 0
         """
+        )
+
+        # Columns added to the deliveries since the history was created, such as the
+        # FX stage's base currency amounts, are null for the older versions
+        history_columns = {
+            name
+            for (name,) in conn.execute(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = ?",
+                [history_table],
+            ).fetchall()
+        }
+        for name, column_type, *_ in conn.execute(
+            f"DESCRIBE SELECT * FROM read_csv_auto('{csv_file}')"
+        ).fetchall():
+            if name not in history_columns:
+                conn.execute(
+                    f'ALTER TABLE {history_table} ADD COLUMN "{name}" {column_type}'
+                )
+
+        Load.encode_columns(conn, history_table)
+
+        table_type = conn.execute(
+            "SELECT table_type FROM information_schema.tables WHERE table_name = ?",
+            [table_name],
+        ).fetchone()
+        if table_type and table_type[0] == "BASE TABLE":
+            print(f"Migrating table '{table_name}' into '{history_table}'")
+            conn.execute(
+                f"""
+                INSERT INTO {history_table} BY NAME
+                SELECT *, now() AS LOADED_AT, TRUE AS IS_CURRENT FROM {table_name}
+            """
+            )
+            conn.execute(f"DROP TABLE {table_name}")
+
+        conn.execute(
+            f"""
+            CREATE OR REPLACE VIEW {table_name} AS
+            SELECT * EXCLUDE ({VERSIONING_COLUMNS})
+            FROM {history_table}
+            WHERE IS_CURRENT
+        """
+        )
+        conn.execute(
+            f"""
+            CREATE OR REPLACE MACRO {table_name}_as_of(known_at) AS TABLE
+            SELECT * EXCLUDE ({VERSIONING_COLUMNS})
+            FROM {history_table}
+            WHERE LOADED_AT <= known_at
+            QUALIFY LOADED_AT = MAX(LOADED_AT) OVER (PARTITION BY DATA_DATE)
+        """
+        )
+
+    @staticmethod
+    def load_versioned(
+        conn: duckdb.DuckDBPyConnection,
+        table_name: str,
+        csv_file: Path,
+        loaded_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Appends a fund delivery to the fund's history table as the current version of
+        its DATA_DATE, superseding any earlier delivery for that date. Re-loading a
+        file identical to the current version is a no-op.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            table_name (str): The fund table name.
+            csv_file (Path): Path to the transformed CSV file.
+            loaded_at (Optional[datetime]): Load timestamp, defaults to now.
+
+        Returns:
+            bool: True if a new version was stored, False otherwise.
+        """
+        history_table = f"{table_name}_history"
+        file_hash = ETLUtils.file_hash(csv_file)
+        loaded_at = loaded_at or datetime.now()
+
         try:
-            conn.execute(create_table_query)
-            print(f"Table '{table_name}' created or replaced successfully.")
+            conn.execute("BEGIN TRANSACTION")
+            Load.ensure_history(conn, table_name, csv_file)
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TEMP TABLE delivery AS
+                SELECT * FROM read_csv_auto('{csv_file}')
+            """
+            )
+            unchanged = conn.execute(
+                f"""
+                SELECT COUNT(*) > 0
+                FROM {history_table}
+                WHERE IS_CURRENT
+                    AND FILE_HASH = ?
+                    AND DATA_DATE IN (SELECT DISTINCT DATA_DATE FROM delivery)
+            """,
+                [file_hash],
+            ).fetchone()[0]
+            if unchanged:
+                conn.execute("ROLLBACK")
+                print(f"'{csv_file.name}' is already the current version. Skipping.\n")
+                return False
+
+            conn.execute(
+                f"""
+                UPDATE {history_table}
+                SET IS_CURRENT = FALSE
+                WHERE IS_CURRENT
+                    AND DATA_DATE IN (SELECT DISTINCT DATA_DATE FROM delivery)
+            """
+            )
+            conn.execute(
+                f"""
+                INSERT INTO {history_table} BY NAME
+                SELECT
+                    *,
+                    ?::TIMESTAMP AS LOADED_AT,
+                    ? AS SOURCE_FILE,
+                    ? AS FILE_HASH,
+                    TRUE AS IS_CURRENT
+                FROM delivery
+            """,
+                [loaded_at, csv_file.name, file_hash],
+            )
+            conn.execute("DROP TABLE delivery")
+            conn.execute("COMMIT")
+            print(f"Stored '{csv_file.name}' as current version in '{history_table}'\n")
+            return True
         except Exception as e:
-            print(f"Error creating or replacing table '{table_name}': {e}")
+            conn.execute("ROLLBACK")
+            print(f"Error loading '{csv_file.name}' into '{history_table}': {e}\n")
+            return False
 
     @staticmethod
-    def ingest_csv_to_table(
+    def is_current(
         conn: duckdb.DuckDBPyConnection, table_name: str, csv_file: Path
-    ) -> None:
+    ) -> bool:
         """
-        Inserts data from the CSV file into the specified table.
+        Checks whether a file's content is a current version in its fund's history.
 
         Args:
             conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
-            table_name (str): The name of the table to insert data into.
-            csv_file (Path): Path to the CSV file.
-        """
-        print(f"Inserting data from '{csv_file.name}' into table '{table_name}'")
-        copy_query = f"""
-            COPY {table_name} FROM '{csv_file}' 
-            (FORMAT CSV, HEADER TRUE)
+            table_name (str): The fund table name.
+            csv_file (Path): Path to the transformed CSV file.
+
+        Returns:
+            bool: True if the history holds the file as a current version.
         """
         try:
-            conn.execute(copy_query)
-            print(f"Data inserted into table '{table_name}' successfully.\n")
-        except Exception as e:
-            print(f"Error inserting data into table '{table_name}': {e}\n")
+            return conn.execute(
+                f"SELECT COUNT(*) > 0 FROM {table_name}_history "
+                "WHERE IS_CURRENT AND FILE_HASH = ?",
+                [ETLUtils.file_hash(csv_file)],
+            ).fetchone()[0]
+        except duckdb.CatalogException:
+            return False
 
     @staticmethod
     def process_files(config) -> None:
         """
-        Processes all CSV files in the input directory by creating/replacing tables
-        and inserting data into DuckDB.
+        Processes the CSV files in the input directory, limited to the configured
+        funds and months, by storing each one as the current version in its fund's
+        history table. Files and their funds come from the directory's landing index.
 
         Args:
             config (Config): Configuration settings.
         """
-        table_record = []
-        for filename in os.listdir(config.get("input_directory")):
-            if filename.lower().endswith(".csv"):
-                file_path = os.path.join(config.get("input_directory"), filename)
-                table_name = ETLUtils.extract_table_name(filename)
-
-                if not table_name:
-                    print(
-                        f"Could not extract table name from '{filename}'. Skipping file.\n"
-                    )
-                    continue
-
-                if table_name not in table_record:
-                    Load.create_or_replace_table(
-                        config.get("conn"), table_name, Path(file_path)
-                    )
-                    table_record.append(table_name)
-
-                Load.ingest_csv_to_table(
-                    config.get("conn"), table_name, Path(file_path)
+        input_directory = config.get("input_directory")
+        index = Landing.refresh(
+            input_directory,
+            config.get("date_patterns")
+            or Config.model_fields["date_patterns"].get_default(
+                call_default_factory=True
+            ),
+        )
+        selected = Landing.select(
+            index,
+            config.get("funds"),
+            config.get("start_month"),
+            config.get("end_month"),
+        )
+
+        loaded = []
+        for filename, table_name in selected.select("NAME", "FUND").iter_rows():
+            if not table_name:
+                print(
+                    f"Could not extract table name from '{filename}'. Skipping file.\n"
                 )
+                continue
+
+            csv_file = Path(input_directory) / filename
+            if Load.load_versioned(
+                config.get("conn"), table_name, csv_file
+            ) or Load.is_current(config.get("conn"), table_name, csv_file):
+                loaded.append(filename)
+        Landing.mark(input_directory, loaded, LandingStatus.LOADED)
 
     @staticmethod
-    def load_step() -> None:
+    def load_quarantine(
+        conn: duckdb.DuckDBPyConnection, quarantine_directory: Path
+    ) -> None:
+        """
+        Replaces the quarantine table with the rows rejected by the validation stage.
+        Without rejected rows the table is emptied, so it never lists rows of an
+        earlier run.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            quarantine_directory (Path): Path to the directory of rejected rows.
+        """
+        if not any(Path(quarantine_directory).glob("*.csv")):
+            conn.execute(
+                "CREATE OR REPLACE TABLE quarantine "
+                "(REJECT_REASON VARCHAR, filename VARCHAR)"
+            )
+            print("No quarantined rows to load.")
+            return
+
+        quarantine_query = f"""
+            CREATE OR REPLACE TABLE quarantine AS
+            SELECT *
+            FROM read_csv_auto('{Path(quarantine_directory) / "*.csv"}',
+                union_by_name = true, filename = true)
+        """
+        try:
+            conn.execute(quarantine_query)
+            print("Quarantined rows loaded into table 'quarantine'.")
+        except Exception as e:
+            print(f"Error loading quarantined rows: {e}")
+
+    @staticmethod
+    def load_step(
+        runtime: Optional[Runtime] = None,
+        funds: Optional[List[str]] = None,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+    ) -> None:
         """
         Main function to execute the ingestion script.
+
+        Args:
+            runtime (Optional[Runtime]): The pipeline run's shared connection owner.
+            funds (Optional[List[str]]): Only load these funds, all if not set.
+            start_month (Optional[date]): First report month to load.
+            end_month (Optional[date]): Last report month to load.
         """
         # Define paths
         transformed_dir = Path(FileDirectoryPath.EXTERNAL_FUNDS_CSV_TRANSFORMED.value)
-        db_file = Path(DatabaseContants.DATABASE_FILE.value)
-
-        # Initialize DuckDB connection
-        conn = ETLUtils.initialize_duckdb(db_file)
 
-        # Define Config as a dictionary
-        config = {
-            "input_directory": transformed_dir,
-            "conn": conn,
-        }
+        with Runtime.use(runtime) as runtime:
+            # Define Config as a dictionary
+            config = {
+                "input_directory": transformed_dir,
+                "conn": runtime.conn,
+                "funds": funds,
+                "start_month": start_month,
+                "end_month": end_month,
+            }
 
-        # Process the files
-        Load.process_files(config)
+            # Process the files
+            Load.process_files(config)
+            Load.load_quarantine(
+                runtime.conn,
+                Path(FileDirectoryPath.EXTERNAL_FUNDS_CSV_QUARANTINE.value),
+            )
 
-        conn.close()
         print("All CSV files have been ingested successfully.")
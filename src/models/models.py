@@ -1,5 +1,14 @@
+from datetime import date
+from pathlib import Path
 from pydantic import BaseModel, DirectoryPath, Field
-from typing import List
+from typing import Dict, List, Literal, Optional
+
+from src.config.constants import (
+    DatabaseContants,
+    FileDirectoryPath,
+    FinancialType,
+    PipelineDefaults,
+)
 
 
 class Config(BaseModel):
@@ -26,3 +35,347 @@ class Config(BaseModel):
         default="%Y-%m-%d",
         description="Standard date format to use in the DATA_DATE column.",
     )
+    memory_budget_mb: int = Field(
+        default=PipelineDefaults.MEMORY_BUDGET_MB.value,
+        gt=0,
+        description="Memory budget per file; larger files are streamed in row batches.",
+    )
+    funds: Optional[List[str]] = Field(
+        default=None, description="Only process these funds, all if not set."
+    )
+    start_month: Optional[date] = Field(
+        default=None, description="First report month processed, unbounded if None."
+    )
+    end_month: Optional[date] = Field(
+        default=None, description="Last report month processed, unbounded if None."
+    )
+
+
+class ColumnRule(BaseModel):
+    """
+    Declarative data-quality rule applied to a single column of a transformed fund file.
+    """
+
+    column: str = Field(..., description="Name of the column the rule applies to.")
+    required: bool = Field(
+        default=True, description="Whether the column must be present in the file."
+    )
+    not_null: bool = Field(
+        default=False, description="Reject rows where the column is null."
+    )
+    min_value: Optional[float] = Field(
+        default=None, description="Reject rows where the column is below this value."
+    )
+    max_value: Optional[float] = Field(
+        default=None, description="Reject rows where the column is above this value."
+    )
+    unique: bool = Field(
+        default=False, description="Reject rows whose value is duplicated in the file."
+    )
+    allowed_values: Optional[List[str]] = Field(
+        default=None, description="Reject rows whose value is not one of these."
+    )
+    exempt_financial_types: List[str] = Field(
+        default_factory=list,
+        description="FINANCIAL_TYPE values the rule does not apply to (e.g. CASH).",
+    )
+
+
+class ValidationConfig(BaseModel):
+    """
+    Configuration model for the validation stage between Transform and Load.
+    """
+
+    input_directory: DirectoryPath = Field(
+        ..., description="Path to the directory containing the transformed CSV files."
+    )
+    quarantine_directory: DirectoryPath = Field(
+        ..., description="Path to the directory where rejected rows will be saved."
+    )
+    rules: List[ColumnRule] = Field(
+        default_factory=lambda: [
+            ColumnRule(column="DATA_DATE", not_null=True),
+            ColumnRule(column="SOURCE", not_null=True),
+            ColumnRule(
+                column="FINANCIAL_TYPE",
+                not_null=True,
+                allowed_values=[
+                    financial_type.value for financial_type in FinancialType
+                ],
+            ),
+            ColumnRule(column="SYMBOL", not_null=True, unique=True),
+            ColumnRule(
+                column="PRICE",
+                not_null=True,
+                min_value=0,
+                exempt_financial_types=["CASH"],
+            ),
+            ColumnRule(
+                column="QUANTITY",
+                not_null=True,
+                min_value=0,
+                exempt_financial_types=["CASH"],
+            ),
+            ColumnRule(column="MARKET_VALUE", not_null=True),
+            ColumnRule(column="FX_RATE", required=False, not_null=True, min_value=0),
+        ],
+        description="Per-column rules checked against every transformed file.",
+    )
+    market_value_tolerance: float = Field(
+        default=0.01,
+        ge=0,
+        description="Allowed relative gap between MARKET_VALUE and PRICE * QUANTITY.",
+    )
+    max_reject_ratio: float = Field(
+        default=0.05,
+        ge=0,
+        le=1,
+        description="Share of rejected rows above which the whole file is quarantined.",
+    )
+    memory_budget_mb: int = Field(
+        default=PipelineDefaults.MEMORY_BUDGET_MB.value,
+        gt=0,
+        description="Memory budget per file; larger files are streamed in row batches.",
+    )
+
+
+class WatchConfig(Config):
+    """
+    Configuration model for the directory watcher used for continuous ingestion.
+    """
+
+    quarantine_directory: DirectoryPath = Field(
+        ..., description="Path to the directory where rejected rows will be saved."
+    )
+    poll_interval: float = Field(
+        default=5.0, gt=0, description="Seconds between scans of the input directory."
+    )
+    debounce_seconds: float = Field(
+        default=10.0,
+        ge=0,
+        description="Seconds a file's size and mtime must stay unchanged before ingestion.",
+    )
+    max_concurrency: int = Field(
+        default=4, gt=0, description="Maximum number of files ingested concurrently."
+    )
+
+
+class RawFile(BaseModel):
+    """
+    A raw fund CSV in the landing zone, either a plain file or a compressed one.
+    """
+
+    name: str = Field(
+        ..., description="Logical CSV filename used to derive the table name and date."
+    )
+    path: Path = Field(..., description="Path to the file on disk.")
+    compression: Optional[str] = Field(
+        default=None, description="One of 'gzip', 'zstd', 'zip' or None for plain CSV."
+    )
+    member: Optional[str] = Field(
+        default=None, description="Name of the CSV member inside a zip archive."
+    )
+
+
+class PerformanceConfig(BaseModel):
+    """
+    Configuration model for the partitioned fund performance runner.
+    """
+
+    db_file: Optional[Path] = Field(
+        default=None, description="DuckDB database opened read-only by each worker."
+    )
+    snapshot_dir: Optional[Path] = Field(
+        default=None,
+        description="Parquet snapshot read by each worker instead of the database.",
+    )
+    partition_by: Literal["fund", "month"] = Field(
+        default="fund", description="Split the work by fund or by month range."
+    )
+    workers: int = Field(default=1, gt=0, description="Number of worker processes.")
+    sql_file: Path = Field(
+        default=Path(FileDirectoryPath.FUND_PERFORMANCE_QUERY_SQL.value),
+        description="Fund performance report the partition query is derived from.",
+    )
+    threads_per_worker: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="DuckDB threads per worker, defaults to the CPUs divided by workers.",
+    )
+
+
+class PerformancePartition(BaseModel):
+    """
+    A slice of the fund performance computation handled by one worker.
+    """
+
+    funds: List[str] = Field(..., description="Fund tables included in the slice.")
+    start_month: Optional[date] = Field(
+        default=None, description="First month included, unbounded if None."
+    )
+    end_month: Optional[date] = Field(
+        default=None, description="Last month included, unbounded if None."
+    )
+
+
+class RuntimeConfig(BaseModel):
+    """
+    Configuration model for the DuckDB connection shared by a pipeline run.
+    """
+
+    db_file: Path = Field(
+        default=Path(DatabaseContants.DATABASE_FILE.value),
+        description="Path to the DuckDB database file.",
+    )
+    memory_limit_mb: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="DuckDB memory_limit, larger operations spilling to "
+        "temp_directory; DuckDB's own default if not set.",
+    )
+    threads: Optional[int] = Field(
+        default=None, gt=0, description="DuckDB worker threads, all CPUs if not set."
+    )
+    temp_directory: Optional[Path] = Field(
+        default=None,
+        description="Where DuckDB spills, next to the database file if not set.",
+    )
+
+
+class ShardConfig(BaseModel):
+    """
+    Configuration model for sharding fund data across several DuckDB files.
+    """
+
+    input_directory: DirectoryPath = Field(
+        ..., description="Path to the directory containing the transformed CSV files."
+    )
+    shard_directory: Path = Field(
+        default=Path(FileDirectoryPath.SHARDS.value),
+        description="Directory holding the shard databases and their manifest.",
+    )
+    shard_by: Literal["fund_group", "year"] = Field(
+        default="fund_group", description="Split the funds by group or by report year."
+    )
+    fund_groups: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Group name mapped to its funds; other funds get a shard each.",
+    )
+    workers: int = Field(
+        default=4, gt=0, description="Number of shards loaded in parallel."
+    )
+    date_patterns: List[str] = Field(
+        default_factory=lambda: Config.model_fields["date_patterns"].get_default(
+            call_default_factory=True
+        ),
+        description="Regex patterns extracting the report date from filenames.",
+    )
+    date_format: str = Field(
+        default="%Y-%m-%d", description="Format of the extracted report date."
+    )
+
+
+class RegressionConfig(BaseModel):
+    """
+    Configuration model for the report query regression suite.
+    """
+
+    queries_directory: DirectoryPath = Field(
+        default=Path(FileDirectoryPath.QUERIES.value),
+        description="Directory of the report queries under test.",
+    )
+    regression_directory: DirectoryPath = Field(
+        default=Path(FileDirectoryPath.REGRESSION.value),
+        description="Directory holding the fixture reference data, golden results "
+        "and latency baseline.",
+    )
+    funds_directory: DirectoryPath = Field(
+        default=Path(FileDirectoryPath.REGRESSION_FUNDS.value),
+        description="Frozen raw fund reports the fixture database is built from, so "
+        "new deliveries to the landing zone do not change the golden results.",
+    )
+    repeats: int = Field(
+        default=5, gt=0, description="Timed runs per query; the median is kept."
+    )
+    max_slowdown: float = Field(
+        default=0.5,
+        ge=0,
+        description="Largest allowed latency increase over the baseline, 0.5 = 50%.",
+    )
+    min_latency_ms: float = Field(
+        default=50.0,
+        ge=0,
+        description="Queries faster than this in both runs are not gated, as their "
+        "timings are mostly noise.",
+    )
+    rel_tolerance: float = Field(
+        default=1e-9, ge=0, description="Relative tolerance for numeric columns."
+    )
+    abs_tolerance: float = Field(
+        default=1e-6, ge=0, description="Absolute tolerance for numeric columns."
+    )
+
+
+class SampleConfig(BaseModel):
+    """
+    Configuration model for approximate report runs on a sample of the fund holdings.
+    """
+
+    percent: float = Field(
+        default=10.0,
+        gt=0,
+        le=100,
+        description="Share of every fund report's holdings kept in the sample, in "
+        "percent; each report keeps at least one row per group.",
+    )
+    groups: int = Field(
+        default=4,
+        ge=2,
+        description="Random groups the sample is split into to estimate errors.",
+    )
+    seed: int = Field(default=42, description="Seed making the sample repeatable.")
+    scaled_columns: List[str] = Field(
+        default_factory=list,
+        description="Result columns that are sums or counts, scaled up to the full "
+        "data; other columns (prices, ratios) are reported as computed.",
+    )
+    key_columns: Optional[List[str]] = Field(
+        default=None,
+        description="Columns matching result rows across groups, e.g. the month of "
+        "a ranking; the non-numeric columns if not set.",
+    )
+
+
+class FxConfig(BaseModel):
+    """
+    Configuration model for the FX normalization stage between Transform and Validate.
+    """
+
+    input_directory: DirectoryPath = Field(
+        ..., description="Path to the directory containing the transformed CSV files."
+    )
+    fx_rates_file: Path = Field(
+        default=Path(FileDirectoryPath.FX_RATES.value),
+        description="CSV of daily rates: DATE, CURRENCY and RATE, the base currency "
+        "value of one unit of CURRENCY.",
+    )
+    fund_currencies: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Fund mapped to the currency of its report; other funds report "
+        "in the base currency. A CURRENCY column in the report takes precedence.",
+    )
+    base_currency: str = Field(
+        default=PipelineDefaults.BASE_CURRENCY.value,
+        description="Currency every fund is converted to.",
+    )
+    max_rate_age_days: Optional[int] = Field(
+        default=PipelineDefaults.MAX_FX_RATE_AGE_DAYS.value,
+        ge=0,
+        description="Oldest rate, in days before the report date, used for a "
+        "holding; unlimited if None.",
+    )
+    memory_budget_mb: int = Field(
+        default=PipelineDefaults.MEMORY_BUDGET_MB.value,
+        gt=0,
+        description="Memory budget per file; larger files are streamed in row batches.",
+    )
@@ -0,0 +1,379 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+from src.models.models import PerformanceConfig, PerformancePartition
+from src.reference import PRICE_TABLES
+from src.config.constants import DatabaseContants, FileDirectoryPath
+
+# CTE of fund_performance_query.sql holding the per fund and month aggregates
+AGGREGATE_CTE = "cte4"
+
+# CTE of fund_performance_query.sql unioning every fund table, replaced by the
+# `holdings` view of a single partition
+HOLDINGS_CTE = "consolidated_funds"
+
+# Start of a CTE definition, `name AS (`
+CTE_START = re.compile(r"\s*(\w+)\s+AS\s*\(", re.I)
+
+PARTITION_HOLDINGS = """
+    SELECT *
+    FROM holdings
+    WHERE DATE_TRUNC('month', data_date::DATE) BETWEEN
+        COALESCE(?::DATE, DATE '0001-01-01') AND COALESCE(?::DATE, DATE '9999-12-01')
+"""
+
+
+class Performance:
+
+    @staticmethod
+    def split_ctes(sql_query: str) -> Tuple[Dict[str, str], str]:
+        """
+        Splits a WITH query into its top-level CTE bodies and its final statement.
+
+        Args:
+            sql_query (str): The query text.
+
+        Returns:
+            Tuple[Dict[str, str], str]: CTE name mapped to its body, in order, and
+                the statement after the last CTE.
+
+        Raises:
+            ValueError: If the query is not a WITH query with balanced parentheses.
+        """
+        text = sql_query.strip().rstrip(";")
+        match = re.match(r"WITH\s+", text, re.I)
+        if not match:
+            raise ValueError("Expected a query starting with WITH")
+
+        ctes, pos = {}, match.end()
+        while match := CTE_START.match(text, pos):
+            depth, in_string, end = 1, False, match.end()
+            while depth:
+                if end == len(text):
+                    raise ValueError(f"Unbalanced parentheses in CTE {match[1]}")
+                char = text[end]
+                if char == "'":
+                    in_string = not in_string
+                elif not in_string:
+                    depth += {"(": 1, ")": -1}.get(char, 0)
+                end += 1
+            ctes[match[1]] = text[match.end() : end - 1]
+            comma = re.match(r"\s*,", text[end:])
+            pos = end + comma.end() if comma else end
+            if not comma:
+                break
+        return ctes, text[pos:].strip()
+
+    @staticmethod
+    def partition_query(sql_file: Path) -> str:
+        """
+        Derives the per fund and month aggregates of one partition from the fund
+        performance report, so the two never drift apart. The fund union is replaced
+        by the partition's `holdings` view, limited to its months, and the price
+        tables by the prices of the instruments the partition holds.
+
+        Args:
+            sql_file (Path): The fund performance report query.
+
+        Returns:
+            str: The partition query, taking the start and end month as parameters
+                and returning (source, date_trunc, total_pl, fund_mv_end, fund_mv_start).
+        """
+        ctes, _ = Performance.split_ctes(Path(sql_file).read_text())
+        ctes[HOLDINGS_CTE] = PARTITION_HOLDINGS
+        # Prices only join holdings on the instrument, so other instruments never
+        # contribute, whatever their month
+        price_ctes = {
+            table: f"""
+    SELECT * FROM main.{table}
+    WHERE {instrument} IN (SELECT DISTINCT SYMBOL FROM holdings)
+"""
+            for table, instrument in PRICE_TABLES.items()
+        }
+        body = ",\n\n".join(
+            f"{name} AS ({cte_body})"
+            for name, cte_body in {**price_ctes, **ctes}.items()
+        )
+        return (
+            f"WITH {body}\n\n"
+            f"SELECT source, date_trunc, total_pl, fund_mv_end, fund_mv_start "
+            f"FROM {AGGREGATE_CTE}"
+        )
+
+    @staticmethod
+    def list_funds(config: PerformanceConfig) -> List[str]:
+        """
+        Lists the fund tables available in the database or Parquet snapshot.
+
+        Args:
+            config (PerformanceConfig): Runner settings.
+
+        Returns:
+            List[str]: The fund table names, sorted.
+        """
+        if config.snapshot_dir:
+            return sorted(
+                path.stem
+                for path in (config.snapshot_dir / "holdings").glob("*.parquet")
+            )
+
+        with duckdb.connect(database=str(config.db_file), read_only=True) as conn:
+            tables = conn.execute(
+                "SELECT table_name FROM information_schema.tables"
+            ).fetchall()
+        return sorted(
+            name.removesuffix("_history")
+            for (name,) in tables
+            if name.endswith("_history")
+        )
+
+    @staticmethod
+    def export_snapshot(conn: duckdb.DuckDBPyConnection, snapshot_dir: Path) -> None:
+        """
+        Writes the current fund holdings and the reference prices to Parquet so
+        workers, on this or other machines, can compute partitions without the database.
+        Prices are sorted by instrument and date for efficient lookups.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            snapshot_dir (Path): Directory to write the snapshot to.
+        """
+        holdings_dir = snapshot_dir / "holdings"
+        holdings_dir.mkdir(parents=True, exist_ok=True)
+
+        tables = [name for (name,) in conn.execute("SHOW TABLES").fetchall()]
+        for fund in [name.removesuffix("_history") for name in tables]:
+            if f"{fund}_history" in tables:
+                conn.execute(
+                    f"COPY (SELECT * FROM {fund}) "
+                    f"TO '{holdings_dir / f'{fund}.parquet'}' (FORMAT PARQUET)"
+                )
+        for table, instrument in PRICE_TABLES.items():
+            conn.execute(
+                f"COPY (SELECT * FROM {table} ORDER BY {instrument}, DATETIME) "
+                f"TO '{snapshot_dir / f'{table}.parquet'}' (FORMAT PARQUET)"
+            )
+        print(f"Snapshot written to '{snapshot_dir}'")
+
+    @staticmethod
+    def list_months(config: PerformanceConfig, funds: List[str]) -> List[str]:
+        """
+        Lists the distinct report months across the given funds.
+
+        Args:
+            config (PerformanceConfig): Runner settings.
+            funds (List[str]): The fund tables to scan.
+
+        Returns:
+            List[str]: The months as ISO dates of their first day, sorted.
+        """
+        with Performance.open_partition(
+            config, PerformancePartition(funds=funds), threads=None
+        ) as conn:
+            rows = conn.execute(
+                """
+                SELECT DISTINCT DATE_TRUNC('month', data_date::DATE)::VARCHAR
+                FROM holdings
+                ORDER BY 1
+            """
+            ).fetchall()
+        return [month for (month,) in rows]
+
+    @staticmethod
+    def plan_partitions(config: PerformanceConfig) -> List[PerformancePartition]:
+        """
+        Splits the computation into at most config.workers partitions.
+
+        Args:
+            config (PerformanceConfig): Runner settings.
+
+        Returns:
+            List[PerformancePartition]: The partitions to run.
+        """
+        funds = Performance.list_funds(config)
+        if config.partition_by == "fund":
+            groups = [funds[i :: config.workers] for i in range(config.workers)]
+            return [PerformancePartition(funds=group) for group in groups if group]
+
+        months = Performance.list_months(config, funds)
+        size = -(-len(months) // config.workers) if months else 1
+        return [
+            PerformancePartition(funds=funds, start_month=chunk[0], end_month=chunk[-1])
+            for chunk in (months[i : i + size] for i in range(0, len(months), size))
+        ]
+
+    @staticmethod
+    def open_partition(
+        config: PerformanceConfig,
+        partition: PerformancePartition,
+        threads: Optional[int],
+    ) -> duckdb.DuckDBPyConnection:
+        """
+        Opens a worker's own DuckDB connection with a `holdings` view over the
+        partition's funds and views over the reference prices.
+
+        Args:
+            config (PerformanceConfig): Runner settings.
+            partition (PerformancePartition): The partition to expose.
+            threads (Optional[int]): DuckDB threads for this connection.
+
+        Returns:
+            duckdb.DuckDBPyConnection: The worker's connection.
+        """
+        if config.snapshot_dir:
+            conn = duckdb.connect(database=":memory:")
+            files = [
+                str(config.snapshot_dir / "holdings" / f"{fund}.parquet")
+                for fund in partition.funds
+            ]
+            conn.execute(
+                f"CREATE VIEW holdings AS "
+                f"SELECT * FROM read_parquet({files}, union_by_name = true)"
+            )
+            for table in PRICE_TABLES:
+                conn.execute(
+                    f"CREATE VIEW {table} AS "
+                    f"SELECT * FROM read_parquet('{config.snapshot_dir / f'{table}.parquet'}')"
+                )
+        else:
+            conn = duckdb.connect(database=str(config.db_file), read_only=True)
+            union = " UNION ALL BY NAME ".join(
+                f"SELECT * FROM {fund}" for fund in partition.funds
+            )
+            conn.execute(f"CREATE TEMP VIEW holdings AS {union}")
+
+        if threads:
+            conn.execute(f"SET threads = {threads}")
+        return conn
+
+    @staticmethod
+    def run_partition(
+        config: PerformanceConfig, partition: PerformancePartition
+    ) -> List[Tuple]:
+        """
+        Computes the per fund and month aggregates of one partition. Runs inside a
+        worker process.
+
+        Args:
+            config (PerformanceConfig): Runner settings.
+            partition (PerformancePartition): The partition to compute.
+
+        Returns:
+            List[Tuple]: Rows of (source, date_trunc, total_pl, fund_mv_end, fund_mv_start).
+        """
+        threads = config.threads_per_worker or max(
+            1, (os.cpu_count() or 1) // config.workers
+        )
+        with Performance.open_partition(config, partition, threads) as conn:
+            return conn.execute(
+                Performance.partition_query(config.sql_file),
+                [partition.start_month, partition.end_month],
+            ).fetchall()
+
+    @staticmethod
+    def rank_funds(rows: List[Tuple]) -> pd.DataFrame:
+        """
+        Merges the partition aggregates and keeps the best performing fund per month.
+
+        Args:
+            rows (List[Tuple]): The aggregates returned by run_partition.
+
+        Returns:
+            pd.DataFrame: Columns date_month, fund_name and rate_of_return.
+        """
+        df = pd.DataFrame(
+            rows,
+            columns=[
+                "source",
+                "date_trunc",
+                "total_pl",
+                "fund_mv_end",
+                "fund_mv_start",
+            ],
+        )
+        amounts = ["total_pl", "fund_mv_end", "fund_mv_start"]
+        df[amounts] = df[amounts].astype(float)
+        df["rate_of_return"] = (
+            (df["fund_mv_end"] - df["fund_mv_start"] + df["total_pl"])
+            / df["fund_mv_start"]
+        ) * 100
+        best = (
+            df.sort_values("rate_of_return", ascending=False, na_position="last")
+            .groupby("date_trunc", sort=True)
+            .head(1)
+            .sort_values("date_trunc")
+        )
+        return best.rename(columns={"date_trunc": "date_month", "source": "fund_name"})[
+            ["date_month", "fund_name", "rate_of_return"]
+        ].reset_index(drop=True)
+
+    @staticmethod
+    def compute(config: PerformanceConfig) -> pd.DataFrame:
+        """
+        Computes the best performing fund per month, running the partitions
+        concurrently in worker processes.
+
+        Args:
+            config (PerformanceConfig): Runner settings.
+
+        Returns:
+            pd.DataFrame: Columns date_month, fund_name and rate_of_return.
+        """
+        partitions = Performance.plan_partitions(config)
+        print(
+            f"Computing fund performance over {len(partitions)} partitions "
+            f"by {config.partition_by} with {config.workers} workers"
+        )
+        if config.workers == 1:
+            results = [Performance.run_partition(config, p) for p in partitions]
+        else:
+            # Spawned workers never inherit a parent's open DuckDB state
+            with ProcessPoolExecutor(
+                max_workers=config.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                results = list(
+                    executor.map(
+                        Performance.run_partition,
+                        [config] * len(partitions),
+                        partitions,
+                    )
+                )
+        return Performance.rank_funds([row for rows in results for row in rows])
+
+    @staticmethod
+    def performance_step(
+        workers: int = 1,
+        partition_by: str = "fund",
+        snapshot_dir: Optional[Path] = None,
+    ) -> None:
+        """
+        Main function to compute the fund performance report with the partitioned
+        runner and write it next to the other query results.
+
+        Args:
+            workers (int): Number of worker processes.
+            partition_by (str): Split the work by "fund" or "month".
+            snapshot_dir (Optional[Path]): Read a Parquet snapshot instead of the database.
+        """
+        config = PerformanceConfig(
+            db_file=None if snapshot_dir else DatabaseContants.DATABASE_FILE.value,
+            snapshot_dir=snapshot_dir,
+            partition_by=partition_by,
+            workers=workers,
+        )
+        result_df = Performance.compute(config)
+        print(result_df.head())
+
+        output_dir = Path(FileDirectoryPath.QUERY_OUTPUT.value)
+        output_dir.mkdir(exist_ok=True)
+        output_csv_path = output_dir / "fund_performance_query_result.csv"
+        result_df.to_csv(output_csv_path, index=False)
+        print(f"\nQuery result written to '{output_csv_path}'")
@@ -0,0 +1,248 @@
+from datetime import date
+from typing import List, Optional
+
+import duckdb
+import pandas as pd
+
+from src.runtime import Runtime
+
+# Reference prices per instrument and day, the latest quote of the day winning as in
+# recon_query.sql
+REFERENCE_PRICES_QUERY = """
+SELECT ISIN AS INSTRUMENT, 'Government Bond' AS FINANCIAL_TYPE,
+    DATETIME::DATE AS PRICE_DATE, PRICE
+FROM bond_prices
+QUALIFY ROW_NUMBER() OVER (PARTITION BY ISIN, DATETIME::DATE ORDER BY DATETIME DESC) = 1
+UNION ALL
+SELECT SYMBOL, 'Equities', DATETIME::DATE, PRICE
+FROM equity_prices
+QUALIFY ROW_NUMBER() OVER (PARTITION BY SYMBOL, DATETIME::DATE ORDER BY DATETIME DESC) = 1
+"""
+
+# Compares every holding with the last reference price on or before its report date,
+# and dates each break from the first report of its unbroken run of breaks. Breaks
+# are stored in (INSTRUMENT, DATA_DATE) order, so the row group min/max of those
+# columns skip most of the table for instrument lookups
+BREAKS_QUERY = """
+WITH reconciled AS (
+    SELECT
+        h.FUND,
+        h.DATA_DATE,
+        h.INSTRUMENT,
+        h.FINANCIAL_TYPE,
+        h.FUND_PRICE,
+        p.PRICE AS REF_PRICE,
+        p.PRICE_DATE AS REF_PRICE_DATE,
+        h.FUND_PRICE - p.PRICE AS DIFF,
+        p.PRICE IS NULL OR ABS(h.FUND_PRICE - p.PRICE) > {tolerance} AS IS_BREAK
+    FROM holdings h
+    ASOF LEFT JOIN ({reference_prices}) p
+        ON h.INSTRUMENT = p.INSTRUMENT
+        AND h.FINANCIAL_TYPE = p.FINANCIAL_TYPE
+        AND h.DATA_DATE >= p.PRICE_DATE
+),
+
+runs AS (
+    SELECT
+        *,
+        COUNT(*) FILTER (WHERE NOT IS_BREAK) OVER (
+            PARTITION BY FUND, INSTRUMENT
+            ORDER BY DATA_DATE
+            ROWS UNBOUNDED PRECEDING
+        ) AS RUN_ID
+    FROM reconciled
+)
+
+SELECT
+    FUND,
+    DATA_DATE,
+    INSTRUMENT,
+    FINANCIAL_TYPE,
+    FUND_PRICE,
+    REF_PRICE,
+    REF_PRICE_DATE,
+    DIFF,
+    ABS(DIFF) AS ABS_DIFF,
+    DIFF / NULLIF(REF_PRICE, 0) * 100 AS DIFF_PCT,
+    DATA_DATE - MIN(DATA_DATE) OVER (
+        PARTITION BY FUND, INSTRUMENT, RUN_ID
+    ) AS BREAK_AGE_DAYS
+FROM runs
+WHERE IS_BREAK
+ORDER BY INSTRUMENT, DATA_DATE, FUND
+"""
+
+# Breaks per fund and month, the access path of the fund rankings, stored in
+# (MONTH, FUND) order so a month's rows sit together
+FUND_MONTHS_QUERY = """
+SELECT
+    DATE_TRUNC('month', DATA_DATE)::DATE AS MONTH,
+    FUND,
+    COUNT(*) AS BREAKS,
+    SUM(ABS_DIFF) AS TOTAL_ABS_DIFF,
+    MAX(BREAK_AGE_DAYS) AS OLDEST_BREAK_DAYS
+FROM recon_breaks
+GROUP BY ALL
+ORDER BY MONTH, FUND
+"""
+
+
+class Recon:
+
+    @staticmethod
+    def list_funds(conn: duckdb.DuckDBPyConnection) -> List[str]:
+        """
+        Lists the funds with a versioned history in the database.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+
+        Returns:
+            List[str]: The fund table names, sorted.
+        """
+        tables = conn.execute(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_name LIKE '%\\_history' ESCAPE '\\'"
+        ).fetchall()
+        return sorted(name.removesuffix("_history") for (name,) in tables)
+
+    @staticmethod
+    def build_breaks(conn: duckdb.DuckDBPyConnection, tolerance: float = 0.01) -> int:
+        """
+        Reconciles every fund's current holdings against the reference prices and
+        persists the breaks to the recon_breaks table, sorted by instrument and
+        date for the instrument lookups, and their counts per fund and month to the
+        recon_fund_months table for the fund rankings. A holding breaks when its price differs from
+        the last reference price on or before its report date by more than tolerance,
+        or when no reference price exists.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            tolerance (float): Largest price difference that is not a break.
+
+        Returns:
+            int: The number of breaks stored.
+        """
+        funds = Recon.list_funds(conn)
+        if not funds:
+            print("No fund holdings to reconcile.")
+            return 0
+
+        holdings = " UNION ALL ".join(
+            f"""
+            SELECT
+                '{fund}' AS FUND,
+                DATA_DATE::DATE AS DATA_DATE,
+                SYMBOL AS INSTRUMENT,
+                FINANCIAL_TYPE,
+                PRICE_BASE::DOUBLE AS FUND_PRICE
+            FROM {fund}
+            WHERE FINANCIAL_TYPE <> 'CASH'
+            """
+            for fund in funds
+        )
+        conn.execute(f"CREATE OR REPLACE TEMP VIEW holdings AS {holdings}")
+        conn.execute(
+            "CREATE OR REPLACE TABLE recon_breaks AS "
+            + BREAKS_QUERY.format(
+                tolerance=float(tolerance), reference_prices=REFERENCE_PRICES_QUERY
+            )
+        )
+        conn.execute("DROP VIEW holdings")
+        conn.execute(
+            f"CREATE OR REPLACE TABLE recon_fund_months AS {FUND_MONTHS_QUERY}"
+        )
+
+        count = conn.execute("SELECT COUNT(*) FROM recon_breaks").fetchone()[0]
+        print(f"Stored {count} reconciliation breaks in 'recon_breaks'")
+        return count
+
+    @staticmethod
+    def latest_date(conn: duckdb.DuckDBPyConnection) -> Optional[date]:
+        """
+        Returns the latest reconciled report date, the reference point for relative
+        lookups such as "last 12 months" or "this month".
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+
+        Returns:
+            Optional[date]: The latest DATA_DATE in recon_breaks, None if empty.
+        """
+        return conn.execute("SELECT MAX(DATA_DATE) FROM recon_breaks").fetchone()[0]
+
+    @staticmethod
+    def instrument_breaks(
+        conn: duckdb.DuckDBPyConnection,
+        instrument: str,
+        months: int = 12,
+        as_of: Optional[date] = None,
+    ) -> pd.DataFrame:
+        """
+        Lists the breaks of one instrument, across funds, over the last months.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            instrument (str): The ISIN or equity symbol.
+            months (int): Number of months to look back.
+            as_of (Optional[date]): End of the window, the latest reconciled date if
+                not given.
+
+        Returns:
+            pd.DataFrame: The instrument's breaks, oldest first.
+        """
+        as_of = as_of or Recon.latest_date(conn)
+        return conn.execute(
+            """
+            SELECT *
+            FROM recon_breaks
+            WHERE INSTRUMENT = ?
+                AND DATA_DATE > ?::DATE - to_months(?)
+                AND DATA_DATE <= ?::DATE
+            ORDER BY DATA_DATE, FUND
+        """,
+            [instrument, as_of, months, as_of],
+        ).df()
+
+    @staticmethod
+    def funds_by_breaks(
+        conn: duckdb.DuckDBPyConnection,
+        month: Optional[date] = None,
+        limit: int = 10,
+    ) -> pd.DataFrame:
+        """
+        Ranks the funds by their number of breaks in a month, from the
+        recon_fund_months rollup rather than the row-level breaks.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            month (Optional[date]): Any day of the month, the latest reconciled month
+                if not given.
+            limit (int): Number of funds to return.
+
+        Returns:
+            pd.DataFrame: FUND, BREAKS, TOTAL_ABS_DIFF and OLDEST_BREAK_DAYS, most
+                breaks first.
+        """
+        month = month or Recon.latest_date(conn)
+        return conn.execute(
+            """
+            SELECT FUND, BREAKS, TOTAL_ABS_DIFF, OLDEST_BREAK_DAYS
+            FROM recon_fund_months
+            WHERE MONTH = DATE_TRUNC('month', ?::DATE)
+            ORDER BY BREAKS DESC, FUND
+            LIMIT ?
+        """,
+            [month, limit],
+        ).df()
+
+    @staticmethod
+    def recon_step(runtime: Optional[Runtime] = None) -> None:
+        """
+        Main function to rebuild the reconciliation breaks after Load.
+
+        Args:
+            runtime (Optional[Runtime]): The pipeline run's shared connection owner.
+        """
+        with Runtime.use(runtime) as runtime:
+            Recon.build_breaks(runtime.conn)
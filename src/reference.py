@@ -0,0 +1,158 @@
+from pathlib import Path
+from typing import List
+
+import duckdb
+
+# Reference price tables and the instrument column each one is keyed on
+PRICE_TABLES = {"bond_prices": "ISIN", "equity_prices": "SYMBOL"}
+
+
+class Reference:
+
+    @staticmethod
+    def find_price_files(reference_dir: Path, table_name: str) -> List[Path]:
+        """
+        Finds the Parquet and CSV price history files for a reference table, e.g.
+        bond_prices.parquet or bond_prices_2023.csv.
+
+        Args:
+            reference_dir (Path): Directory holding the price history files.
+            table_name (str): The reference table name.
+
+        Returns:
+            List[Path]: The matching files, sorted by name.
+        """
+        if not reference_dir.is_dir():
+            return []
+        return sorted(
+            path
+            for path in reference_dir.glob(f"{table_name}*")
+            if path.suffix.lower() in {".parquet", ".csv"}
+        )
+
+    @staticmethod
+    def has_price_files(reference_dir: Path) -> bool:
+        """
+        Checks whether any reference price history files are available.
+
+        Args:
+            reference_dir (Path): Directory holding the price history files.
+
+        Returns:
+            bool: True if at least one reference table has price files.
+        """
+        return any(
+            Reference.find_price_files(reference_dir, table_name)
+            for table_name in PRICE_TABLES
+        )
+
+    @staticmethod
+    def read_prices_query(files: List[Path], instrument_column: str) -> str:
+        """
+        Builds a query reading price files of a single format with typed columns.
+
+        Args:
+            files (List[Path]): Parquet or CSV files, all of the same format.
+            instrument_column (str): The instrument column, ISIN or SYMBOL.
+
+        Returns:
+            str: A SELECT returning DATETIME, the instrument column, PRICE and the
+                filename each row was read from.
+        """
+        file_list = [str(path) for path in files]
+        if files[0].suffix.lower() == ".parquet":
+            source = f"read_parquet({file_list}, union_by_name = true, filename = true)"
+        else:
+            columns = {
+                "DATETIME": "TIMESTAMP",
+                instrument_column: "VARCHAR",
+                "PRICE": "DOUBLE",
+            }
+            source = (
+                f"read_csv({file_list}, header = true, columns = {columns}, "
+                f"filename = true)"
+            )
+        return f"""
+            SELECT
+                DATETIME::TIMESTAMP AS DATETIME,
+                {instrument_column}::VARCHAR AS {instrument_column},
+                PRICE::DOUBLE AS PRICE,
+                filename
+            FROM {source}
+        """
+
+    @staticmethod
+    def load_prices(
+        conn: duckdb.DuckDBPyConnection,
+        table_name: str,
+        instrument_column: str,
+        files: List[Path],
+    ) -> int:
+        """
+        Bulk imports price history files into a reference table. Only rows newer than
+        the latest DATETIME already stored for their instrument are appended, sorted
+        by instrument and DATETIME so as-of lookups scan contiguous blocks. An
+        instrument and DATETIME found in several files, or several times in one
+        file, is appended once, from the file sorting last.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            table_name (str): The reference table name.
+            instrument_column (str): The instrument column, ISIN or SYMBOL.
+            files (List[Path]): Parquet and/or CSV price history files.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                DATETIME TIMESTAMP,
+                {instrument_column} VARCHAR,
+                PRICE DOUBLE
+            )
+        """
+        )
+
+        appended = 0
+        for suffix in (".parquet", ".csv"):
+            batch = [path for path in files if path.suffix.lower() == suffix]
+            if not batch:
+                continue
+            appended += conn.execute(
+                f"""
+                INSERT INTO {table_name} (DATETIME, {instrument_column}, PRICE)
+                SELECT s.DATETIME, s.{instrument_column}, s.PRICE
+                FROM ({Reference.read_prices_query(batch, instrument_column)}) s
+                LEFT JOIN (
+                    SELECT {instrument_column}, MAX(DATETIME) AS latest
+                    FROM {table_name}
+                    GROUP BY {instrument_column}
+                ) m USING ({instrument_column})
+                WHERE m.latest IS NULL OR s.DATETIME > m.latest
+                QUALIFY ROW_NUMBER() OVER (
+                    PARTITION BY s.{instrument_column}, s.DATETIME
+                    ORDER BY s.filename DESC
+                ) = 1
+                ORDER BY s.{instrument_column}, s.DATETIME
+            """
+            ).fetchone()[0]
+
+        print(f"Appended {appended} rows to '{table_name}'")
+        return appended
+
+    @staticmethod
+    def load_reference_data(
+        conn: duckdb.DuckDBPyConnection, reference_dir: Path
+    ) -> None:
+        """
+        Loads every reference price table that has history files in reference_dir.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            reference_dir (Path): Directory holding the price history files.
+        """
+        for table_name, instrument_column in PRICE_TABLES.items():
+            files = Reference.find_price_files(reference_dir, table_name)
+            if files:
+                Reference.load_prices(conn, table_name, instrument_column, files)
@@ -0,0 +1,290 @@
+import io
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from src.fx import FX
+from src.load import Load
+from src.models.models import (
+    Config,
+    FxConfig,
+    RegressionConfig,
+    ValidationConfig,
+)
+from src.reference import Reference
+from src.transform import Transform
+from src.utils.utils import ETLUtils
+from src.validate import Validate
+
+GOLDEN_DIRECTORY = "golden"
+REFERENCE_DIRECTORY = "reference_data"
+FX_RATES_FILE = "fx_rates.csv"
+LATENCY_BASELINE_FILE = "latency_baseline.json"
+
+
+class Regression:
+    """
+    Runs every report query against a fixture database built from the committed fund
+    reports and reference prices, diffs the results against golden files and gates
+    their latency against a stored baseline.
+    """
+
+    @staticmethod
+    def build_fixture_database(config: RegressionConfig, work_dir: Path) -> Path:
+        """
+        Builds the fixture database by running the fund reports through Transform,
+        FX, Validate and Load, with the fixture FX rates, then bulk loading the
+        fixture reference prices. The
+        reports are copied into the work directory first, so the landing index and
+        statuses never touch the committed fixtures.
+
+        Args:
+            config (RegressionConfig): Regression suite settings.
+            work_dir (Path): Scratch directory for the intermediate files.
+
+        Returns:
+            Path: The fixture DuckDB database file.
+        """
+        funds_dir = Path(work_dir) / "funds"
+        transformed_dir = Path(work_dir) / "transformed"
+        quarantine_dir = Path(work_dir) / "quarantine"
+        transformed_dir.mkdir(parents=True, exist_ok=True)
+        quarantine_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copytree(
+            config.funds_directory,
+            funds_dir,
+            ignore=shutil.ignore_patterns(".*"),
+            dirs_exist_ok=True,
+        )
+
+        Transform.process_files(
+            Config(
+                input_directory=funds_dir,
+                output_directory=transformed_dir,
+            )
+        )
+        FX.process_files(
+            FxConfig(
+                input_directory=transformed_dir,
+                fx_rates_file=config.regression_directory
+                / REFERENCE_DIRECTORY
+                / FX_RATES_FILE,
+            )
+        )
+        Validate.process_files(
+            ValidationConfig(
+                input_directory=transformed_dir, quarantine_directory=quarantine_dir
+            )
+        )
+
+        db_file = Path(work_dir) / "fixture.duckdb"
+        conn = ETLUtils.initialize_duckdb(db_file)
+        try:
+            Load.process_files({"input_directory": transformed_dir, "conn": conn})
+            Reference.load_reference_data(
+                conn, config.regression_directory / REFERENCE_DIRECTORY
+            )
+        finally:
+            conn.close()
+        return db_file
+
+    @staticmethod
+    def time_query(
+        conn: duckdb.DuckDBPyConnection, sql_query: str, repeats: int
+    ) -> Tuple[pd.DataFrame, float]:
+        """
+        Runs a query repeatedly and keeps the median latency, after one untimed run
+        that warms the buffer pool.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            sql_query (str): The query to run.
+            repeats (int): Number of timed runs.
+
+        Returns:
+            Tuple[pd.DataFrame, float]: The result and its median latency in ms.
+        """
+        result_df = conn.execute(sql_query).df()
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            conn.execute(sql_query).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        return result_df, statistics.median(timings)
+
+    @staticmethod
+    def normalize(frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Puts a result in the form it has once read back from a golden CSV, with rows
+        sorted by every column so ties in the query's ORDER BY do not matter.
+
+        Args:
+            frame (pd.DataFrame): A query result or golden file.
+
+        Returns:
+            pd.DataFrame: The normalized frame.
+        """
+        frame = pd.read_csv(io.StringIO(frame.to_csv(index=False)))
+        # Exact columns first, so float noise cannot reorder otherwise equal rows
+        columns = sorted(
+            frame.columns, key=lambda c: pd.api.types.is_float_dtype(frame[c])
+        )
+        return frame.sort_values(columns, kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def compare_to_golden(
+        result_df: pd.DataFrame, golden_csv: Path, config: RegressionConfig
+    ) -> List[str]:
+        """
+        Diffs a query result against its golden file, numeric columns within the
+        configured tolerance and other columns exactly.
+
+        Args:
+            result_df (pd.DataFrame): The query result.
+            golden_csv (Path): The golden result file.
+            config (RegressionConfig): Regression suite settings.
+
+        Returns:
+            List[str]: The differences found, empty if the result matches.
+        """
+        if not golden_csv.exists():
+            return [f"missing golden file '{golden_csv}'"]
+
+        result = Regression.normalize(result_df)
+        golden = Regression.normalize(pd.read_csv(golden_csv))
+        if list(result.columns) != list(golden.columns):
+            return [f"columns {list(result.columns)} != {list(golden.columns)}"]
+        if len(result) != len(golden):
+            return [f"{len(result)} rows != {len(golden)} golden rows"]
+
+        differences = []
+        for column in golden.columns:
+            if pd.api.types.is_numeric_dtype(
+                golden[column]
+            ) and pd.api.types.is_numeric_dtype(result[column]):
+                matches = np.isclose(
+                    result[column].astype(float),
+                    golden[column].astype(float),
+                    rtol=config.rel_tolerance,
+                    atol=config.abs_tolerance,
+                    equal_nan=True,
+                )
+            else:
+                matches = (
+                    result[column].astype(str) == golden[column].astype(str)
+                ).to_numpy()
+            mismatched = np.flatnonzero(~matches)
+            if len(mismatched):
+                row = mismatched[0]
+                differences.append(
+                    f"{len(mismatched)} rows differ in '{column}', first at row {row}: "
+                    f"{result[column].iloc[row]!r} != {golden[column].iloc[row]!r}"
+                )
+        return differences
+
+    @staticmethod
+    def check_latency(
+        latencies: Dict[str, float],
+        baseline: Dict[str, float],
+        config: RegressionConfig,
+    ) -> List[str]:
+        """
+        Compares query latencies with the baseline. A query fails when it is more than
+        max_slowdown slower and above min_latency_ms; queries without a baseline pass.
+
+        Args:
+            latencies (Dict[str, float]): Query name mapped to its latency in ms.
+            baseline (Dict[str, float]): Query name mapped to its baseline in ms.
+            config (RegressionConfig): Regression suite settings.
+
+        Returns:
+            List[str]: The queries that got too slow, with their timings.
+        """
+        failures = []
+        for name, latency in sorted(latencies.items()):
+            if name not in baseline or latency < config.min_latency_ms:
+                continue
+            limit = baseline[name] * (1 + config.max_slowdown)
+            if latency > limit:
+                failures.append(
+                    f"{name}: {latency:.1f} ms > {limit:.1f} ms "
+                    f"(baseline {baseline[name]:.1f} ms + {config.max_slowdown:.0%})"
+                )
+        return failures
+
+    @staticmethod
+    def run(config: RegressionConfig, update: bool = False) -> bool:
+        """
+        Runs every query in the queries directory against a freshly built fixture
+        database and checks it against its golden result and latency baseline. With
+        update, the golden results and baseline are rewritten instead.
+
+        Args:
+            config (RegressionConfig): Regression suite settings.
+            update (bool): Record the current results and latencies as the new
+                goldens and baseline.
+
+        Returns:
+            bool: True if every query matched its golden result and latency gate.
+        """
+        golden_dir = config.regression_directory / GOLDEN_DIRECTORY
+        baseline_file = config.regression_directory / LATENCY_BASELINE_FILE
+        baseline = (
+            json.loads(baseline_file.read_text(encoding="UTF-8"))
+            if baseline_file.exists()
+            else {}
+        )
+
+        failures, latencies = [], {}
+        with tempfile.TemporaryDirectory() as work_dir:
+            db_file = Regression.build_fixture_database(config, Path(work_dir))
+            with duckdb.connect(database=str(db_file), read_only=True) as conn:
+                for sql_file in sorted(config.queries_directory.glob("*.sql")):
+                    sql_query = sql_file.read_text(encoding="UTF-8").strip()
+                    result_df, latencies[sql_file.stem] = Regression.time_query(
+                        conn, sql_query, config.repeats
+                    )
+                    golden_csv = golden_dir / f"{sql_file.stem}_result.csv"
+                    print(
+                        f"{sql_file.stem}: {len(result_df)} rows, "
+                        f"{latencies[sql_file.stem]:.1f} ms"
+                    )
+
+                    if update:
+                        golden_dir.mkdir(parents=True, exist_ok=True)
+                        result_df.to_csv(golden_csv, index=False)
+                        continue
+                    failures.extend(
+                        f"{sql_file.stem}: {difference}"
+                        for difference in Regression.compare_to_golden(
+                            result_df, golden_csv, config
+                        )
+                    )
+
+        if update:
+            baseline_file.write_text(
+                json.dumps(
+                    {name: round(ms, 3) for name, ms in sorted(latencies.items())},
+                    indent=2,
+                ),
+                encoding="UTF-8",
+            )
+            print(
+                f"Updated golden results and latency baseline in '{golden_dir.parent}'"
+            )
+            return True
+
+        failures.extend(Regression.check_latency(latencies, baseline, config))
+        for failure in failures:
+            print(f"FAILED {failure}")
+        if not failures:
+            print(f"All {len(latencies)} report queries match their golden results.")
+        return not failures
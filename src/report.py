@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+
+from src.catalog import Catalog
+from src.models.models import SampleConfig
+from src.runtime import Runtime
+from src.sample import Sample
+from src.config.constants import DatabaseContants, FileDirectoryPath
+
+
+class Report:
+
+    @staticmethod
+    def run_query_to_csv(
+        sql_file: Path,
+        db_file: Path = Path(DatabaseContants.DATABASE_FILE.value),
+        output_dir: Path = Path(FileDirectoryPath.QUERY_OUTPUT.value),
+        runtime: Optional[Runtime] = None,
+        shard_directory: Optional[Path] = None,
+        sample: Optional[SampleConfig] = None,
+    ) -> None:
+        """
+        Runs the SQL query in sql_file against the database and writes the result to
+        <output_dir>/<sql_file stem>_result.csv, or an approximate result with
+        standard errors to <sql_file stem>_sample_result.csv when sampling.
+
+        Args:
+            sql_file (Path): Path to the SQL file.
+            db_file (Path): Path to the DuckDB database file.
+            output_dir (Path): Directory for the query result.
+            runtime (Optional[Runtime]): Run on this shared connection instead of
+                opening the database read-only.
+            shard_directory (Optional[Path]): Read the funds the query names from the
+                shards in this directory instead of the main database. Shards are
+                only written by `shards load`, so they are never read unless asked.
+            sample (Optional[SampleConfig]): Run on a stratified sample of the fund
+                holdings instead of the full data.
+        """
+        # Check if the file exists
+        if not sql_file.exists() or not sql_file.is_file():
+            print(f"Error: File '{sql_file}' does not exist.")
+            return
+
+        # Read the SQL query from the file
+        with open(sql_file, "r", encoding="UTF-8") as file:
+            sql_query = file.read().strip()
+
+        if runtime is not None:
+            conn = runtime.conn
+        else:
+            conn = duckdb.connect(database=str(db_file), read_only=True)
+
+        try:
+            if shard_directory is not None:
+                Catalog.attach(conn, shard_directory, sql_query)
+
+            print("\nExecuting query...")
+            if sample is not None:
+                result_df = Sample.estimate(conn, sql_query, sample)
+            else:
+                result_df = conn.execute(sql_query).df()
+
+            # Show a preview of the result
+            print("\nQuery executed successfully. Preview of the result:")
+            print(result_df.head())
+
+            # Determine the output CSV file name and path
+            output_dir.mkdir(exist_ok=True)
+            suffix = "_sample_result" if sample is not None else "_result"
+            output_csv_name = f"{sql_file.stem}{suffix}.csv"
+            output_csv_path = output_dir / output_csv_name
+
+            # Write the result to a CSV file
+            result_df.to_csv(output_csv_path, index=False)
+            print(f"\nQuery result written to '{output_csv_path}'")
+
+        except Exception as e:
+            print(f"Error executing query: {e}")
+
+        finally:
+            # A shared connection is owned, and closed, by its runtime
+            if runtime is None:
+                conn.close()
@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import duckdb
+
+from src.models.models import RuntimeConfig
+from src.utils.utils import ETLUtils
+
+
+class Runtime:
+    """
+    Owns the single configured DuckDB connection shared by every stage of a pipeline
+    run, so the database is opened, its WAL replayed and its caches warmed only once.
+    The connection is opened on first use.
+    """
+
+    def __init__(self, config: Optional[RuntimeConfig] = None) -> None:
+        self.config = config or RuntimeConfig()
+        self._conn: Optional[duckdb.DuckDBPyConnection] = None
+
+    @property
+    def conn(self) -> duckdb.DuckDBPyConnection:
+        """The shared DuckDB connection, opened and configured on first access."""
+        if self._conn is None:
+            if self.config.temp_directory:
+                self.config.temp_directory.mkdir(parents=True, exist_ok=True)
+            self._conn = ETLUtils.initialize_duckdb(
+                self.config.db_file,
+                memory_limit_mb=self.config.memory_limit_mb,
+                threads=self.config.threads,
+                temp_directory=self.config.temp_directory,
+            )
+            print(f"Opened shared connection to '{self.config.db_file}'")
+        return self._conn
+
+    def close(self) -> None:
+        """Closes the shared connection if it was opened."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "Runtime":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    @contextmanager
+    def use(runtime: Optional["Runtime"] = None) -> Iterator["Runtime"]:
+        """
+        Yields the given runtime, or a default one that is closed on exit so a stage
+        run on its own still releases the database.
+
+        Args:
+            runtime (Optional[Runtime]): The pipeline run's runtime, if any.
+
+        Yields:
+            Runtime: The runtime to use.
+        """
+        if runtime is not None:
+            yield runtime
+            return
+        with Runtime() as own_runtime:
+            yield own_runtime
@@ -0,0 +1,253 @@
+import re
+from typing import List, Optional
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from src.models.models import SampleConfig
+from src.recon import Recon
+
+# Suffix of the temp views a sampled query reads instead of the fund tables
+SAMPLED_SUFFIX = "_sampled"
+
+
+class Sample:
+    """
+    Runs report queries approximately on a stratified sample of the fund holdings.
+    Every fund report (fund and DATA_DATE) keeps the same share of its rows, and at
+    least one row per random group, so no fund or month drops out of the result or
+    of a group. The spread of the groups gives a standard error for each numeric
+    result column.
+    """
+
+    @staticmethod
+    def funds_in_query(conn: duckdb.DuckDBPyConnection, sql_query: str) -> List[str]:
+        """
+        Finds the fund tables a query reads, ignoring quoted names.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            sql_query (str): The query text.
+
+        Returns:
+            List[str]: The referenced funds, sorted.
+        """
+        return [
+            fund
+            for fund in Recon.list_funds(conn)
+            if re.search(rf"(?<!['\"])\b{re.escape(fund)}\b(?!['\"])", sql_query, re.I)
+        ]
+
+    @staticmethod
+    def rewrite(sql_query: str, funds: List[str]) -> str:
+        """
+        Points a query at the sampled views of the given funds.
+
+        Args:
+            sql_query (str): The query text.
+            funds (List[str]): The funds to read from their sample.
+
+        Returns:
+            str: The rewritten query.
+        """
+        for fund in funds:
+            sql_query = re.sub(
+                rf"(?<!['\"])\b{re.escape(fund)}\b(?!['\"])",
+                f"{fund}{SAMPLED_SUFFIX}",
+                sql_query,
+                flags=re.I,
+            )
+        return sql_query
+
+    @staticmethod
+    def draw(
+        conn: duckdb.DuckDBPyConnection, funds: List[str], config: SampleConfig
+    ) -> float:
+        """
+        Draws the sample of each fund into a temp table in a single scan, ranking
+        every report's rows by a seeded hash and keeping the first config.percent
+        of them, but at least config.groups, numbered round-robin into the random
+        groups. The report sizes are kept in the sample, so the sampled share is
+        computed from the small sample table instead of counting the fund table.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            funds (List[str]): The funds to sample.
+            config (SampleConfig): Sampling settings.
+
+        Returns:
+            float: The share of the funds' rows in the sample.
+        """
+        sampled, total = 0, 0
+        for fund in funds:
+            # Ranking by the hash of the row's content makes the sample random but
+            # repeatable; only rows of the same report are sorted against each other
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TEMP TABLE {fund}_sample AS
+                SELECT
+                    * EXCLUDE (SAMPLE_RANK),
+                    (SAMPLE_RANK - 1) % {config.groups} AS SAMPLE_GROUP
+                FROM (
+                    SELECT
+                        *,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY DATA_DATE ORDER BY hash(h, {config.seed})
+                        ) AS SAMPLE_RANK,
+                        COUNT(*) OVER (PARTITION BY DATA_DATE) AS STRATUM_ROWS
+                    FROM {fund} h
+                )
+                WHERE SAMPLE_RANK <= GREATEST(
+                    {config.groups}, CEIL(STRATUM_ROWS * {config.percent / 100})
+                )
+            """
+            )
+            fund_sampled, fund_total = conn.execute(
+                f"""
+                SELECT COUNT(*), (
+                    SELECT COALESCE(SUM(STRATUM_ROWS), 0)
+                    FROM (SELECT DISTINCT DATA_DATE, STRATUM_ROWS FROM {fund}_sample)
+                )
+                FROM {fund}_sample
+            """
+            ).fetchone()
+            sampled += fund_sampled
+            total += fund_total
+        return sampled / total if total else 1.0
+
+    @staticmethod
+    def use_group(
+        conn: duckdb.DuckDBPyConnection, funds: List[str], group: Optional[int]
+    ) -> None:
+        """
+        Points the sampled views at one random group, or the whole sample.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            funds (List[str]): The sampled funds.
+            group (Optional[int]): The group to expose, all groups if None.
+        """
+        where = "TRUE" if group is None else f"SAMPLE_GROUP = {group}"
+        for fund in funds:
+            conn.execute(
+                f"CREATE OR REPLACE TEMP VIEW {fund}{SAMPLED_SUFFIX} AS "
+                f"SELECT * EXCLUDE (SAMPLE_GROUP, STRATUM_ROWS) "
+                f"FROM {fund}_sample WHERE {where}"
+            )
+
+    @staticmethod
+    def standard_errors(
+        estimate: pd.DataFrame,
+        group_results: List[pd.DataFrame],
+        key_columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Adds a <column>_stderr column after every numeric column of the estimate.
+        Rows are matched across groups on the key columns, and the standard error of
+        the whole-sample value is the spread of the group values over the square root
+        of the number of groups holding the row. Rows found in fewer than two groups
+        get no standard error.
+
+        Args:
+            estimate (pd.DataFrame): The whole-sample result.
+            group_results (List[pd.DataFrame]): The result of every random group.
+            key_columns (Optional[List[str]]): Columns matching rows across groups,
+                the non-numeric columns if not given.
+
+        Returns:
+            pd.DataFrame: The estimate with the standard error columns.
+        """
+        keys = key_columns or [
+            c
+            for c in estimate.columns
+            if not pd.api.types.is_numeric_dtype(estimate[c])
+            or pd.api.types.is_bool_dtype(estimate[c])
+        ]
+        numeric = [
+            c
+            for c in estimate.columns
+            if c not in keys and pd.api.types.is_numeric_dtype(estimate[c])
+        ]
+        if not numeric:
+            return estimate
+
+        groups = pd.concat(group_results, ignore_index=True)
+        groups[numeric] = groups[numeric].astype(float)
+        spread = (
+            groups.groupby(keys, dropna=False, observed=True)[numeric]
+            if keys
+            else groups.assign(_all=0).groupby("_all")[numeric]
+        )
+        stderr = (spread.std(ddof=1) / np.sqrt(spread.count())).add_suffix("_stderr")
+
+        if keys:
+            result = estimate.merge(stderr.reset_index(), on=keys, how="left")
+        else:
+            result = estimate.assign(**stderr.iloc[0].to_dict())
+        columns = list(estimate.columns)
+        for c in reversed(numeric):
+            columns.insert(columns.index(c) + 1, f"{c}_stderr")
+        return result[columns]
+
+    @staticmethod
+    def estimate(
+        conn: duckdb.DuckDBPyConnection, sql_query: str, config: SampleConfig
+    ) -> pd.DataFrame:
+        """
+        Runs a query on a sample of the fund holdings it reads and estimates its
+        result, with a standard error for each numeric column. Columns listed in
+        config.scaled_columns are scaled from the sample up to the full data. The
+        point estimate is printed before the group runs; standard error columns left
+        empty, because no result row is found in two groups, are dropped with a
+        warning.
+
+        Args:
+            conn (duckdb.DuckDBPyConnection): The DuckDB connection object.
+            sql_query (str): The query to run.
+            config (SampleConfig): Sampling settings.
+
+        Returns:
+            pd.DataFrame: The approximate result.
+        """
+        funds = Sample.funds_in_query(conn, sql_query)
+        fraction = Sample.draw(conn, funds, config)
+        sampled_query = Sample.rewrite(sql_query, funds)
+
+        def run(group: Optional[int], group_fraction: float) -> pd.DataFrame:
+            Sample.use_group(conn, funds, group)
+            result_df = conn.execute(sampled_query).df()
+            for column in config.scaled_columns:
+                if column in result_df.columns:
+                    result_df[column] = result_df[column] / group_fraction
+            return result_df
+
+        try:
+            estimate = run(None, fraction)
+            print(
+                f"\nPoint estimate from a {fraction:.1%} stratified sample of {len(funds)} "
+                f"funds, before standard errors:"
+            )
+            print(estimate.head())
+
+            group_results = [
+                run(group, fraction / config.groups) for group in range(config.groups)
+            ]
+            result = Sample.standard_errors(estimate, group_results, config.key_columns)
+            empty = [
+                c
+                for c in result.columns
+                if c.endswith("_stderr")
+                and c not in estimate.columns
+                and result[c].isna().all()
+            ]
+            if empty:
+                print(
+                    f"Warning: no standard error for {', '.join(empty)}, as no result "
+                    f"row appears in two groups; pass --key to match rows."
+                )
+            return result.drop(columns=empty)
+        finally:
+            for fund in funds:
+                conn.execute(f"DROP VIEW IF EXISTS {fund}{SAMPLED_SUFFIX}")
+                conn.execute(f"DROP TABLE IF EXISTS {fund}_sample")
@@ -1,6 +1,9 @@
 from pathlib import Path
+from typing import Optional
 import duckdb
-from src.config.constants import DatabaseContants, FileDirectoryPath
+from src.config.constants import FileDirectoryPath
+from src.reference import Reference
+from src.runtime import Runtime
 
 
 class Setup:
@@ -8,10 +11,19 @@ class Setup:
         self.db_file = Path(db_file)
         self.sql_file = Path(sql_file)
         self.conn = None
+        self.owns_conn = False
 
     def connect_to_db(self) -> None:
         """Establish a connection to the DuckDB database."""
         self.conn = duckdb.connect(database=str(self.db_file), read_only=False)
+        self.owns_conn = True
+
+    def release(self) -> None:
+        """Close the connection if Setup opened it; a shared connection stays open."""
+        if self.owns_conn and self.conn:
+            self.conn.close()
+            self.conn = None
+            self.owns_conn = False
 
     def execute_sql(self) -> None:
         """Read and execute the SQL query from the file."""
@@ -23,14 +35,28 @@ class Setup:
 
             self.conn.execute(sql_query)
         finally:
-            self.conn.close()
+            self.release()
+
+    def load_reference_data(self, reference_dir: Path) -> None:
+        """Bulk import reference price histories, appending only new dates."""
+        if not self.conn:
+            raise ConnectionError("Database connection is not established.")
+        try:
+            Reference.load_reference_data(self.conn, reference_dir)
+        finally:
+            self.release()
 
     @staticmethod
-    def setup_step() -> None:
-        """Execute the setup steps."""
-        setup = Setup(
-            db_file=DatabaseContants.DATABASE_FILE.value,
-            sql_file=FileDirectoryPath.MASTER_REFERENCE_SQL.value,
-        )
-        setup.connect_to_db()
-        setup.execute_sql()
+    def setup_step(runtime: Optional[Runtime] = None) -> None:
+        """Execute the setup steps on the pipeline run's shared connection."""
+        with Runtime.use(runtime) as runtime:
+            setup = Setup(
+                db_file=runtime.config.db_file,
+                sql_file=FileDirectoryPath.MASTER_REFERENCE_SQL.value,
+            )
+            setup.conn = runtime.conn
+            reference_dir = Path(FileDirectoryPath.REFERENCE_DATA.value)
+            if Reference.has_price_files(reference_dir):
+                setup.load_reference_data(reference_dir)
+            else:
+                setup.execute_sql()
@@ -0,0 +1,159 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.catalog import Catalog
+from src.load import Load
+from src.models.models import ShardConfig
+from src.utils.utils import ETLUtils
+from src.config.constants import FileDirectoryPath
+
+
+class Shard:
+
+    @staticmethod
+    def shard_for(filename: str, config: ShardConfig) -> Optional[str]:
+        """
+        Determines the shard a transformed fund file belongs to.
+
+        Args:
+            filename (str): The name of the transformed CSV file.
+            config (ShardConfig): Sharding settings.
+
+        Returns:
+            Optional[str]: The shard name, None if the fund or year is unknown.
+        """
+        table_name = ETLUtils.extract_table_name(filename)
+        if not table_name:
+            return None
+
+        if config.shard_by == "year":
+            date = ETLUtils.extract_date(
+                filename, config.date_patterns, config.date_format
+            )
+            if not date:
+                return None
+            return f"year_{datetime.strptime(date, config.date_format).year}"
+
+        for group, funds in config.fund_groups.items():
+            if table_name in funds:
+                return group
+        return table_name
+
+    @staticmethod
+    def plan(config: ShardConfig) -> Dict[str, List[Path]]:
+        """
+        Groups the transformed fund files by shard.
+
+        Args:
+            config (ShardConfig): Sharding settings.
+
+        Returns:
+            Dict[str, List[Path]]: Shard name mapped to its files, sorted.
+        """
+        shards: Dict[str, List[Path]] = {}
+        for filename in sorted(os.listdir(config.input_directory)):
+            if not filename.lower().endswith(".csv"):
+                continue
+            shard = Shard.shard_for(filename, config)
+            if shard is None:
+                print(
+                    f"Could not determine the shard of '{filename}'. Skipping file.\n"
+                )
+                continue
+            shards.setdefault(shard, []).append(Path(config.input_directory) / filename)
+        return shards
+
+    @staticmethod
+    def load_shard(shard: str, files: List[Path], config: ShardConfig) -> List[str]:
+        """
+        Loads files into a shard's own database as versioned fund history. Each shard
+        has its own file and connection, so shards load without contending for a lock.
+
+        Args:
+            shard (str): The shard name.
+            files (List[Path]): The transformed CSV files of the shard.
+            config (ShardConfig): Sharding settings.
+
+        Returns:
+            List[str]: The funds loaded into the shard.
+        """
+        conn = ETLUtils.initialize_duckdb(config.shard_directory / f"{shard}.duckdb")
+        funds = set()
+        try:
+            for csv_file in files:
+                table_name = ETLUtils.extract_table_name(csv_file.name)
+                Load.load_versioned(conn, table_name, csv_file)
+                funds.add(table_name)
+        finally:
+            conn.close()
+        return sorted(funds)
+
+    @staticmethod
+    def load_files(config: ShardConfig) -> Dict[str, List[str]]:
+        """
+        Loads the transformed fund files into their shards, up to config.workers
+        shards in parallel, and records the shards in the manifest.
+
+        Args:
+            config (ShardConfig): Sharding settings.
+
+        Returns:
+            Dict[str, List[str]]: Shard name mapped to the funds loaded into it.
+        """
+        config.shard_directory.mkdir(parents=True, exist_ok=True)
+        plan = Shard.plan(config)
+        print(
+            f"Loading {sum(len(files) for files in plan.values())} files into "
+            f"{len(plan)} shards by {config.shard_by} with {config.workers} workers"
+        )
+
+        # DuckDB releases the GIL while loading, so threads run shards concurrently
+        with ThreadPoolExecutor(max_workers=config.workers) as executor:
+            futures = {
+                shard: executor.submit(Shard.load_shard, shard, files, config)
+                for shard, files in plan.items()
+            }
+            loaded = {shard: future.result() for shard, future in futures.items()}
+
+        for shard, funds in loaded.items():
+            Catalog.register_shard(
+                config.shard_directory, shard, f"{shard}.duckdb", "duckdb", funds
+            )
+        return loaded
+
+    @staticmethod
+    def shard_step(
+        shard_by: str = "fund_group",
+        workers: int = 4,
+        fund_groups_file: Optional[Path] = None,
+        shard_directory: Path = Path(FileDirectoryPath.SHARDS.value),
+    ) -> None:
+        """
+        Main function to load the transformed fund files into sharded databases.
+
+        Args:
+            shard_by (str): Split the funds by "fund_group" or "year".
+            workers (int): Number of shards loaded in parallel.
+            fund_groups_file (Optional[Path]): JSON file mapping group names to funds.
+            shard_directory (Path): Directory holding the shards and their manifest.
+        """
+        fund_groups = (
+            json.loads(fund_groups_file.read_text(encoding="UTF-8"))
+            if fund_groups_file
+            else {}
+        )
+        config = ShardConfig(
+            input_directory=Path(
+                FileDirectoryPath.EXTERNAL_FUNDS_CSV_TRANSFORMED.value
+            ),
+            shard_directory=shard_directory,
+            shard_by=shard_by,
+            fund_groups=fund_groups,
+            workers=workers,
+        )
+        Shard.load_files(config)
+        print("All CSV files have been ingested into their shards.")
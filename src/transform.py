@@ -1,19 +1,63 @@
+import itertools
 import os
+from datetime import date
 from pathlib import Path
+from typing import List, Optional, TypeVar
 
 import polars as pl
 
-from src.models.models import Config
+from src.landing import Landing
+from src.models.models import Config, RawFile
 from src.utils.utils import ETLUtils
-from src.config.constants import FileDirectoryPath
+from src.config.constants import FileDirectoryPath, LandingStatus
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
 
 
 class Transform:
 
+    @staticmethod
+    def transform_frame(frame: FrameT, table_name: str, date: str) -> FrameT:
+        """
+        Applies the column renames and DATA_DATE/SOURCE columns to an eager or lazy frame,
+        with DATA_DATE as a Date and the repeated text columns as Categorical.
+
+        Args:
+            frame (FrameT): The raw fund data as a DataFrame or LazyFrame.
+            table_name (str): The table name to store in the SOURCE column.
+            date (str): The date string to append.
+
+        Returns:
+            FrameT: The transformed frame, of the same type as the input.
+        """
+        columns = frame.collect_schema().names()
+        frame = frame.rename(
+            {col: ETLUtils.to_snake_case(col).upper() for col in columns}
+        )
+
+        # Consolidate instrument identifiers and rename to INST_ID
+        columns = frame.collect_schema().names()
+        frame = frame.rename(
+            {col: "INST_ID" for col in columns if col in {"SEDOL", "ISIN"}}
+        )
+
+        # Insert the DATA_DATE column at the beginning
+        frame = frame.with_columns([pl.lit(date).alias("DATA_DATE")])
+        frame = frame.with_columns([pl.lit(table_name).alias("SOURCE")])
+
+        # Reorder columns to have DATA_DATE first
+        cols = frame.collect_schema().names()
+        cols = ["DATA_DATE"] + [col for col in cols if col != "DATA_DATE"]
+        return ETLUtils.encode_columns(frame.select(cols))
+
     @staticmethod
     def clean_csv_data(
-        filename: str, file_path: os.PathLike, output_directory: os.PathLike, date: str
-    ) -> None:
+        filename: str,
+        file_path: os.PathLike,
+        output_directory: os.PathLike,
+        date: str,
+        chunk_rows: Optional[int] = None,
+    ) -> bool:
         """
         Appends the DATA_DATE column to the CSV file, converts column names to snake_case in caps,
         consolidates instrument identifiers and writes it to the output directory.
@@ -22,69 +66,190 @@ class Transform:
             file_path (os.PathLike): The path to the original CSV file.
             output_directory (os.PathLike): The path to the output directory.
             date (str): The date string to append.
+            chunk_rows (Optional[int]): If set, the file is streamed from input to
+                output in batches of this many rows instead of being read in full.
+
+        Returns:
+            bool: True if the output file was written.
         """
+        table_name = ETLUtils.extract_table_name(filename)
+
+        # Determine the output file path
+        output_path = os.path.join(output_directory, os.path.basename(file_path))
+
+        if chunk_rows:
+            temp_path = f"{output_path}.tmp"
+            try:
+                lf = Transform.transform_frame(pl.scan_csv(file_path), table_name, date)
+                with pl.Config(streaming_chunk_size=chunk_rows):
+                    lf.sink_csv(temp_path, batch_size=chunk_rows, engine="streaming")
+                os.replace(temp_path, output_path)
+                print(
+                    f"Created {output_path} with DATA_DATE {date} in batches of {chunk_rows} rows"
+                )
+                return True
+            except Exception as e:
+                Path(temp_path).unlink(missing_ok=True)
+                print(f"Error streaming {file_path} to {output_path}: {e}")
+                return False
+
         try:
             # Read the CSV file with Polars
             df = pl.read_csv(file_path)
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
-            return
+            return False
 
-        table_name = ETLUtils.extract_table_name(filename)
-
-        df = df.rename({col: ETLUtils.to_snake_case(col).upper() for col in df.columns})
+        df = Transform.transform_frame(df, table_name, date)
 
-        # Consolidate instrument identifiers and rename to INST_ID
-        df = df.rename(
-            {col: "INST_ID" for col in df.columns if col in {"SEDOL", "ISIN"}}
-        )
+        try:
+            df.write_csv(output_path)
+            print(f"Created {output_path} with DATA_DATE {date}")
+            return True
+        except Exception as e:
+            print(f"Error writing to {output_path}: {e}")
+            return False
 
-        # Insert the DATA_DATE column at the beginning
-        df = df.with_columns([pl.lit(date).alias("DATA_DATE")])
-        df = df.with_columns([pl.lit(table_name).alias("SOURCE")])
+    @staticmethod
+    def clean_compressed_data(
+        raw_file: RawFile,
+        output_directory: os.PathLike,
+        date: str,
+        memory_budget_mb: int,
+        probe_rows: int = 1000,
+    ) -> bool:
+        """
+        Transforms a gzip, zstd or zip member CSV while decompressing it as a stream.
+        The first probe_rows rows fix the schema and the row width; the rest of the
+        file is parsed in batches sized to the memory budget and appended to the output.
+        A batch that does not fit the probed schema is read as text instead. The output
+        is written to a temporary file and only replaces the output once every batch
+        is written, so a failure never leaves a truncated file for Validate and Load.
 
-        # Reorder columns to have DATA_DATE first
-        cols = df.columns
-        cols = ["DATA_DATE"] + [col for col in cols if col != "DATA_DATE"]
-        df = df.select(cols)
+        Args:
+            raw_file (RawFile): The compressed input.
+            output_directory (os.PathLike): The path to the output directory.
+            date (str): The date string to append.
+            memory_budget_mb (int): Memory available for the file, in megabytes.
+            probe_rows (int): Number of rows read before sizing the batches.
 
-        # Determine the output file path
-        filename = os.path.basename(file_path)
-        output_path = os.path.join(output_directory, filename)
+        Returns:
+            bool: True if the output file was written.
+        """
+        table_name = ETLUtils.extract_table_name(raw_file.name)
+        output_path = os.path.join(output_directory, raw_file.name)
+        temp_path = f"{output_path}.tmp"
 
         try:
-            df.write_csv(output_path)
-            print(f"Created {output_path} with DATA_DATE {date}")
+            with ETLUtils.open_raw_file(raw_file) as stream, open(
+                temp_path, "wb"
+            ) as output:
+                header = stream.readline()
+                lines = list(itertools.islice(stream, probe_rows))
+                batch = pl.read_csv(header + b"".join(lines), infer_schema_length=None)
+                schema = batch.schema
+                row_bytes = sum(len(line) for line in lines) // max(1, len(lines))
+                chunk_rows = ETLUtils.batch_rows(row_bytes, memory_budget_mb)
+
+                Transform.transform_frame(batch, table_name, date).write_csv(output)
+                while lines := list(itertools.islice(stream, chunk_rows)):
+                    data = header + b"".join(lines)
+                    try:
+                        batch = pl.read_csv(data, schema=schema)
+                    except pl.exceptions.PolarsError:
+                        # Values the probe did not see, e.g. a float in an integer
+                        # column, are passed through as text
+                        batch = pl.read_csv(data, infer_schema=False)
+                    Transform.transform_frame(batch, table_name, date).write_csv(
+                        output, include_header=False
+                    )
+            os.replace(temp_path, output_path)
+            print(f"Created {output_path} with DATA_DATE {date} from {raw_file.path}")
+            return True
         except Exception as e:
-            print(f"Error writing to {output_path}: {e}")
+            Path(temp_path).unlink(missing_ok=True)
+            print(f"Error processing {raw_file.name} from {raw_file.path}: {e}")
+            return False
+
+    @staticmethod
+    def clean_raw_file(
+        raw_file: RawFile,
+        output_directory: os.PathLike,
+        date: str,
+        memory_budget_mb: int,
+    ) -> bool:
+        """
+        Transforms a plain or compressed raw input into the output directory.
+
+        Args:
+            raw_file (RawFile): The input to transform.
+            output_directory (os.PathLike): The path to the output directory.
+            date (str): The date string to append.
+            memory_budget_mb (int): Memory available for the file, in megabytes.
+
+        Returns:
+            bool: True if the output file was written.
+        """
+        if raw_file.compression:
+            return Transform.clean_compressed_data(
+                raw_file, output_directory, date, memory_budget_mb
+            )
+        return Transform.clean_csv_data(
+            raw_file.name,
+            raw_file.path,
+            output_directory,
+            date,
+            ETLUtils.rows_per_chunk(raw_file.path, memory_budget_mb),
+        )
 
     @staticmethod
     def process_files(config: Config) -> None:
         """
-        Processes all CSV files in the input directory by appending the DATA_DATE column
-        and writing the updated files to the output directory.
+        Processes the plain and compressed CSV files in the input directory, limited
+        to the configured funds and months, by appending the DATA_DATE column and
+        writing the updated files to the output directory. Files are picked from the
+        landing index, which only re-parses new or modified filenames, and only the
+        files written successfully are marked transformed.
 
         Args:
             config (Config): Configuration settings.
         """
-        for filename in os.listdir(config.input_directory):
-            if filename.lower().endswith(".csv"):
-                file_path = os.path.join(config.input_directory, filename)
-                date = ETLUtils.extract_date(
-                    filename, config.date_patterns, config.date_format
-                )
+        index = Landing.refresh(config.input_directory, config.date_patterns)
+        selected = Landing.select(
+            index, config.funds, config.start_month, config.end_month
+        )
 
-                if date:
-                    Transform.clean_csv_data(
-                        filename, file_path, config.output_directory, date
-                    )
-                else:
-                    print(f"No valid date found in filename: {filename}")
+        transformed = []
+        for raw_file, data_date in zip(
+            Landing.raw_files(config.input_directory, selected), selected["DATA_DATE"]
+        ):
+            if not data_date:
+                print(f"No valid date found in filename: {raw_file.name}")
+            elif Transform.clean_raw_file(
+                raw_file,
+                config.output_directory,
+                data_date.strftime(config.date_format),
+                config.memory_budget_mb,
+            ):
+                transformed.append(raw_file.name)
+        Landing.mark(config.input_directory, transformed, LandingStatus.TRANSFORMED)
 
     @staticmethod
-    def transform_step() -> None:
+    def transform_step(
+        funds: Optional[List[str]] = None,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+    ) -> bool:
         """
         Main function to execute the script.
+
+        Args:
+            funds (Optional[List[str]]): Only transform these funds, all if not set.
+            start_month (Optional[date]): First report month to transform.
+            end_month (Optional[date]): Last report month to transform.
+
+        Returns:
+            bool: True if the stage finished, False if it failed.
         """
         try:
             config = Config(
@@ -92,7 +257,12 @@ class Transform:
                 output_directory=Path(
                     FileDirectoryPath.EXTERNAL_FUNDS_CSV_TRANSFORMED.value
                 ),
+                funds=funds,
+                start_month=start_month,
+                end_month=end_month,
             )
             Transform.process_files(config)
+            return True
         except Exception as e:
             print(f"Error encountered in transform_step : {e}")
+            return False
@@ -1,9 +1,26 @@
+import gzip
+import hashlib
+import io
+import os
 import re
+import zipfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, Iterator, List, Optional, TypeVar
 
 import duckdb
+import polars as pl
+
+from src.models.models import RawFile
+from src.config.constants import PipelineDefaults
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd", ".zip": "zip"}
+
+# Low-cardinality text columns repeated on every row, dictionary-encoded in memory
+CATEGORICAL_COLUMNS = ("FINANCIAL_TYPE", "SECURITY_NAME", "SOURCE")
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
 
 
 class ETLUtils:
@@ -96,15 +113,225 @@ class ETLUtils:
         return None
 
     @staticmethod
-    def initialize_duckdb(db_path: Path) -> duckdb.DuckDBPyConnection:
+    def encode_columns(frame: FrameT) -> FrameT:
+        """
+        Dictionary-encodes the repeated text columns as Categorical and parses
+        DATA_DATE as a Date, on an eager or lazy frame. Columns that are absent or
+        already encoded are left as they are.
+
+        Args:
+            frame (FrameT): Transformed fund data as a DataFrame or LazyFrame.
+
+        Returns:
+            FrameT: The frame with compact column types.
+        """
+        schema = frame.collect_schema()
+        casts = [
+            pl.col(col).cast(pl.Categorical)
+            for col in CATEGORICAL_COLUMNS
+            if schema.get(col) == pl.String
+        ]
+        if schema.get("DATA_DATE") == pl.String:
+            # An explicit format keeps the parse elementwise, so lazy frames stream
+            casts.append(pl.col("DATA_DATE").str.to_date("%Y-%m-%d"))
+        return frame.with_columns(casts) if casts else frame
+
+    @staticmethod
+    def initialize_duckdb(
+        db_path: Path,
+        memory_limit_mb: Optional[int] = None,
+        threads: Optional[int] = None,
+        temp_directory: Optional[Path] = None,
+    ) -> duckdb.DuckDBPyConnection:
         """
         Connects to the DuckDB database. Creates the database file if it doesn't exist.
 
         Args:
             db_path (Path): Path to the DuckDB database file.
+            memory_limit_mb (Optional[int]): Caps DuckDB's memory use; larger loads
+                spill to disk instead of growing the process.
+            threads (Optional[int]): Number of DuckDB worker threads.
+            temp_directory (Optional[Path]): Where DuckDB spills to disk.
 
         Returns:
             duckdb.DuckDBPyConnection: The DuckDB connection object.
         """
         conn = duckdb.connect(database=str(db_path), read_only=False)
+        if memory_limit_mb:
+            conn.execute(f"SET memory_limit = '{memory_limit_mb}MB'")
+        if threads:
+            conn.execute(f"SET threads = {threads}")
+        if temp_directory:
+            conn.execute(f"SET temp_directory = '{temp_directory}'")
         return conn
+
+    @staticmethod
+    def rows_per_chunk(
+        file_path: os.PathLike, memory_budget_mb: int, sample_bytes: int = 65536
+    ) -> Optional[int]:
+        """
+        Decides whether a CSV file fits the memory budget when read in full and, if
+        not, how many rows each streamed batch may hold. The row width is estimated
+        from the first sample_bytes of the file.
+
+        Args:
+            file_path (os.PathLike): Path to the CSV file.
+            memory_budget_mb (int): Memory available for a single file, in megabytes.
+            sample_bytes (int): Number of bytes sampled to estimate the row width.
+
+        Returns:
+            Optional[int]: None if the file can be read in full, else the rows per batch.
+        """
+        budget_bytes = memory_budget_mb * 1024 * 1024
+        expansion = PipelineDefaults.IN_MEMORY_EXPANSION.value
+        if os.path.getsize(file_path) * expansion <= budget_bytes:
+            return None
+
+        with open(file_path, "rb") as file:
+            sample = file.read(sample_bytes)
+        row_bytes = max(1, len(sample) // max(1, sample.count(b"\n")))
+        return ETLUtils.batch_rows(row_bytes, memory_budget_mb)
+
+    @staticmethod
+    def batch_rows(row_bytes: int, memory_budget_mb: int) -> int:
+        """
+        Computes how many rows of the given width fit in one batch under the budget.
+
+        Args:
+            row_bytes (int): Estimated width of a CSV row in bytes.
+            memory_budget_mb (int): Memory available for a single file, in megabytes.
+
+        Returns:
+            int: The number of rows per batch.
+        """
+        budget_bytes = memory_budget_mb * 1024 * 1024
+        # Every Polars worker thread holds a batch in flight
+        in_flight = (
+            max(1, row_bytes)
+            * PipelineDefaults.IN_MEMORY_EXPANSION.value
+            * pl.thread_pool_size()
+        )
+        return max(1, budget_bytes // in_flight)
+
+    @staticmethod
+    def is_raw_file(filename: str) -> bool:
+        """
+        Checks whether a file in the landing zone is a plain or compressed CSV input.
+
+        Args:
+            filename (str): The name of the file.
+
+        Returns:
+            bool: True for .csv, .gz, .zst and .zip files.
+        """
+        suffix = Path(filename).suffix.lower()
+        return suffix == ".csv" or suffix in COMPRESSION_SUFFIXES
+
+    @staticmethod
+    def expand_raw_file(file_path: os.PathLike) -> List[RawFile]:
+        """
+        Lists the CSV inputs held in a landing zone file. A zip archive may hold
+        several fund reports; gzip and zstd files hold one CSV named after the file.
+
+        Args:
+            file_path (os.PathLike): Path to the plain or compressed file.
+
+        Returns:
+            List[RawFile]: The CSV inputs, empty if the file is not a raw input.
+        """
+        path = Path(file_path)
+        suffix = path.suffix.lower()
+        if suffix == ".csv":
+            return [RawFile(name=path.name, path=path)]
+
+        compression = COMPRESSION_SUFFIXES.get(suffix)
+        if compression == "zip":
+            with zipfile.ZipFile(path) as archive:
+                return [
+                    RawFile(
+                        name=os.path.basename(member),
+                        path=path,
+                        compression=compression,
+                        member=member,
+                    )
+                    for member in archive.namelist()
+                    if member.lower().endswith(".csv")
+                ]
+        if compression:
+            name = (
+                path.stem if path.stem.lower().endswith(".csv") else f"{path.stem}.csv"
+            )
+            return [RawFile(name=name, path=path, compression=compression)]
+        return []
+
+    @staticmethod
+    def list_raw_files(directory: os.PathLike) -> List[RawFile]:
+        """
+        Lists every plain and compressed CSV input in a directory.
+
+        Args:
+            directory (os.PathLike): The landing zone directory.
+
+        Returns:
+            List[RawFile]: The CSV inputs found in the directory.
+        """
+        raw_files = []
+        for filename in os.listdir(directory):
+            if ETLUtils.is_raw_file(filename):
+                raw_files.extend(
+                    ETLUtils.expand_raw_file(os.path.join(directory, filename))
+                )
+        return raw_files
+
+    @staticmethod
+    @contextmanager
+    def open_raw_file(raw_file: RawFile) -> Iterator[BinaryIO]:
+        """
+        Opens a raw input as a binary stream, decompressing on the fly so compressed
+        files never have to be unpacked to disk.
+
+        Args:
+            raw_file (RawFile): The input to open.
+
+        Yields:
+            BinaryIO: A readable binary stream of the CSV content.
+        """
+        if raw_file.compression == "gzip":
+            with gzip.open(raw_file.path, "rb") as stream:
+                yield stream
+        elif raw_file.compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError(
+                    "Reading .zst files requires the 'zstandard' package."
+                ) from e
+            with open(raw_file.path, "rb") as file:
+                reader = zstandard.ZstdDecompressor().stream_reader(file)
+                with io.BufferedReader(reader) as stream:
+                    yield stream
+        elif raw_file.compression == "zip":
+            with zipfile.ZipFile(raw_file.path) as archive:
+                with archive.open(raw_file.member) as stream:
+                    yield stream
+        else:
+            with open(raw_file.path, "rb") as stream:
+                yield stream
+
+    @staticmethod
+    def file_hash(file_path: os.PathLike, block_size: int = 1 << 20) -> str:
+        """
+        Computes the SHA-256 digest of a file, reading it in blocks.
+
+        Args:
+            file_path (os.PathLike): Path to the file.
+            block_size (int): Number of bytes read at a time.
+
+        Returns:
+            str: The hex digest of the file content.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            while block := file.read(block_size):
+                digest.update(block)
+        return digest.hexdigest()
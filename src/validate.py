@@ -0,0 +1,333 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypeVar
+
+import polars as pl
+
+from src.models.models import ColumnRule, ValidationConfig
+from src.utils.utils import ETLUtils
+from src.config.constants import FileDirectoryPath
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+
+class DataValidationError(Exception):
+    """Raised when a file fails validation badly enough to be kept out of Load."""
+
+
+class Validate:
+
+    @staticmethod
+    def build_checks(
+        columns: List[str],
+        config: ValidationConfig,
+        duplicates: Optional[Dict[str, pl.Series]] = None,
+    ) -> List[Tuple[str, pl.Expr]]:
+        """
+        Translates the declarative column rules into vectorized Polars expressions.
+        Each expression evaluates to True for rows that break the rule.
+
+        Args:
+            columns (List[str]): The columns present in the file being validated.
+            config (ValidationConfig): Validation settings.
+            duplicates (Optional[Dict[str, pl.Series]]): Values found more than once
+                in each unique column, from duplicated_values. Given them, every
+                check is elementwise and can run on streamed batches.
+
+        Returns:
+            List[Tuple[str, pl.Expr]]: Pairs of reject reason and rule expression.
+
+        Raises:
+            DataValidationError: If a required column is missing from the file.
+        """
+        missing = [
+            rule.column
+            for rule in config.rules
+            if rule.required and rule.column not in columns
+        ]
+        if missing:
+            raise DataValidationError(f"Missing required columns: {missing}")
+
+        checks = []
+        for rule in config.rules:
+            if rule.column not in columns:
+                continue
+            duplicated = (duplicates or {}).get(rule.column)
+            for reason, expr in Validate._rule_expressions(rule, duplicated):
+                if rule.exempt_financial_types and "FINANCIAL_TYPE" in columns:
+                    expr = expr & ~pl.col("FINANCIAL_TYPE").cast(pl.String).is_in(
+                        rule.exempt_financial_types
+                    )
+                checks.append((f"{rule.column}:{reason}", expr.fill_null(False)))
+
+        if {"PRICE", "QUANTITY", "MARKET_VALUE"}.issubset(columns):
+            gap = (pl.col("PRICE") * pl.col("QUANTITY") - pl.col("MARKET_VALUE")).abs()
+            checks.append(
+                (
+                    "MARKET_VALUE:price_x_quantity",
+                    (
+                        gap
+                        > config.market_value_tolerance * pl.col("MARKET_VALUE").abs()
+                    ).fill_null(False),
+                )
+            )
+        return checks
+
+    @staticmethod
+    def _rule_expressions(
+        rule: ColumnRule, duplicated: Optional[pl.Series] = None
+    ) -> List[Tuple[str, pl.Expr]]:
+        """Returns the reject expressions enabled on a single column rule."""
+        col = pl.col(rule.column)
+        expressions = []
+        if rule.not_null:
+            expressions.append(("not_null", col.is_null()))
+        if rule.min_value is not None:
+            expressions.append(("min_value", col < rule.min_value))
+        if rule.max_value is not None:
+            expressions.append(("max_value", col > rule.max_value))
+        if rule.allowed_values is not None:
+            expressions.append(
+                ("allowed_values", ~col.cast(pl.String).is_in(rule.allowed_values))
+            )
+        if rule.unique and duplicated is not None:
+            # A literal list keeps the check elementwise for the streaming engine
+            expressions.append(("unique", col.is_in(duplicated.to_list())))
+        elif rule.unique:
+            expressions.append(("unique", col.is_duplicated() & col.is_not_null()))
+        return expressions
+
+    @staticmethod
+    def duplicated_values(
+        lf: pl.LazyFrame, config: ValidationConfig
+    ) -> Dict[str, pl.Series]:
+        """
+        Finds the values occurring more than once in every column with a unique
+        rule, with a streaming group-by that only keeps one count per value.
+
+        Args:
+            lf (pl.LazyFrame): The transformed fund data.
+            config (ValidationConfig): Validation settings.
+
+        Returns:
+            Dict[str, pl.Series]: Column mapped to its duplicated non-null values.
+        """
+        columns = lf.collect_schema().names()
+        return {
+            rule.column: lf.group_by(rule.column)
+            .len()
+            .filter((pl.col("len") > 1) & pl.col(rule.column).is_not_null())
+            .collect(engine="streaming")
+            .get_column(rule.column)
+            for rule in config.rules
+            if rule.unique and rule.column in columns
+        }
+
+    @staticmethod
+    def flag_rows(frame: FrameT, checks: List[Tuple[str, pl.Expr]]) -> FrameT:
+        """
+        Adds a REJECT_REASON column listing every rule a row breaks, or an empty
+        string for valid rows. Works on both eager and lazy frames.
+
+        Args:
+            frame (FrameT): The transformed fund data as a DataFrame or LazyFrame.
+            checks (List[Tuple[str, pl.Expr]]): Output of build_checks.
+
+        Returns:
+            FrameT: The frame with the REJECT_REASON column added.
+        """
+        if not checks:
+            return frame.with_columns(pl.lit("").alias("REJECT_REASON"))
+        return frame.with_columns(
+            pl.concat_str(
+                [pl.when(expr).then(pl.lit(reason)) for reason, expr in checks],
+                separator=";",
+                ignore_nulls=True,
+            ).alias("REJECT_REASON")
+        )
+
+    @staticmethod
+    def check_reject_ratio(rejected: int, total: int, config: ValidationConfig) -> None:
+        """
+        Raises DataValidationError if the share of rejected rows is too high.
+
+        Args:
+            rejected (int): Number of rejected rows.
+            total (int): Number of rows in the file.
+            config (ValidationConfig): Validation settings.
+        """
+        if total and rejected / total > config.max_reject_ratio:
+            raise DataValidationError(
+                f"{rejected} of {total} rows rejected, "
+                f"above max_reject_ratio {config.max_reject_ratio}"
+            )
+
+    @staticmethod
+    def validate_dataframe(
+        df: pl.DataFrame, config: ValidationConfig
+    ) -> Tuple[pl.DataFrame, pl.DataFrame]:
+        """
+        Splits a transformed DataFrame into valid rows and rejected rows. All rules are
+        evaluated in a single pass and rejected rows carry a REJECT_REASON column.
+
+        Args:
+            df (pl.DataFrame): The transformed fund data.
+            config (ValidationConfig): Validation settings.
+
+        Returns:
+            Tuple[pl.DataFrame, pl.DataFrame]: The valid rows and the rejected rows.
+
+        Raises:
+            DataValidationError: If a required column is missing or the share of
+                rejected rows exceeds max_reject_ratio.
+        """
+        checks = Validate.build_checks(df.columns, config)
+        flagged = Validate.flag_rows(df, checks)
+        is_rejected = pl.col("REJECT_REASON") != ""
+        rejects = flagged.filter(is_rejected)
+        valid = flagged.filter(~is_rejected).drop("REJECT_REASON")
+
+        Validate.check_reject_ratio(rejects.height, df.height, config)
+        return valid, rejects
+
+    @staticmethod
+    def validate_file(filename: str, config: ValidationConfig) -> bool:
+        """
+        Validates a transformed CSV file in place. Valid rows are written back to the
+        input directory and rejected rows go to the quarantine directory. A file that
+        fails outright is moved to the quarantine directory so Load never sees it.
+        Files larger than the memory budget are validated in streamed row batches.
+
+        Args:
+            filename (str): The name of the transformed CSV file.
+            config (ValidationConfig): Validation settings.
+
+        Returns:
+            bool: True if the file can be loaded, False if it was quarantined.
+        """
+        file_path = Path(config.input_directory) / filename
+        quarantine_path = Path(config.quarantine_directory) / filename
+
+        chunk_rows = ETLUtils.rows_per_chunk(file_path, config.memory_budget_mb)
+        if chunk_rows:
+            return Validate.validate_file_in_batches(
+                file_path, quarantine_path, config, chunk_rows
+            )
+
+        try:
+            df = ETLUtils.encode_columns(pl.read_csv(file_path))
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            return False
+
+        try:
+            valid, rejects = Validate.validate_dataframe(df, config)
+        except DataValidationError as e:
+            df.with_columns(pl.lit(f"file:{e}").alias("REJECT_REASON")).write_csv(
+                quarantine_path
+            )
+            file_path.unlink()
+            print(f"Quarantined {filename}: {e}")
+            return False
+
+        if rejects.height:
+            valid.write_csv(file_path)
+            rejects.write_csv(quarantine_path)
+            print(f"Quarantined {rejects.height} rows from {filename}")
+        return True
+
+    @staticmethod
+    def validate_file_in_batches(
+        file_path: Path,
+        quarantine_path: Path,
+        config: ValidationConfig,
+        chunk_rows: int,
+    ) -> bool:
+        """
+        Streaming counterpart of validate_file for files above the memory budget. The
+        file is scanned once per unique rule to find duplicated values, once to count
+        rejects and once more to split it.
+
+        Args:
+            file_path (Path): Path to the transformed CSV file.
+            quarantine_path (Path): Path to write rejected rows to.
+            config (ValidationConfig): Validation settings.
+            chunk_rows (int): Number of rows per streamed batch.
+
+        Returns:
+            bool: True if the file can be loaded, False if it was quarantined.
+        """
+        lf = ETLUtils.encode_columns(pl.scan_csv(file_path))
+        is_rejected = pl.col("REJECT_REASON") != ""
+
+        with pl.Config(streaming_chunk_size=chunk_rows):
+            try:
+                checks = Validate.build_checks(
+                    lf.collect_schema().names(),
+                    config,
+                    Validate.duplicated_values(lf, config),
+                )
+                flagged = Validate.flag_rows(lf, checks)
+                total, rejected = (
+                    flagged.select(pl.len(), is_rejected.sum())
+                    .collect(engine="streaming")
+                    .row(0)
+                )
+                Validate.check_reject_ratio(rejected, total, config)
+            except DataValidationError as e:
+                lf.with_columns(pl.lit(f"file:{e}").alias("REJECT_REASON")).sink_csv(
+                    quarantine_path, batch_size=chunk_rows, engine="streaming"
+                )
+                file_path.unlink()
+                print(f"Quarantined {file_path.name}: {e}")
+                return False
+
+            if rejected:
+                valid_path = file_path.with_name(f"{file_path.name}.valid.tmp")
+                flagged.filter(~is_rejected).drop("REJECT_REASON").sink_csv(
+                    valid_path, batch_size=chunk_rows, engine="streaming"
+                )
+                flagged.filter(is_rejected).sink_csv(
+                    quarantine_path, batch_size=chunk_rows, engine="streaming"
+                )
+                os.replace(valid_path, file_path)
+                print(f"Quarantined {rejected} rows from {file_path.name}")
+        return True
+
+    @staticmethod
+    def process_files(config: ValidationConfig) -> None:
+        """
+        Validates all CSV files in the input directory.
+
+        Args:
+            config (ValidationConfig): Validation settings.
+        """
+        for filename in os.listdir(config.input_directory):
+            if filename.lower().endswith(".csv"):
+                Validate.validate_file(filename, config)
+
+    @staticmethod
+    def validate_step() -> bool:
+        """
+        Main function to execute the validation stage.
+
+        Returns:
+            bool: True if the stage finished, False if it failed.
+        """
+        try:
+            quarantine_dir = Path(FileDirectoryPath.EXTERNAL_FUNDS_CSV_QUARANTINE.value)
+            quarantine_dir.mkdir(exist_ok=True)
+            for stale_file in quarantine_dir.glob("*.csv"):
+                stale_file.unlink()
+
+            config = ValidationConfig(
+                input_directory=Path(
+                    FileDirectoryPath.EXTERNAL_FUNDS_CSV_TRANSFORMED.value
+                ),
+                quarantine_directory=quarantine_dir,
+            )
+            Validate.process_files(config)
+            return True
+        except Exception as e:
+            print(f"Error encountered in validate_step : {e}")
+            return False
@@ -0,0 +1,299 @@
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import duckdb
+import polars as pl
+
+from src.fx import FX
+from src.landing import FileSignature, Landing
+from src.load import Load
+from src.models.models import RawFile, RuntimeConfig, ValidationConfig, WatchConfig
+from src.runtime import Runtime
+from src.transform import Transform
+from src.utils.utils import ETLUtils
+from src.validate import Validate
+from src.config.constants import FileDirectoryPath, LandingStatus
+
+
+class Watch:
+
+    @staticmethod
+    def ready_files(
+        snapshot: Dict[str, FileSignature],
+        pending: Dict[str, Tuple[FileSignature, float]],
+        processed: Dict[str, FileSignature],
+        now: float,
+        debounce_seconds: float,
+        in_flight: Optional[Set[str]] = None,
+    ) -> List[str]:
+        """
+        Determines which new or modified files have stopped changing for at least
+        debounce_seconds. Updates pending in place; files are only added to
+        processed by the caller, once their ingestion succeeded.
+
+        Args:
+            snapshot (Dict[str, FileSignature]): The latest directory snapshot.
+            pending (Dict[str, Tuple[FileSignature, float]]): Files seen changing,
+                with the signature and the time it was first observed.
+            processed (Dict[str, FileSignature]): Signatures already ingested.
+            now (float): The current monotonic time.
+            debounce_seconds (float): Quiet period required before ingestion.
+            in_flight (Optional[Set[str]]): Files being ingested, left for later.
+
+        Returns:
+            List[str]: Filenames ready to be ingested.
+        """
+        ready = []
+        for filename, signature in snapshot.items():
+            if processed.get(filename) == signature:
+                pending.pop(filename, None)
+                continue
+            if in_flight and filename in in_flight:
+                continue
+
+            seen = pending.get(filename)
+            if seen is None or seen[0] != signature:
+                pending[filename] = (signature, now)
+            if now - pending[filename][1] >= debounce_seconds:
+                ready.append(filename)
+                del pending[filename]
+
+        for filename in set(pending) - set(snapshot):
+            del pending[filename]
+        return ready
+
+    @staticmethod
+    def loaded_files(config: WatchConfig) -> Dict[str, FileSignature]:
+        """
+        Reads the landing files already ingested from the landing indexes: files
+        the watcher recorded as loaded, and files the batch pipeline transformed
+        whose every output is loaded. Files modified since are left out.
+
+        Args:
+            config (WatchConfig): Watcher settings.
+
+        Returns:
+            Dict[str, FileSignature]: Filename mapped to its ingested (mtime_ns, size).
+        """
+        index = Landing.refresh(config.input_directory, config.date_patterns)
+        outputs = Landing.refresh(config.output_directory, config.date_patterns)
+        loaded_outputs = outputs.filter(
+            pl.col("STATUS") == LandingStatus.LOADED.value
+        ).select("NAME")
+        is_loaded = (pl.col("STATUS") == LandingStatus.LOADED.value) | (
+            (pl.col("STATUS") == LandingStatus.TRANSFORMED.value)
+            & pl.col("NAME").is_in(loaded_outputs["NAME"].implode())
+        )
+        loaded = (
+            index.group_by("FILENAME")
+            .agg(pl.col("MTIME_NS", "SIZE").first(), is_loaded.all().alias("LOADED"))
+            .filter(pl.col("LOADED"))
+        )
+        return {
+            filename: (mtime_ns, size)
+            for filename, mtime_ns, size in loaded.select(
+                "FILENAME", "MTIME_NS", "SIZE"
+            ).iter_rows()
+        }
+
+    @staticmethod
+    def record_loaded(
+        config: WatchConfig, filename: str, signature: FileSignature
+    ) -> None:
+        """
+        Records an ingested landing file as loaded in the input directory's index,
+        re-indexing only that file.
+
+        Args:
+            config (WatchConfig): Watcher settings.
+            filename (str): The ingested plain or compressed raw file.
+            signature (FileSignature): Its (mtime_ns, size) when it was ingested.
+        """
+        rows = Landing.index_files(
+            config.input_directory, {filename: signature}, config.date_patterns
+        ).with_columns(pl.lit(LandingStatus.LOADED.value).alias("STATUS"))
+        index = Landing.read_index(config.input_directory)
+        Landing.write_index(
+            config.input_directory,
+            pl.concat([index.filter(pl.col("FILENAME") != filename), rows]),
+        )
+
+    @staticmethod
+    def ingest_file(
+        filename: str,
+        config: WatchConfig,
+        conn: duckdb.DuckDBPyConnection,
+        conn_lock: threading.Lock,
+    ) -> bool:
+        """
+        Runs every CSV input held in a landing zone file through Transform,
+        Validate and Load.
+
+        Args:
+            filename (str): The name of the plain or compressed raw file.
+            config (WatchConfig): Watcher settings.
+            conn (duckdb.DuckDBPyConnection): The shared DuckDB connection object.
+            conn_lock (threading.Lock): Serializes writes on the shared connection.
+
+        Returns:
+            bool: True if every CSV input was ingested.
+        """
+        results = [
+            Watch.ingest_raw_file(raw_file, config, conn, conn_lock)
+            for raw_file in ETLUtils.expand_raw_file(
+                os.path.join(config.input_directory, filename)
+            )
+        ]
+        return all(results)
+
+    @staticmethod
+    def ingest_raw_file(
+        raw_file: RawFile,
+        config: WatchConfig,
+        conn: duckdb.DuckDBPyConnection,
+        conn_lock: threading.Lock,
+    ) -> bool:
+        """
+        Runs a single CSV input, plain or compressed, through Transform, FX,
+        Validate and Load.
+
+        Args:
+            raw_file (RawFile): The CSV input.
+            config (WatchConfig): Watcher settings.
+            conn (duckdb.DuckDBPyConnection): The shared DuckDB connection object.
+            conn_lock (threading.Lock): Serializes writes on the shared connection.
+
+        Returns:
+            bool: True if the input was loaded or quarantined, or can never be
+                ingested because its name holds no fund or date; False if it could
+                not be transformed, normalized or loaded and should be retried.
+        """
+        filename = raw_file.name
+        date = ETLUtils.extract_date(filename, config.date_patterns, config.date_format)
+        table_name = ETLUtils.extract_table_name(filename)
+        if not date or not table_name:
+            print(f"No valid date or table name found in filename: {filename}")
+            return True
+
+        if not Transform.clean_raw_file(
+            raw_file, config.output_directory, date, config.memory_budget_mb
+        ):
+            return False
+        fx_config = FX.default_config(config.output_directory).model_copy(
+            update={"memory_budget_mb": config.memory_budget_mb}
+        )
+        if (
+            FX.normalize_file(
+                filename, fx_config, FX.read_rates(fx_config.fx_rates_file)
+            )
+            is None
+        ):
+            return False
+
+        validation_config = ValidationConfig(
+            input_directory=config.output_directory,
+            quarantine_directory=config.quarantine_directory,
+            memory_budget_mb=config.memory_budget_mb,
+        )
+        # Rows rejected from an earlier delivery of the file no longer apply
+        (Path(config.quarantine_directory) / filename).unlink(missing_ok=True)
+        is_valid = Validate.validate_file(filename, validation_config)
+
+        csv_file = Path(config.output_directory) / filename
+        with conn_lock:
+            loaded = not is_valid or (
+                Load.load_versioned(conn, table_name, csv_file)
+                or Load.is_current(conn, table_name, csv_file)
+            )
+            Load.load_quarantine(conn, config.quarantine_directory)
+        return loaded
+
+    @staticmethod
+    async def watch(
+        config: WatchConfig,
+        conn: duckdb.DuckDBPyConnection,
+        stop_event: Optional[asyncio.Event] = None,
+    ) -> None:
+        """
+        Polls the input directory and ingests new or modified files as soon as they
+        stop changing, with at most max_concurrency files in flight.
+
+        Args:
+            config (WatchConfig): Watcher settings.
+            conn (duckdb.DuckDBPyConnection): The shared DuckDB connection object.
+            stop_event (Optional[asyncio.Event]): Stops the watcher once set.
+        """
+        stop_event = stop_event or asyncio.Event()
+        semaphore = asyncio.Semaphore(config.max_concurrency)
+        conn_lock = threading.Lock()
+        pending: Dict[str, Tuple[FileSignature, float]] = {}
+        processed = Watch.loaded_files(config)
+        in_flight: Set[str] = set()
+        tasks = set()
+
+        async def ingest(filename: str, signature: FileSignature) -> None:
+            try:
+                async with semaphore:
+                    ingested = await asyncio.to_thread(
+                        Watch.ingest_file, filename, config, conn, conn_lock
+                    )
+                # Failed files stay unprocessed and are retried on a later poll.
+                # The index is only written from the event loop, never concurrently.
+                if ingested:
+                    processed[filename] = signature
+                    Watch.record_loaded(config, filename, signature)
+            except Exception as e:
+                print(f"Error ingesting {filename}: {e}")
+            finally:
+                in_flight.discard(filename)
+
+        print(
+            f"Watching '{config.input_directory}' for new fund files, "
+            f"{len(processed)} already ingested..."
+        )
+        while not stop_event.is_set():
+            snapshot = Landing.scan(config.input_directory)
+            for filename in Watch.ready_files(
+                snapshot,
+                pending,
+                processed,
+                time.monotonic(),
+                config.debounce_seconds,
+                in_flight,
+            ):
+                in_flight.add(filename)
+                task = asyncio.create_task(ingest(filename, snapshot[filename]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            try:
+                await asyncio.wait_for(stop_event.wait(), config.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    @staticmethod
+    def watch_step() -> None:
+        """
+        Main function to run the watcher until interrupted.
+        """
+        quarantine_dir = Path(FileDirectoryPath.EXTERNAL_FUNDS_CSV_QUARANTINE.value)
+        quarantine_dir.mkdir(exist_ok=True)
+        config = WatchConfig(
+            input_directory=Path(FileDirectoryPath.EXTERNAL_FUNDS_CSV.value),
+            output_directory=Path(
+                FileDirectoryPath.EXTERNAL_FUNDS_CSV_TRANSFORMED.value
+            ),
+            quarantine_directory=quarantine_dir,
+        )
+        with Runtime(RuntimeConfig(memory_limit_mb=config.memory_budget_mb)) as runtime:
+            try:
+                asyncio.run(Watch.watch(config, runtime.conn))
+            except KeyboardInterrupt:
+                print("Watcher stopped.")
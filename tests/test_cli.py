@@ -0,0 +1,138 @@
+import subprocess
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.cli import CLI, main
+
+
+@pytest.fixture
+def state_file():
+    """
+    Pytest fixture to provide a path for the pipeline state file.
+    """
+    with tempfile.TemporaryDirectory() as state_dir:
+        yield Path(state_dir) / "etl_state.json"
+
+
+def test_cli_does_not_import_heavy_dependencies():
+    """
+    Test that parsing arguments does not import duckdb, polars, pandas or pydantic.
+    """
+    code = (
+        "import sys\n"
+        "from src.cli import CLI\n"
+        "CLI.build_parser().parse_args(['etl', '--stages', 'load'])\n"
+        "print(','.join(m for m in ('duckdb', 'polars', 'pandas', 'pydantic') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_etl_runs_selected_stages_in_order(state_file):
+    """
+    Test that only the selected stages run, in pipeline order.
+    """
+    with patch.object(CLI, "run_stage") as mock_run_stage:
+        main(["etl", "--stages", "load,transform", "--state-file", str(state_file)])
+
+    assert [call.args[0] for call in mock_run_stage.call_args_list] == [
+        "transform",
+        "load",
+    ]
+    assert not state_file.exists()
+
+
+def test_etl_resumes_after_failure(state_file):
+    """
+    Test that a resumed run skips the stages completed before the failure.
+    """
+    with patch.object(
+        CLI, "run_stage", side_effect=[True, True, RuntimeError("boom")]
+    ), pytest.raises(RuntimeError):
+        CLI.run_pipeline(["setup", "transform", "validate", "load"], state_file)
+
+    with patch.object(CLI, "run_stage") as mock_run_stage:
+        ran = CLI.run_pipeline(
+            ["setup", "transform", "validate", "load"], state_file, resume=True
+        )
+
+    assert ran == ["validate", "load"]
+    assert mock_run_stage.call_count == 2
+    assert not state_file.exists()
+
+
+def test_failed_stage_is_not_recorded(state_file):
+    """
+    Test that a stage whose step reports a failure stops the run and is not
+    skipped by --resume.
+    """
+    with patch("src.setup.Setup.setup_step"), patch(
+        "src.transform.Transform.transform_step", return_value=False
+    ), patch("src.fx.FX.fx_step") as mock_fx:
+        assert (
+            main(
+                [
+                    "etl",
+                    "--stages",
+                    "setup,transform,fx",
+                    "--state-file",
+                    str(state_file),
+                ]
+            )
+            == 1
+        )
+    mock_fx.assert_not_called()
+    assert CLI.read_completed_stages(state_file) == ["setup"]
+
+    with patch.object(CLI, "run_stage", return_value=True) as mock_run_stage:
+        ran = CLI.run_pipeline(["setup", "transform", "fx"], state_file, resume=True)
+    assert ran == ["transform", "fx"]
+
+
+def test_unknown_stage_is_rejected(state_file):
+    """
+    Test that an unknown stage name fails without running anything.
+    """
+    with patch.object(CLI, "run_stage") as mock_run_stage:
+        assert (
+            main(["etl", "--stages", "extract", "--state-file", str(state_file)]) == 2
+        )
+    mock_run_stage.assert_not_called()
+
+
+def test_reconcile_runs_recon_query():
+    """
+    Test that the reconcile subcommand runs the reconciliation query by default.
+    """
+    with patch("src.report.Report.run_query_to_csv") as mock_run_query:
+        main(["reconcile"])
+
+    sql_file = mock_run_query.call_args.args[0]
+    assert sql_file.name == "recon_query.sql"
+    assert mock_run_query.call_args.kwargs["shard_directory"] is None
+
+    with patch("src.report.Report.run_query_to_csv") as mock_run_query:
+        main(["report", "--shards"])
+    assert mock_run_query.call_args.kwargs["shard_directory"] == Path("shards")
+
+
+def test_stage_selection_is_passed_to_the_step():
+    """
+    Test that --fund, --from and --to reach the transform and load steps.
+    """
+    with patch("src.transform.Transform.transform_step") as mock_transform:
+        main(["transform", "--fund", "leeder", "--from", "2023-01", "--to", "2023-06"])
+    mock_transform.assert_called_once_with(
+        funds=["leeder"], start_month=date(2023, 1, 1), end_month=date(2023, 6, 1)
+    )
+
+    with patch("src.load.Load.load_step") as mock_load:
+        main(["load"])
+    mock_load.assert_called_once_with(funds=None, start_month=None, end_month=None)
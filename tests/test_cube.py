@@ -0,0 +1,130 @@
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.cli import main
+from src.cube import Cube
+from src.fx import FX
+from src.load import Load
+from src.models.models import FxConfig
+
+
+@pytest.fixture(scope="module")
+def cube_db():
+    """
+    Pytest fixture to build a database with two funds over two months and its cube.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = Path(temp_dir) / "financial_data.duckdb"
+        conn = duckdb.connect(database=str(db_file))
+        fx_config = FxConfig(input_directory=Path(temp_dir))
+        rates = FX.read_rates(fx_config.fx_rates_file)
+        for i, fund in enumerate(["applebead", "leeder"]):
+            for month, data_date in enumerate(["2023-01-31", "2023-02-28"]):
+                csv_file = Path(temp_dir) / f"{fund}.{data_date}.csv"
+                csv_file.write_text(
+                    "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE,QUANTITY,REALISED_PL,MARKET_VALUE\n"
+                    f"{data_date},Equities,AAPL,150,{10 + i},{i + month},{150 * (10 + i)}\n"
+                    f"{data_date},Equities,MSFT,300,{5 + month},1,{300 * (5 + month)}\n"
+                    f"{data_date},Government Bond,US912810FQ68,100,{20 + i},2,{100 * (20 + i)}\n"
+                    f"{data_date},CASH,USDCURR,,,,{1000 * (i + 1)}\n"
+                )
+                FX.normalize_file(csv_file.name, fx_config, rates)
+                Load.load_versioned(conn, fund, csv_file)
+        Cube.build(conn)
+        yield db_file, conn
+        conn.close()
+
+
+def test_build_rollups_match_row_level_aggregates(cube_db):
+    """
+    Test that every rollup re-aggregates to the totals of the row-level holdings.
+    """
+    _, conn = cube_db
+    expected = conn.execute(
+        """
+        SELECT SUM(MARKET_VALUE), SUM(REALISED_PL), COUNT(*)
+        FROM (SELECT * FROM applebead UNION ALL SELECT * FROM leeder)
+    """
+    ).fetchone()
+
+    rollups = conn.execute("SELECT TABLE_NAME FROM cube_rollups").fetchall()
+    assert len(rollups) == 5
+    for (table,) in rollups:
+        totals = conn.execute(
+            f"SELECT SUM(MARKET_VALUE), SUM(REALISED_PL), SUM(HOLDINGS) FROM {table}"
+        ).fetchone()
+        assert totals == expected
+
+
+@pytest.mark.parametrize(
+    "dimensions, filters, expected_table",
+    [
+        (["FINANCIAL_TYPE"], {}, "cube_month_financial_type"),
+        (["FUND"], {}, "cube_fund_month"),
+        (["FUND"], {"FINANCIAL_TYPE": "Equities"}, "cube_fund_month_financial_type"),
+        (["INSTRUMENT"], {}, "cube_month_financial_type_instrument"),
+        (["FUND", "INSTRUMENT"], {}, "cube_fund_month_financial_type_instrument"),
+    ],
+)
+def test_choose_rollup_picks_coarsest_match(
+    cube_db, dimensions, filters, expected_table
+):
+    """
+    Test that the smallest rollup holding the requested dimensions is chosen.
+    """
+    _, conn = cube_db
+    assert Cube.choose_rollup(conn, [*dimensions, *filters]) == expected_table
+
+
+def test_query(cube_db):
+    """
+    Test slicing market value by fund for one financial type and month.
+    """
+    _, conn = cube_db
+    result = Cube.query(
+        conn,
+        ["FUND"],
+        ["MARKET_VALUE", "HOLDINGS"],
+        {"FINANCIAL_TYPE": "Equities", "MONTH": date(2023, 2, 1)},
+    )
+    assert result["FUND"].tolist() == ["applebead", "leeder"]
+    assert result["MARKET_VALUE"].tolist() == [150 * 10 + 300 * 6, 150 * 11 + 300 * 6]
+    assert result["HOLDINGS"].tolist() == [2, 2]
+
+    with pytest.raises(ValueError, match="SECTOR"):
+        Cube.query(conn, ["SECTOR"])
+
+
+def test_slice_cli(cube_db, capsys):
+    """
+    Test that the slice subcommand answers from the cube of a database file.
+    """
+    db_file, conn = cube_db
+    with tempfile.TemporaryDirectory() as temp_dir:
+        copy_file = Path(temp_dir) / "copy.duckdb"
+        conn.execute(f"ATTACH '{copy_file}' AS copy")
+        conn.execute("COPY FROM DATABASE financial_data TO copy")
+        conn.execute("DETACH copy")
+
+        assert (
+            main(
+                [
+                    "slice",
+                    "--db-file",
+                    str(copy_file),
+                    "--by",
+                    "FINANCIAL_TYPE",
+                    "--measures",
+                    "REALISED_PL",
+                    "--filter",
+                    "MONTH=2023-01-01",
+                ]
+            )
+            == 0
+        )
+        assert "Government Bond" in capsys.readouterr().out
+        assert main(["slice", "--db-file", str(copy_file), "--filter", "FUND"]) == 2
@@ -0,0 +1,182 @@
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import duckdb
+import polars as pl
+import pytest
+
+from src.fx import FX
+from src.load import Load
+from src.models.models import FxConfig, ValidationConfig
+from src.validate import Validate
+
+
+@pytest.fixture
+def temp_directories():
+    """
+    Pytest fixture to create temporary transformed and quarantine directories.
+    """
+    with tempfile.TemporaryDirectory() as input_dir, tempfile.TemporaryDirectory() as quarantine_dir:
+        yield Path(input_dir), Path(quarantine_dir)
+
+
+@pytest.fixture
+def rates_file(temp_directories):
+    """
+    Pytest fixture to write daily rates, with GBP quoted only early in the month.
+    """
+    input_dir, _ = temp_directories
+    rates_file = input_dir.parent / f"{input_dir.name}_fx_rates.csv"
+    rates_file.write_text(
+        "DATE,CURRENCY,RATE\n"
+        "2023-01-27,EUR,1.08\n"
+        "2023-01-30,eur,1.09\n"
+        "2023-02-01,EUR,1.10\n"
+        "2023-01-10,GBP,1.22\n"
+    )
+    yield rates_file
+    rates_file.unlink()
+
+
+def test_normalize_frame_takes_latest_fresh_rate(temp_directories, rates_file):
+    """
+    Test that each holding takes its currency's latest rate on or before its date,
+    within the staleness limit, and that base currency holdings keep their amounts.
+    """
+    input_dir, _ = temp_directories
+    config = FxConfig(input_directory=input_dir, fx_rates_file=rates_file)
+    frame = pl.DataFrame(
+        {
+            "DATA_DATE": [date(2023, 1, 31)] * 4,
+            "SYMBOL": ["SAP", "BP", "AAPL", "SIE"],
+            "PRICE": [100.0, 5.0, 150.0, 120.0],
+            "MARKET_VALUE": [1000.0, 50.0, 1500.0, 1200.0],
+            "CURRENCY": [None, "GBP", "usd", "EUR"],
+        }
+    )
+
+    normalized = FX.normalize_frame(frame, FX.read_rates(rates_file), "EUR", config)
+
+    assert normalized.columns == [
+        "DATA_DATE",
+        "SYMBOL",
+        "PRICE",
+        "MARKET_VALUE",
+        "CURRENCY",
+        "FX_RATE",
+        "PRICE_BASE",
+        "MARKET_VALUE_BASE",
+    ]
+    assert normalized["SYMBOL"].to_list() == ["SAP", "BP", "AAPL", "SIE"]
+    assert normalized["CURRENCY"].to_list() == ["EUR", "GBP", "USD", "EUR"]
+    assert normalized["FX_RATE"].to_list() == [1.09, None, 1.0, 1.09]
+    assert normalized["MARKET_VALUE_BASE"].round(6).to_list() == [
+        1090.0,
+        None,
+        1500.0,
+        1308.0,
+    ]
+
+    unlimited = config.model_copy(update={"max_rate_age_days": None})
+    assert FX.normalize_frame(
+        frame.lazy(), FX.read_rates(rates_file), "EUR", unlimited
+    ).collect()["FX_RATE"].to_list() == [1.09, 1.22, 1.0, 1.09]
+
+
+def test_normalize_file_is_idempotent_and_quarantines_missing_rates(
+    temp_directories, rates_file
+):
+    """
+    Test that normalizing a file twice gives the same file, and that holdings left
+    without a rate are quarantined by the validation stage.
+    """
+    input_dir, quarantine_dir = temp_directories
+    csv_file = input_dir / "Leeder.02_28_2023.csv"
+    csv_file.write_text(
+        "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE,QUANTITY,REALISED_PL,MARKET_VALUE,SOURCE,CURRENCY\n"
+        "2023-02-28,Equities,SAP,100,10,5,1000,leeder,\n"
+        "2023-02-28,Equities,BP,5,10,1,50,leeder,GBP\n"
+    )
+    config = FxConfig(
+        input_directory=input_dir,
+        fx_rates_file=rates_file,
+        fund_currencies={"leeder": "EUR"},
+        max_rate_age_days=30,
+    )
+    rates = FX.read_rates(rates_file)
+
+    assert FX.normalize_file(csv_file.name, config, rates) == 1
+    first = csv_file.read_text()
+    assert FX.normalize_file(csv_file.name, config, rates) == 1
+    assert csv_file.read_text() == first
+
+    normalized = pl.read_csv(csv_file)
+    assert normalized["REALISED_PL_BASE"].round(6).to_list() == [5.5, None]
+
+    assert Validate.validate_file(
+        csv_file.name,
+        ValidationConfig(
+            input_directory=input_dir,
+            quarantine_directory=quarantine_dir,
+            max_reject_ratio=1.0,
+        ),
+    )
+    assert pl.read_csv(csv_file)["SYMBOL"].to_list() == ["SAP"]
+
+
+def test_normalize_file_in_batches_matches_in_memory(temp_directories, rates_file):
+    """
+    Test that a file over the memory budget is streamed to the same result, with
+    its missing rates counted from the written file.
+    """
+    input_dir, _ = temp_directories
+    rows = "".join(
+        f"2023-01-31,Equities,SYM{i},{i},10,1,{10 * i},leeder,{'GBP' if i % 4 else ''}\n"
+        for i in range(20000)
+    )
+    header = "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE,QUANTITY,REALISED_PL,MARKET_VALUE,SOURCE,CURRENCY\n"
+    for name in ["leeder.01_31_2023.csv", "leeder.01_31_2023 batched.csv"]:
+        (input_dir / name).write_text(header + rows)
+    config = FxConfig(
+        input_directory=input_dir,
+        fx_rates_file=rates_file,
+        fund_currencies={"leeder": "EUR"},
+    )
+    rates = FX.read_rates(rates_file)
+
+    assert FX.normalize_file("leeder.01_31_2023.csv", config, rates) == 15000
+    assert (
+        FX.normalize_file(
+            "leeder.01_31_2023 batched.csv",
+            config.model_copy(update={"memory_budget_mb": 1}),
+            rates,
+        )
+        == 15000
+    )
+    assert (input_dir / "leeder.01_31_2023 batched.csv").read_text() == (
+        input_dir / "leeder.01_31_2023.csv"
+    ).read_text()
+    assert not list(input_dir.glob("*.tmp"))
+
+
+def test_history_gains_columns_of_later_deliveries(temp_directories):
+    """
+    Test that a delivery with the FX columns extends a history created without them.
+    """
+    input_dir, _ = temp_directories
+    conn = duckdb.connect()
+    header = "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE,QUANTITY,REALISED_PL,MARKET_VALUE\n"
+    for data_date in ["2023-01-31", "2023-02-28"]:
+        (input_dir / f"applebead.{data_date}.csv").write_text(
+            header + f"{data_date},Equities,AAPL,150,10,5,1500\n"
+        )
+
+    Load.load_versioned(conn, "applebead", input_dir / "applebead.2023-01-31.csv")
+    FX.process_files(FxConfig(input_directory=input_dir))
+    Load.load_versioned(conn, "applebead", input_dir / "applebead.2023-02-28.csv")
+
+    assert conn.execute(
+        "SELECT DATA_DATE, MARKET_VALUE_BASE FROM applebead ORDER BY DATA_DATE"
+    ).fetchall() == [(date(2023, 1, 31), None), (date(2023, 2, 28), 1500.0)]
+    conn.close()
@@ -0,0 +1,165 @@
+import gzip
+import os
+import tempfile
+import zipfile
+from datetime import date
+from pathlib import Path
+
+import duckdb
+import polars as pl
+import pytest
+
+from src.landing import Landing
+from src.load import Load
+from src.models.models import Config
+from src.transform import Transform
+from src.utils.utils import ETLUtils
+from src.config.constants import LandingStatus
+
+DATE_PATTERNS = Config.model_fields["date_patterns"].get_default(
+    call_default_factory=True
+)
+
+
+@pytest.fixture
+def temp_directories():
+    """
+    Pytest fixture to create temporary landing and output directories.
+    """
+    with tempfile.TemporaryDirectory() as input_dir, tempfile.TemporaryDirectory() as output_dir:
+        yield Path(input_dir), Path(output_dir)
+
+
+@pytest.fixture
+def sample_csv_content():
+    """
+    Pytest fixture to provide sample raw fund report content.
+    """
+    return (
+        "FINANCIAL TYPE,SYMBOL,SECURITY NAME,ISIN,PRICE,QUANTITY,REALISED P/L,MARKET VALUE\n"
+        "Equities,AAPL,Apple Inc.,US0378331005,150.00,10,500.00,1500.00\n"
+    )
+
+
+def test_parse_names_matches_per_file_extraction():
+    """
+    Test that vectorized filename parsing agrees with the per-file regex helpers.
+    """
+    names = os.listdir("external_funds") + [
+        "NoDateFile.csv",
+        "InvalidDate.99-99-9999.csv",
+        "Leeder.13_04_2023.csv",
+        "Odd.2023-02-30.20230115.csv",
+    ]
+    fund, data_date = Landing.parse_names(pl.col("NAME"), DATE_PATTERNS)
+    parsed = pl.DataFrame({"NAME": names}).select(
+        "NAME", fund.alias("FUND"), data_date.dt.strftime("%Y-%m-%d").alias("DATE")
+    )
+
+    for name, table_name, date_str in parsed.iter_rows():
+        assert table_name == ETLUtils.extract_table_name(name), name
+        assert date_str == ETLUtils.extract_date(name, DATE_PATTERNS, "%Y-%m-%d"), name
+
+
+def test_refresh_applies_stat_deltas(temp_directories, sample_csv_content):
+    """
+    Test that a refresh keeps unchanged files' status, re-indexes modified files
+    and drops removed ones.
+    """
+    input_dir, _ = temp_directories
+    for filename in ["Applebead.31-01-2023 breakdown.csv", "Leeder.02_28_2023.csv"]:
+        (input_dir / filename).write_text(sample_csv_content)
+    with zipfile.ZipFile(input_dir / "bundle.zip", "w") as archive:
+        archive.writestr("Magnum.31-03-2023.csv", sample_csv_content)
+        archive.writestr("Virtous.04-30-2023 - securities.csv", sample_csv_content)
+
+    index = Landing.refresh(input_dir, DATE_PATTERNS)
+    assert index.height == 4
+    assert set(index["STATUS"]) == {LandingStatus.NEW.value}
+    magnum = index.filter(pl.col("FUND") == "magnum").row(0, named=True)
+    assert magnum["FORMAT"] == "zip"
+    assert magnum["MEMBER"] == "Magnum.31-03-2023.csv"
+    assert magnum["DATA_DATE"] == date(2023, 3, 31)
+
+    Landing.mark(
+        input_dir,
+        ["Applebead.31-01-2023 breakdown.csv", "Leeder.02_28_2023.csv"],
+        LandingStatus.TRANSFORMED,
+    )
+    (input_dir / "Leeder.02_28_2023.csv").write_text(sample_csv_content * 2)
+    (input_dir / "bundle.zip").unlink()
+
+    statuses = dict(
+        Landing.refresh(input_dir, DATE_PATTERNS).select("FUND", "STATUS").iter_rows()
+    )
+    assert statuses == {"applebead": "transformed", "leeder": "new"}
+    assert Landing.read_index(input_dir).height == 2
+
+
+def test_select_by_fund_and_month(temp_directories, sample_csv_content):
+    """
+    Test selecting files of one fund over a month range.
+    """
+    input_dir, _ = temp_directories
+    for filename in [
+        "Applebead.31-12-2022 breakdown.csv",
+        "Applebead.31-01-2023 breakdown.csv",
+        "Applebead.28-02-2023 breakdown.csv",
+        "Applebead.31-03-2023 breakdown.csv",
+        "Belaware.31_01_2023.csv",
+    ]:
+        (input_dir / filename).write_text(sample_csv_content)
+    index = Landing.refresh(input_dir, DATE_PATTERNS)
+
+    selected = Landing.select(index, ["applebead"], date(2023, 1, 15), date(2023, 2, 1))
+    assert selected["DATA_DATE"].to_list() == [date(2023, 1, 31), date(2023, 2, 28)]
+    assert Landing.select(index, statuses=["loaded"]).height == 0
+
+
+def test_stages_select_and_mark_files(temp_directories, sample_csv_content):
+    """
+    Test that Transform and Load only process the selected funds and months and
+    record their progress in each directory's index.
+    """
+    input_dir, output_dir = temp_directories
+    for filename in ["Applebead.31-01-2023 breakdown.csv", "Leeder.02_28_2023.csv"]:
+        (input_dir / filename).write_text(sample_csv_content)
+    with gzip.open(input_dir / "Applebead.28-02-2023 breakdown.csv.gz", "wt") as file:
+        file.write(sample_csv_content)
+
+    Transform.process_files(
+        Config(
+            input_directory=input_dir,
+            output_directory=output_dir,
+            funds=["applebead"],
+        )
+    )
+    assert sorted(path.name for path in output_dir.glob("*.csv")) == [
+        "Applebead.28-02-2023 breakdown.csv",
+        "Applebead.31-01-2023 breakdown.csv",
+    ]
+    assert dict(Landing.read_index(input_dir).select("NAME", "STATUS").iter_rows()) == {
+        "Applebead.31-01-2023 breakdown.csv": "transformed",
+        "Applebead.28-02-2023 breakdown.csv": "transformed",
+        "Leeder.02_28_2023.csv": "new",
+    }
+
+    conn = duckdb.connect()
+    config = {
+        "input_directory": output_dir,
+        "conn": conn,
+        "end_month": date(2023, 1, 1),
+    }
+    Load.process_files(config)
+    assert conn.execute("SELECT DISTINCT DATA_DATE FROM applebead").fetchall() == [
+        (date(2023, 1, 31),)
+    ]
+
+    # A file already stored as the current version still counts as loaded
+    Landing.index_path(output_dir).unlink()
+    Load.process_files(config)
+    loaded = Landing.select(
+        Landing.read_index(output_dir), statuses=[LandingStatus.LOADED.value]
+    )
+    assert loaded["NAME"].to_list() == ["Applebead.31-01-2023 breakdown.csv"]
+    conn.close()
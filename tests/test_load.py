@@ -1,4 +1,5 @@
 import tempfile
+from datetime import datetime
 from pathlib import Path
 
 import duckdb
@@ -28,37 +29,27 @@ def sample_csv_content():
                 """.strip()
 
 
-def test_ingest_csv_to_table(temp_directories, sample_csv_content):
+def test_load_versioned(temp_directories, sample_csv_content):
     """
-    Test the ingest_csv_to_table function to ensure DATA_DATE is present correctly.
+    Test the load_versioned function to ensure DATA_DATE is present correctly.
     """
     input_dir, _ = temp_directories
     table_name = "ingest_test"
-    csv_filename = f"{table_name}.01-01-2023.csv"
-    csv_path = input_dir / csv_filename
+    csv_path = input_dir / f"{table_name}.01-01-2023.csv"
     test_date = "2023-01-01"
 
     # Create a sample input CSV file
     csv_path.write_text(sample_csv_content)
 
-    # Initialize DuckDB connection
-    db_file = Path("test_financial_data.duckdb")
-    conn = duckdb.connect(database=str(db_file), read_only=False)
-
-    # Create or replace table
-    Load.create_or_replace_table(conn, table_name, csv_path)
-
-    # Ingest data
-    Load.ingest_csv_to_table(conn, table_name, csv_path)
+    conn = duckdb.connect(database=":memory:")
+    assert Load.load_versioned(conn, table_name, csv_path)
 
     # Read data from DuckDB and verify
     df = conn.execute(f"SELECT * FROM {table_name}").df()
     assert "DATA_DATE" in df.columns, "DATA_DATE column is missing."
+    assert len(df) == 2
     assert all(df["DATA_DATE"] == test_date), "DATA_DATE values are incorrect."
-
-    # Clean up
     conn.close()
-    db_file.unlink()
 
 
 def test_process_files(temp_directories, sample_csv_content):
@@ -142,3 +133,131 @@ def test_process_files(temp_directories, sample_csv_content):
     # Clean up
     conn.close()
     db_file.unlink()
+
+
+def test_load_quarantine(temp_directories):
+    """
+    Test the load_quarantine function to ensure rejected rows land in one table.
+    """
+    input_dir, _ = temp_directories
+    (input_dir / "applebead.01-01-2023.csv").write_text(
+        "DATA_DATE,SYMBOL,PRICE,QUANTITY,REJECT_REASON\n"
+        "2023-01-01,AAPL,150.00,-10,QUANTITY:min_value\n"
+    )
+    (input_dir / "belaware.01-01-2023.csv").write_text(
+        "DATA_DATE,SYMBOL,PRICE,REJECT_REASON\n" "2023-01-01,GOOGL,,PRICE:not_null\n"
+    )
+
+    conn = duckdb.connect(database=":memory:")
+    Load.load_quarantine(conn, input_dir)
+
+    df = conn.execute("SELECT * FROM quarantine").df()
+    assert len(df) == 2
+    assert set(df["REJECT_REASON"]) == {"QUANTITY:min_value", "PRICE:not_null"}
+
+    # A clean run empties the table instead of keeping the previous rejects
+    for csv_file in input_dir.glob("*.csv"):
+        csv_file.unlink()
+    Load.load_quarantine(conn, input_dir)
+    assert conn.execute("SELECT COUNT(*) FROM quarantine").fetchone()[0] == 0
+    conn.close()
+
+
+def test_load_versioned_keeps_restatements(temp_directories, sample_csv_content):
+    """
+    Test that a restated delivery supersedes the original without losing its history.
+    """
+    input_dir, _ = temp_directories
+    csv_path = input_dir / "magnum.31-03-2023.csv"
+    conn = duckdb.connect(database=":memory:")
+
+    csv_path.write_text(sample_csv_content)
+    assert Load.load_versioned(conn, "magnum", csv_path, datetime(2023, 4, 1))
+
+    csv_path.write_text(sample_csv_content.replace("150.00", "155.00"))
+    assert Load.load_versioned(conn, "magnum", csv_path, datetime(2023, 4, 15))
+    # Re-loading the current version is a no-op
+    assert not Load.load_versioned(conn, "magnum", csv_path, datetime(2023, 5, 1))
+
+    current = conn.execute("SELECT PRICE FROM magnum ORDER BY PRICE").df()
+    assert current["PRICE"].tolist() == [155.0, 2800.0]
+    assert "IS_CURRENT" not in conn.execute("SELECT * FROM magnum").df().columns
+
+    as_known = conn.execute(
+        "SELECT PRICE FROM magnum_as_of(TIMESTAMP '2023-04-10') ORDER BY PRICE"
+    ).df()
+    assert as_known["PRICE"].tolist() == [150.0, 2800.0]
+
+    history = conn.execute(
+        "SELECT COUNT(*), SUM(IS_CURRENT::INT) FROM magnum_history"
+    ).fetchone()
+    assert history == (4, 2)
+    conn.close()
+
+
+def test_load_versioned_migrates_plain_table(temp_directories, sample_csv_content):
+    """
+    Test that a fund table from a previous non-versioned load is migrated into history.
+    """
+    input_dir, _ = temp_directories
+    csv_path = input_dir / "magnum.31-03-2023.csv"
+    csv_path.write_text(sample_csv_content)
+    conn = duckdb.connect(database=":memory:")
+    conn.execute(f"CREATE TABLE magnum AS SELECT * FROM read_csv_auto('{csv_path}')")
+
+    new_path = input_dir / "magnum.30-04-2023.csv"
+    new_path.write_text(sample_csv_content.replace("2023-01-01", "2023-02-01"))
+    assert Load.load_versioned(conn, "magnum", new_path)
+
+    assert conn.execute("SELECT COUNT(*) FROM magnum").fetchone()[0] == 4
+    assert conn.execute("SELECT COUNT(*) FROM magnum_history").fetchone()[0] == 4
+    conn.close()
+
+
+def test_load_versioned_encodes_columns(temp_directories):
+    """
+    Test that FINANCIAL_TYPE is stored as an ENUM and DATA_DATE as a DATE, including
+    in history tables created before the encoding.
+    """
+    input_dir, _ = temp_directories
+    conn = duckdb.connect(database=":memory:")
+    conn.execute(
+        """
+        CREATE TABLE magnum_history (
+            DATA_DATE VARCHAR, FINANCIAL_TYPE VARCHAR, SYMBOL VARCHAR, PRICE DOUBLE,
+            LOADED_AT TIMESTAMP, SOURCE_FILE VARCHAR, FILE_HASH VARCHAR,
+            IS_CURRENT BOOLEAN
+        )
+    """
+    )
+    conn.execute(
+        "INSERT INTO magnum_history VALUES "
+        "('2023-01-31', 'CASH', 'USDCURR', NULL, now(), 'old.csv', 'x', TRUE)"
+    )
+
+    csv_path = input_dir / "magnum.28-02-2023.csv"
+    csv_path.write_text(
+        "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE\n"
+        "2023-02-28,Equities,AAPL,150.0\n"
+        "2023-02-28,Government Bond,US912810FQ68,101.0\n"
+    )
+    assert Load.load_versioned(conn, "magnum", csv_path)
+
+    types = dict(
+        conn.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_name = 'magnum'"
+        ).fetchall()
+    )
+    assert types["FINANCIAL_TYPE"].startswith("ENUM(")
+    assert types["DATA_DATE"] == "DATE"
+    assert conn.execute(
+        "SELECT SYMBOL FROM magnum WHERE FINANCIAL_TYPE = 'Government Bond'"
+    ).fetchall() == [("US912810FQ68",)]
+
+    bad_path = input_dir / "magnum.31-03-2023.csv"
+    bad_path.write_text(
+        "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE\n2023-03-31,Crypto,BTC,1.0\n"
+    )
+    assert not Load.load_versioned(conn, "magnum", bad_path)
+    conn.close()
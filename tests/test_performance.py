@@ -0,0 +1,149 @@
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+
+from src.fx import FX
+from src.load import Load
+from src.models.models import FxConfig, PerformanceConfig
+from src.performance import Performance
+
+FUNDS = [
+    "applebead",
+    "belaware",
+    "fund_whitestone",
+    "leeder",
+    "magnum",
+    "mend_report_wallington",
+    "report_of_gohen",
+    "rpt_catalysm",
+    "tt_monthly_trustmind",
+    "virtous",
+]
+
+
+@pytest.fixture(scope="module")
+def fund_database():
+    """
+    Pytest fixture to build a database with every fund queried by the performance
+    report, three months of holdings and reference prices.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        db_file = temp_path / "financial_data.duckdb"
+        conn = duckdb.connect(database=str(db_file))
+        fx_config = FxConfig(input_directory=temp_path)
+        rates = FX.read_rates(fx_config.fx_rates_file)
+
+        for i, fund in enumerate(FUNDS):
+            for month, data_date in enumerate(
+                ["2023-01-31", "2023-02-28", "2023-03-31"]
+            ):
+                csv_file = temp_path / f"{fund}.{data_date}.csv"
+                quantity = 10 + i + month
+                csv_file.write_text(
+                    "DATA_DATE,FINANCIAL_TYPE,SYMBOL,SECURITY_NAME,INST_ID,PRICE,QUANTITY,REALISED_PL,MARKET_VALUE,SOURCE\n"
+                    f"{data_date},Equities,AAPL,Apple Inc.,,{150 + i},{quantity},{i * 7 - month},{(150 + i) * quantity},{fund}\n"
+                    f"{data_date},Government Bond,US912810FQ68,T 2029,US912810FQ68,{100 + month},{quantity * 2},{month},{(100 + month + i) * quantity * 2},{fund}\n"
+                    f"{data_date},CASH,USDCURR,CASH,,,,,{1000 * i},{fund}\n"
+                )
+                FX.normalize_file(csv_file.name, fx_config, rates)
+                Load.load_versioned(conn, fund, csv_file)
+
+        conn.execute(
+            """
+            CREATE TABLE equity_prices AS
+            SELECT * FROM (VALUES
+                (TIMESTAMP '2023-01-02', 'AAPL', 140.0::DOUBLE),
+                (TIMESTAMP '2023-02-01', 'AAPL', 145.0::DOUBLE),
+                (TIMESTAMP '2023-03-01', 'AAPL', 149.0::DOUBLE)
+            ) t(DATETIME, SYMBOL, PRICE)
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE bond_prices AS
+            SELECT * FROM (VALUES
+                (TIMESTAMP '2023-01-02', 'US912810FQ68', 99.0::DOUBLE),
+                (TIMESTAMP '2023-02-01', 'US912810FQ68', 101.0::DOUBLE)
+            ) t(DATETIME, ISIN, PRICE)
+        """
+        )
+        expected = conn.execute(
+            Path("queries/fund_performance_query.sql").read_text(encoding="UTF-8")
+        ).df()
+
+        snapshot_dir = temp_path / "snapshot"
+        Performance.export_snapshot(conn, snapshot_dir)
+        conn.close()
+
+        yield db_file, snapshot_dir, expected
+
+
+def assert_same_ranking(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert list(result.columns) == ["date_month", "fund_name", "rate_of_return"]
+    assert [pd.Timestamp(d) for d in result["date_month"]] == [
+        pd.Timestamp(d) for d in expected["date_month"]
+    ]
+    assert result["fund_name"].tolist() == expected["fund_name"].tolist()
+    assert result["rate_of_return"].tolist() == pytest.approx(
+        expected["rate_of_return"].tolist()
+    )
+
+
+@pytest.mark.parametrize("partition_by", ["fund", "month"])
+def test_compute_matches_monolithic_query(fund_database, partition_by):
+    """
+    Test that partitioned results merge to the same ranking as fund_performance_query.sql.
+    """
+    db_file, _, expected = fund_database
+    config = PerformanceConfig(db_file=db_file, partition_by=partition_by, workers=3)
+
+    partitions = Performance.plan_partitions(config)
+    assert len(partitions) == 3
+
+    rows = [
+        row
+        for partition in partitions
+        for row in Performance.run_partition(config, partition)
+    ]
+    assert_same_ranking(Performance.rank_funds(rows), expected)
+
+
+def test_compute_in_worker_processes_from_snapshot(fund_database):
+    """
+    Test that worker processes reading the Parquet snapshot produce the same ranking.
+    """
+    _, snapshot_dir, expected = fund_database
+    config = PerformanceConfig(
+        snapshot_dir=snapshot_dir, partition_by="month", workers=2
+    )
+
+    assert Performance.list_funds(config) == FUNDS
+    assert Performance.plan_partitions(config)[0].start_month == date(2023, 1, 1)
+    assert_same_ranking(Performance.compute(config), expected)
+
+
+def test_partition_query_follows_report_query(tmp_path):
+    """
+    Test that the partition query is derived from the report's CTEs, with the fund
+    union and price tables swapped for the partition's.
+    """
+    sql_file = tmp_path / "report.sql"
+    sql_file.write_text(
+        "WITH consolidated_funds AS (SELECT * FROM applebead),\n"
+        "cte4 AS (SELECT source, 'a (b' AS date_trunc, 1 AS total_pl, "
+        "2 AS fund_mv_end, 3 AS fund_mv_start FROM consolidated_funds)\n"
+        "SELECT * FROM cte4;"
+    )
+    ctes, final = Performance.split_ctes(sql_file.read_text())
+    assert list(ctes) == ["consolidated_funds", "cte4"]
+    assert final == "SELECT * FROM cte4"
+
+    query = Performance.partition_query(sql_file)
+    assert "applebead" not in query
+    assert "FROM main.bond_prices" in query
+    assert query.endswith("FROM cte4")
@@ -0,0 +1,138 @@
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.cli import main
+from src.fx import FX
+from src.load import Load
+from src.models.models import FxConfig
+from src.recon import Recon
+
+
+@pytest.fixture
+def recon_conn():
+    """
+    Pytest fixture to build a database with two funds, four monthly reports and
+    reference prices, and its reconciliation breaks.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        conn = duckdb.connect(database=":memory:")
+        fx_config = FxConfig(input_directory=Path(temp_dir))
+        rates = FX.read_rates(fx_config.fx_rates_file)
+        # AAPL is priced off by 5 in applebead from February on, and the bond
+        # has no reference price at all
+        for fund, offsets in [("applebead", [0, 5, 5, 5]), ("leeder", [0, 0, 3, 0])]:
+            for offset, data_date in zip(
+                offsets, ["2023-01-31", "2023-02-28", "2023-03-31", "2023-04-30"]
+            ):
+                csv_file = Path(temp_dir) / f"{fund}.{data_date}.csv"
+                csv_file.write_text(
+                    "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE,QUANTITY,MARKET_VALUE,SOURCE\n"
+                    f"{data_date},Equities,AAPL,{150 + offset},10,{(150 + offset) * 10},{fund}\n"
+                    f"{data_date},Government Bond,US912810FQ68,101,5,505,{fund}\n"
+                    f"{data_date},CASH,USDCURR,,,1000,{fund}\n"
+                )
+                FX.normalize_file(csv_file.name, fx_config, rates)
+                Load.load_versioned(conn, fund, csv_file)
+
+        conn.execute(
+            """
+            CREATE TABLE equity_prices AS
+            SELECT * FROM (VALUES
+                (TIMESTAMP '2023-01-31 09:00:00', 'AAPL', 149.0::DOUBLE),
+                (TIMESTAMP '2023-01-31 17:00:00', 'AAPL', 150.0::DOUBLE)
+            ) t(DATETIME, SYMBOL, PRICE)
+        """
+        )
+        conn.execute(
+            "CREATE TABLE bond_prices (DATETIME TIMESTAMP, ISIN VARCHAR, PRICE DOUBLE)"
+        )
+        Recon.build_breaks(conn)
+        yield conn
+        conn.close()
+
+
+def test_build_breaks_sizes_and_ages(recon_conn):
+    """
+    Test that breaks use the last price on or before the report date and are aged
+    from the start of their run.
+    """
+    rows = recon_conn.execute(
+        """
+        SELECT FUND, DATA_DATE::VARCHAR, REF_PRICE, DIFF, BREAK_AGE_DAYS
+        FROM recon_breaks
+        WHERE INSTRUMENT = 'AAPL'
+        ORDER BY FUND, DATA_DATE
+    """
+    ).fetchall()
+    assert rows == [
+        ("applebead", "2023-02-28", 150.0, 5.0, 0),
+        ("applebead", "2023-03-31", 150.0, 5.0, 31),
+        ("applebead", "2023-04-30", 150.0, 5.0, 61),
+        ("leeder", "2023-03-31", 150.0, 3.0, 0),
+    ]
+
+    missing = recon_conn.execute(
+        "SELECT COUNT(*) FROM recon_breaks WHERE REF_PRICE IS NULL"
+    ).fetchone()[0]
+    assert missing == 8
+
+    stored = recon_conn.execute(
+        "SELECT INSTRUMENT, DATA_DATE FROM recon_breaks"
+    ).fetchall()
+    assert stored == sorted(stored)
+    months = recon_conn.execute(
+        "SELECT MONTH, FUND, BREAKS FROM recon_fund_months"
+    ).fetchall()
+    assert months == sorted(months)
+    assert (
+        sum(breaks for *_, breaks in months)
+        == recon_conn.execute("SELECT COUNT(*) FROM recon_breaks").fetchone()[0]
+    )
+
+
+def test_instrument_breaks_window(recon_conn):
+    """
+    Test that instrument lookups only return breaks within the requested window.
+    """
+    breaks = Recon.instrument_breaks(recon_conn, "AAPL", months=2)
+    assert breaks["FUND"].tolist() == ["applebead", "leeder", "applebead"]
+    assert (
+        len(Recon.instrument_breaks(recon_conn, "AAPL", as_of=date(2023, 2, 28))) == 1
+    )
+
+
+def test_funds_by_breaks(recon_conn):
+    """
+    Test that funds are ranked by their number of breaks in the month.
+    """
+    ranking = Recon.funds_by_breaks(recon_conn, month=date(2023, 3, 1))
+    assert ranking["FUND"].tolist() == ["applebead", "leeder"]
+    assert ranking["BREAKS"].tolist() == [2, 2]
+
+    latest = Recon.funds_by_breaks(recon_conn, limit=1)
+    assert latest["FUND"].tolist() == ["applebead"]
+    assert latest["OLDEST_BREAK_DAYS"].tolist() == [89]
+
+
+def test_breaks_cli_lookups(recon_conn, capsys):
+    """
+    Test that the breaks subcommand answers lookups from a database file.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = Path(temp_dir) / "financial_data.duckdb"
+        recon_conn.execute(f"ATTACH '{db_file}' AS copy")
+        recon_conn.execute("CREATE TABLE copy.recon_breaks AS FROM recon_breaks")
+        recon_conn.execute(
+            "CREATE TABLE copy.recon_fund_months AS FROM recon_fund_months"
+        )
+        recon_conn.execute("DETACH copy")
+
+        main(["breaks", "--db-file", str(db_file), "instrument", "AAPL"])
+        assert capsys.readouterr().out.count("AAPL") == 4
+
+        main(["breaks", "--db-file", str(db_file), "funds", "--month", "2023-02"])
+        assert "applebead" in capsys.readouterr().out
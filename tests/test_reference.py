@@ -0,0 +1,109 @@
+import tempfile
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.reference import Reference
+
+
+@pytest.fixture
+def reference_dir():
+    """
+    Pytest fixture to create a temporary reference data directory.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+
+def test_load_prices_appends_only_new_dates(reference_dir):
+    """
+    Test that CSV and Parquet histories are typed, sorted and loaded incrementally.
+    """
+    conn = duckdb.connect(database=":memory:")
+    (reference_dir / "equity_prices.csv").write_text(
+        "DATETIME,SYMBOL,PRICE\n"
+        "2023-01-03,MSFT,240\n"
+        "2023-01-02,MSFT,239\n"
+        "2023-01-02,AAPL,125\n"
+    )
+    Reference.load_reference_data(conn, reference_dir)
+
+    conn.execute(
+        """
+        COPY (
+            SELECT * FROM (VALUES
+                ('2023-01-03 00:00:00'::TIMESTAMP, 'AAPL', 126.0),
+                ('2023-01-03 00:00:00'::TIMESTAMP, 'MSFT', 999.0),
+                ('2023-01-04 00:00:00'::TIMESTAMP, 'MSFT', 241.0)
+            ) t(DATETIME, SYMBOL, PRICE)
+        ) TO '{}' (FORMAT PARQUET)
+    """.format(
+            reference_dir / "equity_prices_2023_01_04.parquet"
+        )
+    )
+    appended = Reference.load_prices(
+        conn,
+        "equity_prices",
+        "SYMBOL",
+        Reference.find_price_files(reference_dir, "equity_prices"),
+    )
+
+    assert appended == 2
+    rows = conn.execute(
+        "SELECT SYMBOL, DATETIME::DATE::VARCHAR, PRICE FROM equity_prices"
+    ).fetchall()
+    assert rows == [
+        ("AAPL", "2023-01-02", 125.0),
+        ("MSFT", "2023-01-02", 239.0),
+        ("MSFT", "2023-01-03", 240.0),
+        ("AAPL", "2023-01-03", 126.0),
+        ("MSFT", "2023-01-04", 241.0),
+    ]
+    types = dict(
+        conn.execute("DESCRIBE equity_prices").fetchall()[i][:2] for i in range(3)
+    )
+    assert types == {"DATETIME": "TIMESTAMP", "SYMBOL": "VARCHAR", "PRICE": "DOUBLE"}
+    conn.close()
+
+
+def test_has_price_files(reference_dir):
+    """
+    Test that only Parquet and CSV files named after a reference table count.
+    """
+    assert not Reference.has_price_files(reference_dir / "missing")
+    (reference_dir / "bond_prices.txt").write_text("not a price file")
+    assert not Reference.has_price_files(reference_dir)
+    (reference_dir / "bond_prices.csv").write_text("DATETIME,ISIN,PRICE\n")
+    assert Reference.has_price_files(reference_dir)
+
+
+def test_load_prices_appends_each_date_once(reference_dir):
+    """
+    Test that dates repeated within a file or across files of one load are
+    appended once, from the file sorting last.
+    """
+    conn = duckdb.connect(database=":memory:")
+    (reference_dir / "bond_prices.csv").write_text(
+        "DATETIME,ISIN,PRICE\n"
+        "2023-01-02,US912810FQ68,99\n"
+        "2023-01-02,US912810FQ68,99\n"
+        "2023-01-03,US912810FQ68,100\n"
+    )
+    (reference_dir / "bond_prices_2023.csv").write_text(
+        "DATETIME,ISIN,PRICE\n" "2023-01-03,US912810FQ68,101\n"
+    )
+
+    assert (
+        Reference.load_prices(
+            conn,
+            "bond_prices",
+            "ISIN",
+            Reference.find_price_files(reference_dir, "bond_prices"),
+        )
+        == 2
+    )
+    assert conn.execute(
+        "SELECT DATETIME::DATE::VARCHAR, PRICE FROM bond_prices"
+    ).fetchall() == [("2023-01-02", 99.0), ("2023-01-03", 101.0)]
+    conn.close()
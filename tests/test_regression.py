@@ -0,0 +1,119 @@
+import tempfile
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+
+from src.models.models import RegressionConfig
+from src.regression import GOLDEN_DIRECTORY, Regression
+
+CONFIG = RegressionConfig()
+
+
+@pytest.fixture(scope="module")
+def fixture_conn():
+    """
+    Pytest fixture to build the regression fixture database from the committed data.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = Regression.build_fixture_database(CONFIG, Path(temp_dir))
+        conn = duckdb.connect(database=str(db_file), read_only=True)
+        yield conn
+        conn.close()
+
+
+@pytest.mark.parametrize(
+    "sql_file",
+    sorted(CONFIG.queries_directory.glob("*.sql")),
+    ids=lambda path: path.stem,
+)
+def test_query_matches_golden(fixture_conn, sql_file):
+    """
+    Test that each report query still returns its golden result on the fixture data.
+    """
+    result_df, _ = Regression.time_query(
+        fixture_conn, sql_file.read_text(encoding="UTF-8"), repeats=1
+    )
+    golden_csv = (
+        CONFIG.regression_directory / GOLDEN_DIRECTORY / f"{sql_file.stem}_result.csv"
+    )
+    assert Regression.compare_to_golden(result_df, golden_csv, CONFIG) == []
+
+
+def test_fixture_database_leaves_fixtures_untouched(fixture_conn):
+    """
+    Test that building the fixture database writes nothing next to the frozen reports.
+    """
+    assert not any(
+        path.name.startswith(".") for path in CONFIG.funds_directory.iterdir()
+    )
+
+
+def test_fixture_database_covers_restatements_and_currencies(fixture_conn):
+    """
+    Test that the fixture reports exercise every fund, a restated report and a
+    multi-currency report.
+    """
+    funds = fixture_conn.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_name LIKE '%\\_history' ESCAPE '\\'"
+    ).fetchone()[0]
+    assert funds == 10
+
+    assert fixture_conn.execute(
+        "SELECT COUNT(DISTINCT SOURCE_FILE), COUNT(DISTINCT SOURCE_FILE) FILTER "
+        "(WHERE IS_CURRENT) FROM leeder_history WHERE DATA_DATE = '2023-01-31'"
+    ).fetchone() == (2, 1)
+
+    currencies = dict(
+        fixture_conn.execute(
+            "SELECT CURRENCY, MIN(FX_RATE) FROM magnum "
+            "WHERE DATA_DATE = '2023-02-28' GROUP BY CURRENCY"
+        ).fetchall()
+    )
+    assert currencies == {"USD": 1.0, "EUR": 1.0576, "GBP": 1.2094}
+
+
+def test_compare_to_golden_tolerance_and_row_order():
+    """
+    Test that row order and float noise are ignored but real changes are reported.
+    """
+    golden = pd.DataFrame(
+        {"SYMBOL": ["AAPL", "MSFT"], "DIFF": [0.1, -0.2], "ROWS": [1, 2]}
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        golden_csv = Path(temp_dir) / "query_result.csv"
+        golden.to_csv(golden_csv, index=False)
+
+        reordered = golden.iloc[::-1].assign(DIFF=[-0.2 + 1e-12, 0.1])
+        assert Regression.compare_to_golden(reordered, golden_csv, CONFIG) == []
+
+        changed = golden.assign(DIFF=[0.1, -0.25])
+        differences = Regression.compare_to_golden(changed, golden_csv, CONFIG)
+        assert len(differences) == 1
+        assert "'DIFF'" in differences[0]
+
+        assert Regression.compare_to_golden(golden.head(1), golden_csv, CONFIG) == [
+            "1 rows != 2 golden rows"
+        ]
+
+
+@pytest.mark.parametrize(
+    "latency, expected_failures",
+    [
+        (140.0, 0),  # within 50% of the 100 ms baseline
+        (160.0, 1),  # 60% slower
+        (40.0, 0),  # below min_latency_ms
+    ],
+)
+def test_check_latency(latency, expected_failures):
+    """
+    Test that only queries slower than the allowed slowdown fail the latency gate.
+    """
+    failures = Regression.check_latency(
+        {"fund_performance_query": latency, "new_query": 500.0},
+        {"fund_performance_query": 100.0},
+        CONFIG,
+    )
+    assert len(failures) == expected_failures
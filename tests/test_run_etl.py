@@ -6,10 +6,22 @@ def test_run_etl():
     """Test the run_etl function to ensure all steps are called."""
     with patch("src.setup.Setup.setup_step") as mock_setup, patch(
         "src.transform.Transform.transform_step"
-    ) as mock_transform, patch("src.load.Load.load_step") as mock_load:
+    ) as mock_transform, patch("src.fx.FX.fx_step") as mock_fx, patch(
+        "src.validate.Validate.validate_step"
+    ) as mock_validate, patch(
+        "src.load.Load.load_step"
+    ) as mock_load, patch(
+        "src.recon.Recon.recon_step"
+    ) as mock_recon, patch(
+        "src.cube.Cube.cube_step"
+    ) as mock_cube:
 
         run_etl()
 
         mock_setup.assert_called_once()
         mock_transform.assert_called_once()
+        mock_fx.assert_called_once()
+        mock_validate.assert_called_once()
         mock_load.assert_called_once()
+        mock_recon.assert_called_once()
+        mock_cube.assert_called_once()
@@ -0,0 +1,111 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.cli import CLI
+from src.load import Load
+from src.models.models import RuntimeConfig
+from src.runtime import Runtime
+from src.setup import Setup
+
+
+@pytest.fixture
+def runtime_config():
+    """
+    Pytest fixture to provide runtime settings for a temporary database.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield RuntimeConfig(
+            db_file=Path(temp_dir) / "financial_data.duckdb",
+            memory_limit_mb=256,
+            threads=2,
+            temp_directory=Path(temp_dir) / "spill",
+        )
+
+
+def test_runtime_opens_one_configured_connection(runtime_config):
+    """
+    Test that the connection is opened once, on first use, with the configured settings.
+    """
+    with Runtime(runtime_config) as runtime:
+        assert runtime._conn is None
+        conn = runtime.conn
+        assert runtime.conn is conn
+        settings = dict(
+            conn.execute(
+                "SELECT name, value FROM duckdb_settings() "
+                "WHERE name IN ('threads', 'temp_directory')"
+            ).fetchall()
+        )
+        assert settings["threads"] == "2"
+        assert Path(settings["temp_directory"]) == runtime_config.temp_directory
+        assert runtime_config.temp_directory.is_dir()
+
+    assert runtime._conn is None
+
+
+def test_use_closes_only_its_own_runtime(runtime_config):
+    """
+    Test that Runtime.use leaves a given runtime open and closes a default one.
+    """
+    runtime = Runtime(runtime_config)
+    with Runtime.use(runtime) as used:
+        assert used is runtime
+        used.conn.execute("CREATE TABLE t AS SELECT 1 AS x")
+    assert runtime.conn.execute("SELECT x FROM t").fetchone() == (1,)
+    runtime.close()
+
+    with patch.object(Runtime, "close") as mock_close:
+        with Runtime.use() as own:
+            assert own is not runtime
+        mock_close.assert_called_once()
+
+
+def test_stages_share_the_pipeline_connection(runtime_config):
+    """
+    Test that setup and load run on the same connection, owned by the caller's runtime.
+    """
+    runtime = Runtime(runtime_config)
+    connections = []
+
+    def record(*args):
+        connections.append(args[0].conn)
+
+    with patch.object(Setup, "setup_step", side_effect=record), patch.object(
+        Load, "load_step", side_effect=record
+    ), patch("src.transform.Transform.transform_step"), patch(
+        "src.validate.Validate.validate_step"
+    ):
+        with tempfile.TemporaryDirectory() as state_dir:
+            CLI.run_pipeline(
+                ["setup", "transform", "validate", "load"],
+                Path(state_dir) / "etl_state.json",
+                runtime=runtime,
+            )
+
+    assert len(connections) == 2
+    assert connections[0] is connections[1]
+    assert runtime.conn is connections[0]
+    runtime.close()
+
+
+def test_runtime_keeps_duckdb_memory_limit_by_default():
+    """
+    Test that the shared connection only sets a memory limit when one is given.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = Path(temp_dir) / "financial_data.duckdb"
+        with Runtime(RuntimeConfig(db_file=db_file)) as runtime:
+            default_limit = runtime.conn.execute(
+                "SELECT current_setting('memory_limit')"
+            ).fetchone()[0]
+        with Runtime(RuntimeConfig(db_file=db_file, memory_limit_mb=256)) as runtime:
+            assert (
+                runtime.conn.execute(
+                    "SELECT current_setting('memory_limit')"
+                ).fetchone()[0]
+                != default_limit
+            )
+    assert RuntimeConfig().memory_limit_mb is None
@@ -0,0 +1,163 @@
+import tempfile
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+
+from src.load import Load
+from src.models.models import SampleConfig
+from src.report import Report
+from src.sample import Sample
+
+
+@pytest.fixture(scope="module")
+def sample_db():
+    """
+    Pytest fixture to build a database with two funds of 40 holdings over two months.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_file = Path(temp_dir) / "financial_data.duckdb"
+        conn = duckdb.connect(database=str(db_file))
+        for fund in ["applebead", "leeder"]:
+            for data_date in ["2023-01-31", "2023-02-28"]:
+                csv_file = Path(temp_dir) / f"{fund}.{data_date}.csv"
+                rows = "".join(
+                    f"{data_date},Equities,SYM{i},{100 + i},10,1,{1000 + 10 * i}\n"
+                    for i in range(40)
+                )
+                csv_file.write_text(
+                    "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE,QUANTITY,REALISED_PL,MARKET_VALUE\n"
+                    + rows
+                )
+                Load.load_versioned(conn, fund, csv_file)
+        yield Path(temp_dir), conn
+        conn.close()
+
+
+def test_draw_stratifies_by_report(sample_db):
+    """
+    Test that every fund report keeps the same share of rows, spread over the groups,
+    that low percents still keep a row per group, and that the same seed draws the
+    same sample.
+    """
+    _, conn = sample_db
+    config = SampleConfig(percent=25, groups=4)
+    counts_query = """
+        SELECT DATA_DATE, SAMPLE_GROUP, COUNT(*)
+        FROM applebead_sample GROUP BY ALL ORDER BY ALL
+    """
+
+    assert Sample.draw(
+        conn, ["applebead"], config.model_copy(update={"percent": 1})
+    ) == pytest.approx(0.1)
+    assert [count for *_, count in conn.execute(counts_query).fetchall()] == [1] * 8
+
+    fraction = Sample.draw(conn, ["applebead"], config)
+    assert fraction == pytest.approx(0.25)
+    counts = conn.execute(counts_query).fetchall()
+    assert [count for *_, count in counts] == [3, 3, 2, 2] * 2
+    first = conn.execute("SELECT SYMBOL FROM applebead_sample ORDER BY ALL").fetchall()
+
+    Sample.draw(conn, ["applebead"], config)
+    assert (
+        conn.execute("SELECT SYMBOL FROM applebead_sample ORDER BY ALL").fetchall()
+        == first
+    )
+    Sample.draw(conn, ["applebead"], config.model_copy(update={"seed": 7}))
+    assert (
+        conn.execute("SELECT SYMBOL FROM applebead_sample ORDER BY ALL").fetchall()
+        != first
+    )
+    conn.execute("DROP TABLE applebead_sample")
+
+
+def test_rewrite_only_touches_fund_tables():
+    """
+    Test that quoted fund names and history tables are not rewritten.
+    """
+    sql_query = (
+        "SELECT * FROM applebead a JOIN applebead_history h USING (SYMBOL) "
+        "WHERE a.SOURCE = 'applebead'"
+    )
+    assert Sample.rewrite(sql_query, ["applebead"]) == (
+        "SELECT * FROM applebead_sampled a JOIN applebead_history h USING (SYMBOL) "
+        "WHERE a.SOURCE = 'applebead'"
+    )
+
+
+def test_estimate_scales_sums_with_standard_errors(sample_db):
+    """
+    Test that scaled sums approximate the full totals within their standard errors,
+    and that no sampling objects are left behind.
+    """
+    _, conn = sample_db
+    sql_query = """
+        SELECT DATA_DATE, SUM(MARKET_VALUE) AS MARKET_VALUE, AVG(PRICE) AS PRICE
+        FROM (SELECT * FROM applebead UNION ALL SELECT * FROM leeder)
+        GROUP BY DATA_DATE ORDER BY DATA_DATE
+    """
+    full = conn.execute(sql_query).df()
+
+    result = Sample.estimate(
+        conn, sql_query, SampleConfig(percent=50, scaled_columns=["MARKET_VALUE"])
+    )
+
+    assert list(result.columns) == [
+        "DATA_DATE",
+        "MARKET_VALUE",
+        "MARKET_VALUE_stderr",
+        "PRICE",
+        "PRICE_stderr",
+    ]
+    for column in ["MARKET_VALUE", "PRICE"]:
+        error = (result[column] - full[column]).abs()
+        assert (error <= 3 * result[f"{column}_stderr"]).all()
+    assert (result["MARKET_VALUE_stderr"] > 0).all()
+    assert (
+        conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name LIKE '%_sample'"
+        ).fetchone()[0]
+        == 0
+    )
+
+
+def test_standard_errors_by_key_columns():
+    """
+    Test that rows are matched across groups on the key columns only.
+    """
+    estimate = pd.DataFrame({"MONTH": ["2023-01"], "FUND": ["a"], "RETURN": [2.0]})
+    groups = [
+        pd.DataFrame({"MONTH": ["2023-01"], "FUND": [fund], "RETURN": [value]})
+        for fund, value in [("a", 1.0), ("b", 3.0)]
+    ]
+
+    unmatched = Sample.standard_errors(estimate, groups)
+    assert unmatched["RETURN_stderr"].isna().all()
+
+    matched = Sample.standard_errors(estimate, groups, key_columns=["MONTH"])
+    assert matched["RETURN_stderr"].iloc[0] == pytest.approx(1.0)
+
+
+def test_run_query_to_csv_with_sample(sample_db, capsys):
+    """
+    Test that a sampled report is written next to, not over, the full result, and
+    that standard errors no row can have are dropped with a warning.
+    """
+    temp_dir, conn = sample_db
+    sql_file = temp_dir / "query.sql"
+    sql_file.write_text("SELECT DATA_DATE, SYMBOL, PRICE FROM leeder")
+    db_file = temp_dir / "copy.duckdb"
+    conn.execute(f"ATTACH '{db_file}' AS copy")
+    conn.execute("COPY FROM DATABASE financial_data TO copy")
+    conn.execute("DETACH copy")
+
+    Report.run_query_to_csv(
+        sql_file, db_file, temp_dir, sample=SampleConfig(percent=10)
+    )
+
+    result = pd.read_csv(temp_dir / "query_sample_result.csv")
+    assert len(result) == 8
+    assert list(result.columns) == ["DATA_DATE", "SYMBOL", "PRICE"]
+    assert "no standard error for PRICE_stderr" in capsys.readouterr().out
+    assert not (temp_dir / "query_result.csv").exists()
@@ -33,3 +33,31 @@ def test_execute_sql(setup_instance):
     with patch("builtins.open", mock_open(read_data=sql_query)):
         setup_instance.execute_sql()
         setup_instance.conn.execute.assert_called_once_with(sql_query)
+
+
+def test_load_reference_data(setup_instance):
+    """Test load_reference_data bulk imports the price files on the shared connection."""
+    setup_instance.conn = MagicMock()
+    conn = setup_instance.conn
+
+    with patch("src.setup.Reference.load_reference_data") as mock_load:
+        setup_instance.load_reference_data("reference_data")
+        mock_load.assert_called_once_with(conn, "reference_data")
+        conn.close.assert_not_called()
+
+
+def test_execute_sql_closes_own_connection(setup_instance):
+    """Test that a connection opened by Setup is closed, and a shared one is not."""
+    with patch("duckdb.connect", return_value=MagicMock()), patch(
+        "builtins.open", mock_open(read_data="SELECT 1;")
+    ):
+        setup_instance.connect_to_db()
+        conn = setup_instance.conn
+        setup_instance.execute_sql()
+        conn.close.assert_called_once()
+        assert setup_instance.conn is None
+
+        shared = MagicMock()
+        setup_instance.conn = shared
+        setup_instance.execute_sql()
+        shared.close.assert_not_called()
@@ -0,0 +1,134 @@
+import tempfile
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.catalog import Catalog
+from src.models.models import ShardConfig
+from src.performance import Performance
+from src.report import Report
+from src.shard import Shard
+
+
+@pytest.fixture
+def transformed_dir():
+    """
+    Pytest fixture to create transformed files for three funds over two years.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        for fund in ["applebead", "leeder", "magnum"]:
+            for data_date in ["2022-12-31", "2023-01-31"]:
+                (temp_path / f"{fund}.{data_date}.csv").write_text(
+                    "DATA_DATE,FINANCIAL_TYPE,SYMBOL,PRICE,SOURCE\n"
+                    f"{data_date},Equities,AAPL,150.0,{fund}\n"
+                    f"{data_date},CASH,USDCURR,,{fund}\n"
+                )
+        yield temp_path
+
+
+@pytest.mark.parametrize(
+    "shard_by, fund_groups, expected",
+    [
+        (
+            "fund_group",
+            {"group_a": ["applebead", "leeder"]},
+            {"group_a": ["applebead", "leeder"], "magnum": ["magnum"]},
+        ),
+        (
+            "year",
+            {},
+            {
+                "year_2022": ["applebead", "leeder", "magnum"],
+                "year_2023": ["applebead", "leeder", "magnum"],
+            },
+        ),
+    ],
+)
+def test_load_files_into_shards(transformed_dir, shard_by, fund_groups, expected):
+    """
+    Test that files land in their shard's own database and in the manifest.
+    """
+    with tempfile.TemporaryDirectory() as shard_dir:
+        config = ShardConfig(
+            input_directory=transformed_dir,
+            shard_directory=Path(shard_dir),
+            shard_by=shard_by,
+            fund_groups=fund_groups,
+            workers=2,
+        )
+        assert Shard.load_files(config) == expected
+
+        manifest = Catalog.read_manifest(Path(shard_dir))
+        assert {name: shard["funds"] for name, shard in manifest.items()} == expected
+        for name in expected:
+            assert (Path(shard_dir) / f"{name}.duckdb").exists()
+
+
+def test_catalog_attaches_only_needed_shards(transformed_dir):
+    """
+    Test that a query attaches only the shards holding the funds it reads, and sees
+    one logical table per fund across year shards.
+    """
+    query = "SELECT COUNT(*) FROM applebead WHERE PRICE > 0"
+    for shard_by, fund_groups, expected in [
+        ("fund_group", {"others": ["leeder", "magnum"]}, ["applebead"]),
+        ("year", {}, ["year_2022", "year_2023"]),
+    ]:
+        with tempfile.TemporaryDirectory() as shard_dir:
+            shard_path = Path(shard_dir)
+            Shard.load_files(
+                ShardConfig(
+                    input_directory=transformed_dir,
+                    shard_directory=shard_path,
+                    shard_by=shard_by,
+                    fund_groups=fund_groups,
+                )
+            )
+
+            conn = duckdb.connect(database=":memory:")
+            assert Catalog.attach(conn, shard_path, query) == expected
+            assert conn.execute("SELECT COUNT(*) FROM applebead").fetchone()[0] == 4
+            assert (
+                conn.execute("SELECT COUNT(*) FROM applebead_history").fetchone()[0]
+                == 4
+            )
+            conn.close()
+
+
+def test_report_reads_parquet_shard(transformed_dir):
+    """
+    Test that a registered Parquet snapshot is queried like any other shard.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source = temp_path / "source.duckdb"
+        Shard.load_shard(
+            "source",
+            sorted(transformed_dir.glob("applebead.*.csv")),
+            ShardConfig(input_directory=transformed_dir, shard_directory=temp_path),
+        )
+        conn = duckdb.connect(database=str(source))
+        conn.execute(
+            "CREATE TABLE bond_prices (DATETIME TIMESTAMP, ISIN VARCHAR, PRICE DOUBLE)"
+        )
+        conn.execute(
+            "CREATE TABLE equity_prices (DATETIME TIMESTAMP, SYMBOL VARCHAR, PRICE DOUBLE)"
+        )
+        Performance.export_snapshot(conn, temp_path / "snapshot")
+        conn.close()
+
+        shard_dir = temp_path / "shards"
+        Catalog.register_parquet(shard_dir, "archive", temp_path / "snapshot")
+        sql_file = temp_path / "count.sql"
+        sql_file.write_text("SELECT COUNT(*) AS n FROM applebead")
+        duckdb.connect(database=str(temp_path / "main.duckdb")).close()
+
+        Report.run_query_to_csv(
+            sql_file,
+            db_file=temp_path / "main.duckdb",
+            output_dir=temp_path / "out",
+            shard_directory=shard_dir,
+        )
+        assert (temp_path / "out" / "count_result.csv").read_text() == "n\n4\n"
@@ -1,13 +1,17 @@
+import gzip
 import tempfile
+import zipfile
 from pathlib import Path
 from typing import Optional
 
 import pytest
 import polars as pl
 
+from src.landing import Landing
 from src.models.models import Config
 from src.transform import Transform
 from src.utils.utils import ETLUtils
+from src.config.constants import LandingStatus
 
 
 @pytest.fixture
@@ -229,3 +233,127 @@ def test_process_files(temp_directories, sample_csv_content):
             assert (
                 not output_file.exists()
             ), f"File without date {filename} should not be created."
+
+
+def test_clean_csv_data_in_batches(temp_directories, sample_csv_content):
+    """
+    Test that streaming a file in row batches produces the same output as a full read.
+    """
+    input_dir, output_dir = temp_directories
+    filename = "Applebead.30-06-2023 breakdown.csv"
+    file_path = input_dir / filename
+    file_path.write_text(sample_csv_content)
+
+    Transform.clean_csv_data(filename, str(file_path), str(output_dir), "2023-06-30")
+    expected = pl.read_csv(output_dir / filename)
+    (output_dir / filename).unlink()
+
+    Transform.clean_csv_data(
+        filename, str(file_path), str(output_dir), "2023-06-30", chunk_rows=1
+    )
+    streamed = pl.read_csv(output_dir / filename)
+
+    assert streamed.equals(expected)
+
+
+def test_process_compressed_files(temp_directories, sample_csv_content):
+    """
+    Test that gzip, zstd and zipped inputs are transformed like their plain CSV equivalents.
+    """
+    zstandard = pytest.importorskip("zstandard")
+    input_dir, output_dir = temp_directories
+    config = Config(input_directory=input_dir, output_directory=output_dir)
+
+    plain_file = "Applebead.30-06-2023 breakdown.csv"
+    (input_dir / plain_file).write_text(sample_csv_content)
+    with gzip.open(input_dir / "Belaware.30_04_2023.csv.gz", "wt") as file:
+        file.write(sample_csv_content)
+    (input_dir / "Magnum.30-09-2022.csv.zst").write_bytes(
+        zstandard.ZstdCompressor().compress(sample_csv_content.encode())
+    )
+    with zipfile.ZipFile(input_dir / "bundle.zip", "w") as archive:
+        archive.writestr("Leeder.04_30_2023.csv", sample_csv_content)
+        archive.writestr("Virtous.05-31-2023 - securities.csv", sample_csv_content)
+
+    Transform.process_files(config)
+
+    expected = pl.read_csv(output_dir / plain_file).drop("DATA_DATE", "SOURCE")
+    for filename, date in [
+        ("Belaware.30_04_2023.csv", "2023-04-30"),
+        ("Magnum.30-09-2022.csv", "2022-09-30"),
+        ("Leeder.04_30_2023.csv", "2023-04-30"),
+        ("Virtous.05-31-2023 - securities.csv", "2023-05-31"),
+    ]:
+        df = pl.read_csv(output_dir / filename)
+        assert all(df["DATA_DATE"] == date), f"DATA_DATE incorrect for {filename}"
+        assert all(df["SOURCE"] == ETLUtils.extract_table_name(filename))
+        assert df.drop("DATA_DATE", "SOURCE").equals(expected)
+
+
+def test_clean_compressed_data_in_batches(temp_directories, sample_csv_content):
+    """
+    Test that compressed inputs parsed in several batches keep every row once.
+    """
+    input_dir, output_dir = temp_directories
+    header, row = sample_csv_content.splitlines()[:2]
+    gz_path = input_dir / "Belaware.30_04_2023.csv.gz"
+    with gzip.open(gz_path, "wt") as file:
+        file.write("\n".join([header] + [row.strip()] * 25) + "\n")
+
+    [raw_file] = ETLUtils.expand_raw_file(gz_path)
+    Transform.clean_compressed_data(
+        raw_file, output_dir, "2023-04-30", memory_budget_mb=1, probe_rows=10
+    )
+
+    df = pl.read_csv(output_dir / "Belaware.30_04_2023.csv")
+    assert df.height == 25
+    assert df.columns[0] == "DATA_DATE"
+
+
+def test_clean_compressed_data_widens_and_never_truncates(temp_directories):
+    """
+    Test that a value the schema probe did not see is kept, and that a stream
+    failing after the probe leaves no partial output.
+    """
+    input_dir, output_dir = temp_directories
+    rows = [f"Equities,SYM{i},{i},10,1" for i in range(30)] + ["Equities,ODD,1.5,10,1"]
+    content = "FINANCIAL TYPE,SYMBOL,PRICE,QUANTITY,REALISED P/L\n" + "\n".join(rows)
+    gz_path = input_dir / "Belaware.30_04_2023.csv.gz"
+    gz_path.write_bytes(gzip.compress(content.encode()))
+
+    [raw_file] = ETLUtils.expand_raw_file(gz_path)
+    assert Transform.clean_compressed_data(
+        raw_file, output_dir, "2023-04-30", memory_budget_mb=1, probe_rows=10
+    )
+    df = pl.read_csv(output_dir / "Belaware.30_04_2023.csv")
+    assert df.height == 31
+    assert df["PRICE"][-1] == 1.5
+
+    (output_dir / "Belaware.30_04_2023.csv").unlink()
+    gz_path.write_bytes(gzip.compress(content.encode())[:-20])
+    assert not Transform.clean_compressed_data(
+        raw_file, output_dir, "2023-04-30", memory_budget_mb=1, probe_rows=10
+    )
+    assert not list(output_dir.iterdir())
+
+
+def test_process_files_marks_only_written_files(temp_directories, sample_csv_content):
+    """
+    Test that a file that fails to transform stays new in the landing index, so the
+    next run retries it.
+    """
+    input_dir, output_dir = temp_directories
+    (input_dir / "Applebead.30-06-2023 breakdown.csv").write_text(sample_csv_content)
+    (input_dir / "Belaware.30_04_2023.csv.gz").write_bytes(
+        gzip.compress(sample_csv_content.encode())[:-20]
+    )
+
+    Transform.process_files(
+        Config(input_directory=input_dir, output_directory=output_dir)
+    )
+
+    statuses = dict(Landing.read_index(input_dir).select("FUND", "STATUS").iter_rows())
+    assert statuses == {
+        "applebead": LandingStatus.TRANSFORMED.value,
+        "belaware": LandingStatus.NEW.value,
+    }
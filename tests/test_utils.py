@@ -1,7 +1,10 @@
+import gzip
 import tempfile
+import zipfile
 from pathlib import Path
 from typing import Optional
 
+import polars as pl
 import pytest
 
 from src.models.models import Config
@@ -95,3 +98,84 @@ def test_extract_date(temp_directories, filename: str, expected_date: Optional[s
         filename, config.date_patterns, config.date_format
     )
     assert extracted_date == expected_date, f"Failed for filename: {filename}"
+
+
+def test_rows_per_chunk(temp_directories, sample_csv_content):
+    """
+    Test that small files are read in full and large files get a bounded batch size.
+    """
+    input_dir, _ = temp_directories
+    csv_path = input_dir / "Applebead.30-06-2023 breakdown.csv"
+    header, row = sample_csv_content.splitlines()[:2]
+    csv_path.write_text("\n".join([header] + [row.strip()] * 20000) + "\n")
+
+    assert ETLUtils.rows_per_chunk(csv_path, memory_budget_mb=1024) is None
+
+    chunk_rows = ETLUtils.rows_per_chunk(csv_path, memory_budget_mb=1)
+    assert chunk_rows is not None
+    assert 0 < chunk_rows < 20000
+
+
+def test_expand_raw_file(temp_directories, sample_csv_content):
+    """
+    Test that compressed inputs expose the inner CSV names for table and date extraction.
+    """
+    input_dir, output_dir = temp_directories
+    config = Config(input_directory=input_dir, output_directory=output_dir)
+
+    gz_path = input_dir / "Magnum.31-03-2023.csv.gz"
+    with gzip.open(gz_path, "wt") as file:
+        file.write(sample_csv_content)
+    zip_path = input_dir / "bundle_march.zip"
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.writestr("march/Leeder.03_31_2023.csv", sample_csv_content)
+        archive.writestr(
+            "march/Virtous.03-31-2023 - securities.csv", sample_csv_content
+        )
+        archive.writestr("march/readme.txt", "not a fund report")
+
+    [gz_file] = ETLUtils.expand_raw_file(gz_path)
+    assert gz_file.name == "Magnum.31-03-2023.csv"
+    assert gz_file.compression == "gzip"
+
+    zip_files = ETLUtils.expand_raw_file(zip_path)
+    assert [raw_file.name for raw_file in zip_files] == [
+        "Leeder.03_31_2023.csv",
+        "Virtous.03-31-2023 - securities.csv",
+    ]
+    assert [ETLUtils.extract_table_name(raw_file.name) for raw_file in zip_files] == [
+        "leeder",
+        "virtous",
+    ]
+    assert {
+        ETLUtils.extract_date(raw_file.name, config.date_patterns, config.date_format)
+        for raw_file in zip_files
+    } == {"2023-03-31"}
+
+    with ETLUtils.open_raw_file(zip_files[0]) as stream:
+        assert stream.read().decode() == sample_csv_content
+    assert ETLUtils.expand_raw_file(input_dir / "notes.txt") == []
+
+
+def test_encode_columns():
+    """
+    Test that repeated text columns become Categorical and DATA_DATE a Date.
+    """
+    df = pl.DataFrame(
+        {
+            "DATA_DATE": ["2023-01-31"],
+            "FINANCIAL_TYPE": ["Equities"],
+            "SYMBOL": ["AAPL"],
+            "SOURCE": ["applebead"],
+        }
+    )
+
+    for frame in (df, df.lazy()):
+        schema = ETLUtils.encode_columns(frame).collect_schema()
+        assert schema["DATA_DATE"] == pl.Date
+        assert schema["FINANCIAL_TYPE"] == pl.Categorical
+        assert schema["SOURCE"] == pl.Categorical
+        assert schema["SYMBOL"] == pl.String
+
+    encoded = ETLUtils.encode_columns(df)
+    assert ETLUtils.encode_columns(encoded).equals(encoded)
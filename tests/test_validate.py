@@ -0,0 +1,212 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+import polars as pl
+
+from src.models.models import ColumnRule, ValidationConfig
+from src.validate import DataValidationError, Validate
+
+
+@pytest.fixture
+def temp_directories():
+    """
+    Pytest fixture to create temporary input and quarantine directories.
+    """
+    with tempfile.TemporaryDirectory() as input_dir, tempfile.TemporaryDirectory() as quarantine_dir:
+        yield Path(input_dir), Path(quarantine_dir)
+
+
+@pytest.fixture
+def transformed_df():
+    """
+    Pytest fixture to provide transformed fund data with one bad row per rule.
+    """
+    return pl.DataFrame(
+        {
+            "DATA_DATE": ["2023-01-31"] * 6,
+            "FINANCIAL_TYPE": [
+                "Equities",
+                "Equities",
+                "Equities",
+                "Equities",
+                "Equities",
+                "CASH",
+            ],
+            "SYMBOL": ["AAPL", "GOOGL", "MSFT", "MSFT", "TSLA", "USDCURR"],
+            "INST_ID": [None] * 6,
+            "PRICE": [150.0, 2800.0, 300.0, 300.0, None, None],
+            "QUANTITY": [10.0, -5.0, 2.0, 1.0, 4.0, None],
+            "REALISED_PL": [1.0, 2.0, 3.0, 4.0, 5.0, None],
+            "MARKET_VALUE": [1500.0, -14000.0, 999.0, 300.0, 800.0, 1000.0],
+            "SOURCE": ["applebead"] * 6,
+        }
+    )
+
+
+def test_validate_dataframe(temp_directories, transformed_df):
+    """
+    Test that each rule rejects its row and CASH rows are exempt from price checks.
+    """
+    input_dir, quarantine_dir = temp_directories
+    config = ValidationConfig(
+        input_directory=input_dir,
+        quarantine_directory=quarantine_dir,
+        max_reject_ratio=1,
+    )
+
+    valid, rejects = Validate.validate_dataframe(transformed_df, config)
+
+    assert valid["SYMBOL"].to_list() == ["AAPL", "USDCURR"]
+    assert "REJECT_REASON" not in valid.columns
+
+    reasons = dict(zip(rejects["SYMBOL"], rejects["REJECT_REASON"]))
+    assert reasons["GOOGL"] == "QUANTITY:min_value"
+    assert reasons["TSLA"] == "PRICE:not_null"
+    assert "SYMBOL:unique" in reasons["MSFT"]
+    assert (
+        "MARKET_VALUE:price_x_quantity"
+        in rejects.filter(pl.col("QUANTITY") == 2.0)["REJECT_REASON"][0]
+    )
+
+
+def test_validate_dataframe_fails_fast(temp_directories, transformed_df):
+    """
+    Test that missing required columns and high reject ratios raise DataValidationError.
+    """
+    input_dir, quarantine_dir = temp_directories
+    config = ValidationConfig(
+        input_directory=input_dir, quarantine_directory=quarantine_dir
+    )
+
+    with pytest.raises(DataValidationError, match="rows rejected"):
+        Validate.validate_dataframe(transformed_df, config)
+
+    with pytest.raises(DataValidationError, match="Missing required columns"):
+        Validate.validate_dataframe(transformed_df.drop("PRICE"), config)
+
+    config = ValidationConfig(
+        input_directory=input_dir,
+        quarantine_directory=quarantine_dir,
+        rules=[ColumnRule(column="PRICE", required=False, not_null=True)],
+    )
+    valid, rejects = Validate.validate_dataframe(transformed_df.drop("PRICE"), config)
+    assert valid.height == transformed_df.height
+    assert rejects.is_empty()
+
+
+def test_process_files(temp_directories, transformed_df):
+    """
+    Test that row rejects are split into quarantine and failing files are removed.
+    """
+    input_dir, quarantine_dir = temp_directories
+    config = ValidationConfig(
+        input_directory=input_dir,
+        quarantine_directory=quarantine_dir,
+        max_reject_ratio=0.2,
+    )
+
+    partial_file = "Applebead.31-01-2023 breakdown.csv"
+    failed_file = "Belaware.31_01_2023.csv"
+    aapl = transformed_df.filter(pl.col("SYMBOL") == "AAPL")
+    pl.concat(
+        [
+            aapl,
+            aapl.with_columns(pl.lit("AMZN").alias("SYMBOL")),
+            aapl.with_columns(pl.lit("NVDA").alias("SYMBOL")),
+            transformed_df.filter(pl.col("SYMBOL").is_in(["TSLA", "USDCURR"])),
+        ]
+    ).write_csv(input_dir / partial_file)
+    transformed_df.write_csv(input_dir / failed_file)
+
+    Validate.process_files(config)
+
+    valid = pl.read_csv(input_dir / partial_file)
+    assert valid.height == 4
+    assert "TSLA" not in valid["SYMBOL"].to_list()
+    quarantined = pl.read_csv(quarantine_dir / partial_file)
+    assert quarantined["SYMBOL"].to_list() == ["TSLA"]
+
+    assert not (input_dir / failed_file).exists()
+    quarantined = pl.read_csv(quarantine_dir / failed_file)
+    assert quarantined.height == transformed_df.height
+    assert quarantined["REJECT_REASON"].str.starts_with("file:").all()
+
+
+def test_validate_file_in_batches(temp_directories, transformed_df):
+    """
+    Test that the streaming path splits rows the same way as the in-memory path.
+    """
+    input_dir, quarantine_dir = temp_directories
+    config = ValidationConfig(
+        input_directory=input_dir,
+        quarantine_directory=quarantine_dir,
+        max_reject_ratio=1,
+    )
+    filename = "Applebead.31-01-2023 breakdown.csv"
+    transformed_df.write_csv(input_dir / filename)
+
+    assert Validate.validate_file_in_batches(
+        input_dir / filename, quarantine_dir / filename, config, chunk_rows=2
+    )
+
+    valid = pl.read_csv(input_dir / filename)
+    assert valid["SYMBOL"].to_list() == ["AAPL", "USDCURR"]
+    rejects = pl.read_csv(quarantine_dir / filename)
+    assert sorted(rejects["SYMBOL"].to_list()) == ["GOOGL", "MSFT", "MSFT", "TSLA"]
+    assert not list(input_dir.glob("*.tmp"))
+
+
+def test_duplicated_values_streams_unique_rule(temp_directories, transformed_df):
+    """
+    Test that duplicates found by a streaming group-by flag the same rows as the
+    in-memory uniqueness check.
+    """
+    input_dir, quarantine_dir = temp_directories
+    config = ValidationConfig(
+        input_directory=input_dir, quarantine_directory=quarantine_dir
+    )
+    duplicates = Validate.duplicated_values(transformed_df.lazy(), config)
+    assert duplicates["SYMBOL"].to_list() == ["MSFT"]
+
+    streamed = Validate.flag_rows(
+        transformed_df,
+        Validate.build_checks(transformed_df.columns, config, duplicates),
+    )
+    in_memory = Validate.flag_rows(
+        transformed_df, Validate.build_checks(transformed_df.columns, config)
+    )
+    assert streamed["REJECT_REASON"].to_list() == in_memory["REJECT_REASON"].to_list()
+
+
+def test_validate_dataframe_rejects_unknown_financial_type(
+    temp_directories, transformed_df
+):
+    """
+    Test that FINANCIAL_TYPE values outside the ENUM used by Load are quarantined.
+    """
+    input_dir, quarantine_dir = temp_directories
+    config = ValidationConfig(
+        input_directory=input_dir,
+        quarantine_directory=quarantine_dir,
+        rules=[
+            rule
+            for rule in ValidationConfig(
+                input_directory=input_dir, quarantine_directory=quarantine_dir
+            ).rules
+            if rule.column == "FINANCIAL_TYPE"
+        ],
+        max_reject_ratio=1,
+    )
+    df = transformed_df.with_columns(
+        pl.when(pl.col("SYMBOL") == "AAPL")
+        .then(pl.lit("Crypto"))
+        .otherwise(pl.col("FINANCIAL_TYPE"))
+        .alias("FINANCIAL_TYPE")
+        .cast(pl.Categorical)
+    )
+
+    _, rejects = Validate.validate_dataframe(df, config)
+    reasons = dict(zip(rejects["SYMBOL"], rejects["REJECT_REASON"]))
+    assert reasons["AAPL"] == "FINANCIAL_TYPE:allowed_values"
+    assert "allowed_values" not in reasons["MSFT"]
@@ -0,0 +1,195 @@
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from src.landing import Landing
+from src.load import Load
+from src.models.models import WatchConfig
+from src.transform import Transform
+from src.watch import Watch
+
+
+@pytest.fixture
+def temp_directories():
+    """
+    Pytest fixture to create temporary input, output and quarantine directories.
+    """
+    with tempfile.TemporaryDirectory() as input_dir, tempfile.TemporaryDirectory() as output_dir, tempfile.TemporaryDirectory() as quarantine_dir:
+        yield Path(input_dir), Path(output_dir), Path(quarantine_dir)
+
+
+@pytest.fixture
+def sample_csv_content():
+    """
+    Pytest fixture to provide sample raw fund CSV content.
+    """
+    return (
+        "FINANCIAL TYPE,SYMBOL,SECURITY NAME,ISIN,PRICE,QUANTITY,REALISED P/L,MARKET VALUE\n"
+        "Equities,AAPL,Apple Inc.,,150.00,10,500.00,1500.00\n"
+        "Equities,GOOGL,Alphabet Inc.,,2800.00,5,14000.00,14000.00\n"
+    )
+
+
+def test_ready_files_debounces_changes():
+    """
+    Test that files are only ready once their signature is stable for the debounce period.
+    """
+    pending, processed = {}, {}
+
+    assert not Watch.ready_files({"a.csv": (1, 10)}, pending, processed, 0.0, 5.0)
+    # Still being written: the signature changes and the quiet period restarts
+    assert not Watch.ready_files({"a.csv": (2, 20)}, pending, processed, 4.0, 5.0)
+    assert not Watch.ready_files({"a.csv": (2, 20)}, pending, processed, 8.0, 5.0)
+    assert Watch.ready_files({"a.csv": (2, 20)}, pending, processed, 9.0, 5.0) == [
+        "a.csv"
+    ]
+    # A file being ingested is not handed out again, and one whose ingestion
+    # failed is retried
+    assert not Watch.ready_files(
+        {"a.csv": (2, 20)}, pending, processed, 20.0, 0.0, in_flight={"a.csv"}
+    )
+    assert Watch.ready_files({"a.csv": (2, 20)}, pending, processed, 21.0, 0.0) == [
+        "a.csv"
+    ]
+    # Unchanged ingested files are not ingested twice, modified files are
+    processed["a.csv"] = (2, 20)
+    assert not Watch.ready_files({"a.csv": (2, 20)}, pending, processed, 22.0, 0.0)
+    assert Watch.ready_files({"a.csv": (3, 30)}, pending, processed, 23.0, 0.0) == [
+        "a.csv"
+    ]
+
+
+def test_ingest_file_replaces_rows(temp_directories, sample_csv_content):
+    """
+    Test that re-delivering a file replaces its rows instead of duplicating them.
+    """
+    input_dir, output_dir, quarantine_dir = temp_directories
+    config = WatchConfig(
+        input_directory=input_dir,
+        output_directory=output_dir,
+        quarantine_directory=quarantine_dir,
+    )
+    filename = "Magnum.31-03-2023.csv"
+    (input_dir / filename).write_text(sample_csv_content)
+
+    conn = duckdb.connect(database=":memory:")
+    Watch.ingest_file(filename, config, conn, threading.Lock())
+    Watch.ingest_file(filename, config, conn, threading.Lock())
+
+    df = conn.execute("SELECT * FROM magnum").df()
+    assert len(df) == 2
+    assert set(df["SOURCE"]) == {"magnum"}
+    conn.close()
+
+
+def test_ingest_file_refreshes_quarantine(temp_directories, sample_csv_content):
+    """
+    Test that the quarantine table follows the latest delivery of a file.
+    """
+    input_dir, output_dir, quarantine_dir = temp_directories
+    config = WatchConfig(
+        input_directory=input_dir,
+        output_directory=output_dir,
+        quarantine_directory=quarantine_dir,
+    )
+    filename = "Magnum.31-03-2023.csv"
+    conn = duckdb.connect(database=":memory:")
+
+    (input_dir / filename).write_text(
+        sample_csv_content + "Equities,MSFT,Microsoft,,300.00,-1,0.00,-300.00\n"
+    )
+    Watch.ingest_file(filename, config, conn, threading.Lock())
+    assert conn.execute("SELECT COUNT(*) FROM quarantine").fetchone()[0] == 3
+    assert not (output_dir / filename).exists()
+
+    (input_dir / filename).write_text(sample_csv_content)
+    Watch.ingest_file(filename, config, conn, threading.Lock())
+    assert conn.execute("SELECT COUNT(*) FROM quarantine").fetchone()[0] == 0
+    conn.close()
+
+
+def test_ingest_file_fails_when_load_fails(temp_directories, sample_csv_content):
+    """
+    Test that a file the history table rejects is not reported as ingested.
+    """
+    input_dir, output_dir, quarantine_dir = temp_directories
+    config = WatchConfig(
+        input_directory=input_dir,
+        output_directory=output_dir,
+        quarantine_directory=quarantine_dir,
+    )
+    filename = "Magnum.31-03-2023.csv"
+    (input_dir / filename).write_text(sample_csv_content)
+    conn = duckdb.connect(database=":memory:")
+    conn.execute(
+        "CREATE TABLE magnum_history (DATA_DATE DATE, SYMBOL INTEGER, "
+        "LOADED_AT TIMESTAMP, SOURCE_FILE VARCHAR, FILE_HASH VARCHAR, "
+        "IS_CURRENT BOOLEAN)"
+    )
+
+    assert not Watch.ingest_file(filename, config, conn, threading.Lock())
+    assert conn.execute("SELECT COUNT(*) FROM magnum_history").fetchone()[0] == 0
+    conn.close()
+
+
+def test_watch_ingests_new_files(temp_directories, sample_csv_content):
+    """
+    Test that the watcher picks up a file landing after it starts.
+    """
+    input_dir, output_dir, quarantine_dir = temp_directories
+    config = WatchConfig(
+        input_directory=input_dir,
+        output_directory=output_dir,
+        quarantine_directory=quarantine_dir,
+        poll_interval=0.01,
+        debounce_seconds=0,
+    )
+    conn = duckdb.connect(database=":memory:")
+
+    async def run() -> None:
+        stop_event = asyncio.Event()
+        watcher = asyncio.create_task(Watch.watch(config, conn, stop_event))
+        await asyncio.sleep(0.05)
+        (input_dir / "Leeder.01_31_2023.csv").write_text(sample_csv_content)
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if (output_dir / "Leeder.01_31_2023.csv").exists():
+                break
+        stop_event.set()
+        await watcher
+
+    asyncio.run(run())
+
+    assert conn.execute("SELECT COUNT(*) FROM leeder").fetchone()[0] == 2
+    conn.close()
+
+
+def test_loaded_files_survive_restart(temp_directories, sample_csv_content):
+    """
+    Test that a restarted watcher skips the files ingested before it stopped,
+    and those the batch pipeline loaded, but not files modified since.
+    """
+    input_dir, output_dir, quarantine_dir = temp_directories
+    config = WatchConfig(
+        input_directory=input_dir,
+        output_directory=output_dir,
+        quarantine_directory=quarantine_dir,
+    )
+    conn = duckdb.connect(database=":memory:")
+    for filename in ["Leeder.01_31_2023.csv", "Magnum.31-03-2023.csv"]:
+        (input_dir / filename).write_text(sample_csv_content)
+    signature = Landing.scan(input_dir)["Leeder.01_31_2023.csv"]
+
+    assert Watch.ingest_file("Leeder.01_31_2023.csv", config, conn, threading.Lock())
+    Watch.record_loaded(config, "Leeder.01_31_2023.csv", signature)
+    Transform.process_files(config)
+    Load.process_files({"input_directory": output_dir, "conn": conn})
+    assert Watch.loaded_files(config) == Landing.scan(input_dir)
+
+    (input_dir / "Magnum.31-03-2023.csv").write_text(sample_csv_content * 2)
+    assert list(Watch.loaded_files(config)) == ["Leeder.01_31_2023.csv"]
+    conn.close()